@@ -20,6 +20,10 @@ pyinstaller --onefile ^
     --hidden-import=cv2 ^
     --hidden-import=pandas ^
     --hidden-import=numpy ^
+    --hidden-import=mss ^
+    --hidden-import=PIL.ImageTk ^
+    --hidden-import=PIL.ImageDraw ^
+    --hidden-import=PIL.ImageFont ^
     screen_scanner.py
 
 echo Build complete! Executable is in the 'dist' folder.
@@ -4,14 +4,12 @@ Screen Data Scanner - Extract tabular data from screen and export to CSV
 Works on both Mac and Windows
 """
 
+import time
+_STARTUP_T0 = time.perf_counter()
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import mss
-import numpy as np
-from PIL import Image, ImageTk, ImageEnhance, ImageFilter
-import pytesseract
-import pandas as pd
-import cv2
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import importlib
 import re
 import os
 import sys
@@ -19,326 +17,3613 @@ from datetime import datetime
 import threading
 import subprocess
 import json
+import argparse
+import glob
+import multiprocessing
+import shlex
+import hashlib
+import platform
+import random
+import difflib
+import tracemalloc
+import csv
+import io
+import sqlite3
+import tempfile
+import contextvars
+import itertools
+import contextlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Seconds spent importing each lazily loaded module, for --startup-profile
+_import_timings = {}
+_lazy_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """Stand-in for a heavy module that is imported on first attribute access.
+
+    numpy, pandas, OpenCV, Pillow, mss and pytesseract together take a large
+    share of cold start time, especially in PyInstaller onefile builds, so
+    the GUI comes up first and these load on demand (or on the warm-up
+    thread started by the app).
+    """
+
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+
+    def load(self):
+        """Import the module now if it has not been imported yet"""
+        if self._module is None:
+            with _lazy_import_lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_import is not None:
+                        self._on_import(module)
+                    _import_timings[self._name] = time.perf_counter() - start
+                    self._module = module
+        return self._module
 
-# Configure Tesseract path for Windows
-if sys.platform == 'win32':
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+def _configure_tesseract(module):
+    """Point pytesseract at a standard Tesseract install on Windows"""
+    if sys.platform != 'win32':
+        return
     # Common Tesseract installation paths on Windows
     tesseract_paths = [
         r'C:\Program Files\Tesseract-OCR\tesseract.exe',
         r'C:\Program Files (x86)\Tesseract-OCR\tesseract.exe',
         r'C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe'.format(os.getenv('USERNAME', '')),
     ]
-    
+
     for path in tesseract_paths:
         if os.path.exists(path):
-            pytesseract.pytesseract.tesseract_cmd = path
+            module.pytesseract.tesseract_cmd = path
             break
 
 
-class ScreenScannerApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Screen Data Scanner")
-        self.root.geometry("800x600")
-        
-        # Variables
-        self.captured_image = None
-        self.processed_data = None
-        self.screenshot_path = None
-        self.selected_window = None  # Store selected window info
-        
-        # Setup GUI
-        self.setup_ui()
-        
-        # Check for Tesseract
-        self.check_tesseract()
-    
-    def setup_ui(self):
-        """Create the user interface"""
-        # Main frame
-        main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Title
-        title_label = ttk.Label(main_frame, text="Screen Data Scanner", 
-                               font=("Arial", 16, "bold"))
-        title_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
-        
-        # Tabs
-        notebook = ttk.Notebook(main_frame)
-        notebook.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+# Heavy dependencies, imported lazily
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
+cv2 = LazyModule('cv2')
+mss = LazyModule('mss')
+pytesseract = LazyModule('pytesseract', on_import=_configure_tesseract)
+Image = LazyModule('PIL.Image')
+ImageTk = LazyModule('PIL.ImageTk')
+ImageDraw = LazyModule('PIL.ImageDraw')
+ImageFont = LazyModule('PIL.ImageFont')
 
-        scan_tab = ttk.Frame(notebook, padding="10")
-        budget_tab = ttk.Frame(notebook, padding="10")
-        notebook.add(scan_tab, text="Screen Scan")
-        notebook.add(budget_tab, text="Wage Budget")
+# Loaded in this order by the GUI warm-up thread
+WARM_UP_MODULES = (np, cv2, Image, pytesseract, pd, mss, ImageTk)
 
-        # Instructions
-        instructions = ttk.Label(
-            scan_tab,
-            text="1. Click 'Select Window' to choose a window, or 'Select Area' for manual selection\n"
-                 "2. Preview and adjust if needed\n"
-                 "3. Click 'Extract Data' to process\n"
-                 "4. Click 'Export to CSV' to save",
-            justify=tk.LEFT,
-        )
-        instructions.grid(row=0, column=0, columnspan=2, pady=(0, 20), sticky=tk.W)
-        
-        # Buttons frame
-        button_frame = ttk.Frame(scan_tab)
-        button_frame.grid(row=1, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
-        for idx in range(5):
-            button_frame.columnconfigure(idx, weight=1, uniform="scan_buttons")
-        
-        # Select Window button
-        self.select_window_btn = ttk.Button(button_frame, text="Select Window",
-                                           command=self.select_window)
-        self.select_window_btn.grid(row=0, column=0, padx=5, sticky=(tk.W, tk.E))
-        
-        # Select Area button
-        self.select_btn = ttk.Button(button_frame, text="Select Area to Scan",
-                                     command=self.select_area)
-        self.select_btn.grid(row=0, column=1, padx=5, sticky=(tk.W, tk.E))
-        
-        # Extract Data button
-        self.extract_btn = ttk.Button(button_frame, text="Extract Data",
-                                      command=self.extract_data,
-                                      state=tk.DISABLED)
-        self.extract_btn.grid(row=0, column=2, padx=5, sticky=(tk.W, tk.E))
-        
-        # Export CSV button
-        self.export_btn = ttk.Button(button_frame, text="Export to CSV",
-                                     command=self.export_csv,
-                                     state=tk.DISABLED)
-        self.export_btn.grid(row=0, column=3, padx=5, sticky=(tk.W, tk.E))
+# Tesseract settings used for table extraction
+OCR_CONFIG = r'--oem 3 --psm 6'  # Assume uniform block of text
 
-        # Upload Screenshot button
-        self.upload_btn = ttk.Button(button_frame, text="Upload Screenshot",
-                                     command=self.upload_screenshot)
-        self.upload_btn.grid(row=0, column=4, padx=5, sticky=(tk.W, tk.E))
-        
-        # Wage budget estimator frame
-        budget_frame = ttk.LabelFrame(budget_tab, text="Wage Budget Estimator", padding="10")
-        budget_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
-        budget_frame.columnconfigure(1, weight=1)
-        budget_frame.columnconfigure(3, weight=1)
+# Single text line, used when OCRing individual table cells
+CELL_OCR_CONFIG = r'--oem 3 --psm 7'
 
-        ttk.Label(budget_frame, text="Current balance:").grid(row=0, column=0, sticky=tk.W)
-        ttk.Label(budget_frame, text="Balance a year ago:").grid(row=1, column=0, sticky=tk.W)
-        ttk.Label(budget_frame, text="Prize money (actual):").grid(row=2, column=0, sticky=tk.W)
-        ttk.Label(budget_frame, text="Prize money (expected):").grid(row=3, column=0, sticky=tk.W)
-        ttk.Label(budget_frame, text="Net transfer spend:").grid(row=0, column=2, sticky=tk.W)
-        ttk.Label(budget_frame, text="Current wages:").grid(row=1, column=2, sticky=tk.W)
-        ttk.Label(budget_frame, text="Squad size:").grid(row=2, column=2, sticky=tk.W)
+# How extracted text is split into columns: free text heuristics, a
+# detected table grid with one OCR call per cell, or clustering of the
+# word boxes from a single OCR pass
+LAYOUT_MODES = ('text', 'grid', 'boxes')
 
-        self.current_balance_var = tk.StringVar()
-        self.prior_balance_var = tk.StringVar()
-        self.prize_actual_var = tk.StringVar()
-        self.prize_expected_var = tk.StringVar()
-        self.net_transfer_var = tk.StringVar()
-        self.current_wages_var = tk.StringVar()
-        self.squad_size_var = tk.StringVar(value="25")
-        self.wage_period_var = tk.StringVar(value="annual")
+# Word box fields returned by the OCR engines' image_to_data
+WORD_BOX_FIELDS = ('left', 'top', 'width', 'height', 'conf', 'text')
 
-        self.current_balance_entry = ttk.Entry(budget_frame, textvariable=self.current_balance_var, width=18)
-        self.current_balance_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
-        self.prior_balance_entry = ttk.Entry(budget_frame, textvariable=self.prior_balance_var, width=18)
-        self.prior_balance_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
-        self.prize_actual_entry = ttk.Entry(budget_frame, textvariable=self.prize_actual_var, width=18)
-        self.prize_actual_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
-        self.prize_expected_entry = ttk.Entry(budget_frame, textvariable=self.prize_expected_var, width=18)
-        self.prize_expected_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
-        self.net_transfer_entry = ttk.Entry(budget_frame, textvariable=self.net_transfer_var, width=18)
-        self.net_transfer_entry.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
-        self.current_wages_entry = ttk.Entry(budget_frame, textvariable=self.current_wages_var, width=18)
-        self.current_wages_entry.grid(row=1, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
-        self.squad_size_entry = ttk.Entry(budget_frame, textvariable=self.squad_size_var, width=18)
-        self.squad_size_entry.grid(row=2, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
+# Delay between frames while stitching a scrolling list
+SCROLL_CAPTURE_INTERVAL_MS = 250
 
-        wage_period_label = ttk.Label(budget_frame, text="Wage period:")
-        wage_period_label.grid(row=3, column=2, sticky=tk.W, pady=(4, 0))
-        wage_period_frame = ttk.Frame(budget_frame)
-        wage_period_frame.grid(row=3, column=3, sticky=tk.W, pady=(4, 0))
-        ttk.Radiobutton(
-            wage_period_frame,
-            text="Weekly",
-            variable=self.wage_period_var,
-            value="weekly",
-            command=self.calculate_wage_budget,
-        ).pack(side=tk.LEFT)
-        ttk.Radiobutton(
-            wage_period_frame,
-            text="Annual",
-            variable=self.wage_period_var,
-            value="annual",
-            command=self.calculate_wage_budget,
-        ).pack(side=tk.LEFT, padx=(8, 0))
+# Watch mode: tile size in pixels and per-pixel change needed to re-OCR
+WATCH_TILE_SIZE = 16
+WATCH_DIFF_THRESHOLD = 24
 
-        self._money_trace_lock = False
-        for entry, var in (
-            (self.current_balance_entry, self.current_balance_var),
-            (self.prior_balance_entry, self.prior_balance_var),
-            (self.prize_actual_entry, self.prize_actual_var),
-            (self.prize_expected_entry, self.prize_expected_var),
-            (self.net_transfer_entry, self.net_transfer_var),
-            (self.current_wages_entry, self.current_wages_var),
-        ):
-            var.trace_add("write", lambda *args, v=var, e=entry: self._format_money_live(v, e))
-        self.squad_size_var.trace_add(
-            "write",
-            lambda *args: self._format_int_live(self.squad_size_var, self.squad_size_entry),
-        )
+# File types accepted for screenshots
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.webp')
 
-        calc_btn = ttk.Button(budget_frame, text="Calculate", command=self.calculate_wage_budget)
-        calc_btn.grid(row=4, column=0, columnspan=4, pady=(8, 6))
 
-        self.current_balance_display_var = tk.StringVar(value="Current balance: -")
-        self.expected_balance_var = tk.StringVar(value="Expected balance (1y): -")
-        self.profit_var = tk.StringVar(value="Profit: -")
-        self.adjusted_profit_var = tk.StringVar(value="Adjusted profit: -")
-        self.total_budget_var = tk.StringVar(value="Available wages: -")
-        self.current_wages_display_var = tk.StringVar(value="Current wages: -")
-        self.expected_wages_var = tk.StringVar(value="Expected wages budget: -")
-        self.avg_spend_var = tk.StringVar(value="Average per player: -")
-        self.max_spend_var = tk.StringVar(value="Max per player (2x avg): -")
+# OCR backends selectable with --ocr-backend
+OCR_BACKENDS = ('auto', 'tesserocr', 'pytesseract')
 
-        ttk.Label(budget_frame, textvariable=self.current_balance_display_var).grid(row=5, column=0, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.expected_balance_var).grid(row=5, column=2, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.profit_var).grid(row=6, column=0, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.adjusted_profit_var).grid(row=6, column=2, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.total_budget_var).grid(row=7, column=0, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.current_wages_display_var).grid(row=7, column=2, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.expected_wages_var).grid(row=8, column=0, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.avg_spend_var).grid(row=8, column=2, columnspan=2, sticky=tk.W)
-        ttk.Label(budget_frame, textvariable=self.max_spend_var).grid(row=9, column=0, columnspan=2, sticky=tk.W)
 
-        # Preview frame
-        preview_label = ttk.Label(scan_tab, text="Preview:", font=("Arial", 10, "bold"))
-        preview_label.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(10, 5))
-        
-        # Canvas for image preview
-        self.canvas = tk.Canvas(scan_tab, width=750, height=400, bg="white", 
-                               relief=tk.SUNKEN, borderwidth=2)
-        self.canvas.grid(row=3, column=0, columnspan=2, pady=10)
-        
-        # Scrollbar for canvas
-        scrollbar = ttk.Scrollbar(scan_tab, orient=tk.VERTICAL, command=self.canvas.yview)
-        scrollbar.grid(row=3, column=2, sticky=(tk.N, tk.S))
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-        
-        # Status bar
-        self.status_var = tk.StringVar(value="Ready - Click 'Select Area' to begin")
-        status_bar = ttk.Label(scan_tab, textvariable=self.status_var, 
-                              relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
-        
-        # Progress bar
-        self.progress = ttk.Progressbar(scan_tab, mode='indeterminate')
-        self.progress.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
-        
-        # Configure grid weights
-        self.root.columnconfigure(0, weight=1)
-        self.root.rowconfigure(0, weight=1)
-        main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(1, weight=1)
-        scan_tab.columnconfigure(0, weight=1)
-        scan_tab.columnconfigure(1, weight=1)
-        scan_tab.rowconfigure(3, weight=1)
-        budget_tab.columnconfigure(0, weight=1)
+class JobCancelled(Exception):
+    """Raised inside an extraction job's OCR work once the job is cancelled"""
 
-    def _parse_money_input(self, value):
-        """Parse money input allowing commas and currency symbols."""
-        if value is None:
-            return 0.0
-        cleaned = re.sub(r'[^0-9.\-]', '', str(value))
-        if cleaned in ('', '-', '.', '-.'):
-            return 0.0
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
 
-    def _format_money(self, value):
-        """Format money value with commas and sensible decimals."""
-        if float(value).is_integer():
-            return f"{value:,.0f}"
-        return f"{value:,.2f}"
+# The ExtractionJob whose work runs in this context; _ocr_map carries it
+# over to the OCR pool threads
+_current_job = contextvars.ContextVar('current_job', default=None)
 
-    def _format_money_var(self, var):
-        """Format a money StringVar in-place with commas."""
-        raw = (var.get() or "").strip()
-        if raw == "":
-            return
-        value = self._parse_money_input(raw)
-        var.set(self._format_money(value))
 
-    def _normalize_money_input(self, raw):
-        """Keep only digits, one decimal point, and leading minus."""
-        cleaned = re.sub(r'[^0-9.\-]', '', raw)
-        if not cleaned:
-            return ""
-        negative = cleaned.startswith('-')
-        cleaned = cleaned.replace('-', '')
-        if cleaned.count('.') > 1:
-            parts = cleaned.split('.')
-            cleaned = parts[0] + '.' + ''.join(parts[1:])
-        cleaned = ('-' if negative else '') + cleaned
-        return cleaned
+def check_cancelled():
+    """Raise JobCancelled if the job running this code has been cancelled"""
+    job = _current_job.get()
+    if job is not None and job.cancelled:
+        raise JobCancelled()
 
-    def _format_money_live(self, var, entry):
-        """Live format input with commas while typing."""
-        if self._money_trace_lock:
-            return
-        raw = var.get()
-        if raw is None:
-            return
-        normalized = self._normalize_money_input(raw)
-        if normalized in ("", "-", "."):
-            return
-        value = self._parse_money_input(normalized)
-        formatted = self._format_money(value)
-        if formatted == raw:
-            return
-        self._money_trace_lock = True
-        try:
-            var.set(formatted)
-            if entry is not None:
-                entry.icursor(tk.END)
-        finally:
-            self._money_trace_lock = False
 
-    def _format_int_live(self, var, entry):
-        """Live format integer input while typing."""
-        if self._money_trace_lock:
-            return
-        raw = var.get()
-        if raw is None:
-            return
-        cleaned = re.sub(r'[^0-9]', '', str(raw))
-        if cleaned == "":
-            return
-        if cleaned == raw:
-            return
-        self._money_trace_lock = True
-        try:
+def split_tesseract_config(config):
+    """Split a tesseract config string into arguments.
+
+    Windows splitting is non-POSIX so paths keep their backslashes, which
+    leaves double quotes around quoted arguments; they are removed here so
+    a value such as a whitelist with spaces works on every platform.
+    """
+    tokens = shlex.split(config or '', posix=(sys.platform != 'win32'))
+    return [t[1:-1] if len(t) > 1 and t[0] == t[-1] == '"' else t for t in tokens]
+
+
+def quote_config_value(value):
+    """Quote a config argument so split_tesseract_config returns it unchanged.
+
+    Windows splitting has no escapes, so there a value cannot hold both
+    whitespace and a double quote; the double quotes are dropped then.
+    """
+    if sys.platform != 'win32':
+        return shlex.quote(value)
+    if '"' not in value:
+        return f'"{value}"'
+    if any(c.isspace() for c in value):
+        return '"{}"'.format(value.replace('"', ''))
+    return value
+
+
+# Tesseract variables read only when a model is loaded, besides load_*
+TESSERACT_INIT_VARIABLES = ('user_words_file', 'user_words_suffix',
+                            'user_patterns_file', 'user_patterns_suffix')
+
+
+def is_init_variable(name):
+    """True for Tesseract variables that only take effect when the model loads"""
+    return name.startswith('load_') or name in TESSERACT_INIT_VARIABLES
+
+
+def parse_tesseract_config(config):
+    """Split a tesseract command line config into its oem, psm and -c settings"""
+    settings = {'oem': 3, 'psm': 3, 'variables': {}, 'tessdata_dir': None}
+    tokens = split_tesseract_config(config)
+    idx = 0
+    while idx < len(tokens):
+        token = tokens[idx]
+        value = tokens[idx + 1] if idx + 1 < len(tokens) else None
+        if token == '--oem' and value is not None:
+            settings['oem'] = int(value)
+            idx += 2
+        elif token == '--psm' and value is not None:
+            settings['psm'] = int(value)
+            idx += 2
+        elif token == '--tessdata-dir' and value is not None:
+            settings['tessdata_dir'] = value.strip('"')
+            idx += 2
+        elif token == '-c' and value is not None and '=' in value:
+            key, val = value.split('=', 1)
+            settings['variables'][key] = val
+            idx += 2
+        elif token.startswith('-c') and '=' in token:
+            key, val = token[2:].split('=', 1)
+            settings['variables'][key] = val
+            idx += 1
+        else:
+            idx += 1
+    return settings
+
+
+class PytesseractEngine:
+    """OCR through the tesseract command line tool, one process per call.
+
+    The command is located and configured through pytesseract, but run
+    here so the process can be killed when its extraction job is cancelled.
+    """
+
+    name = 'pytesseract'
+
+    def __init__(self, lang='eng'):
+        self.lang = lang
+
+    def _run(self, image, config, *extra):
+        """Run tesseract on image and return what it prints"""
+        check_cancelled()
+        module = pytesseract.pytesseract
+        with _tesseract_input(image) as source:
+            args = [module.tesseract_cmd, source, 'stdout', '-l', self.lang]
+            args += split_tesseract_config(config)
+            args += extra
+            try:
+                proc = subprocess.Popen(args, **module.subprocess_args())
+            except FileNotFoundError:
+                raise module.TesseractNotFoundError() from None
+            job = _current_job.get()
+            if job is not None:
+                job._track(proc)
+            try:
+                out, err = proc.communicate()
+            finally:
+                if job is not None:
+                    job._untrack(proc)
+        check_cancelled()
+        if proc.returncode:
+            raise module.TesseractError(proc.returncode, err.decode(errors='replace').strip())
+        return out.decode('utf-8', errors='replace')
+
+    def image_to_string(self, image, config=OCR_CONFIG):
+        """Recognize text in a PIL image or numpy array"""
+        return self._run(image, config)
+
+    def image_to_data(self, image, config=OCR_CONFIG):
+        """Recognize words with their bounding boxes as a dict of lists"""
+        return parse_tsv_words(self._run(image, config, 'tsv'))
+
+
+@contextlib.contextmanager
+def _tesseract_input(image):
+    """Write an image to a temp file for the tesseract command; yields its path.
+
+    Gray and RGB uint8 arrays are written as an uncompressed PGM/PPM
+    straight from the array; other images go through PIL as a PNG.
+    """
+    if isinstance(image, np.ndarray) and image.dtype == np.uint8 \
+            and (image.ndim == 2 or (image.ndim == 3 and image.shape[2] == 3)):
+        magic, suffix = (b'P5', '.pgm') if image.ndim == 2 else (b'P6', '.ppm')
+        fd, path = tempfile.mkstemp(prefix='tess_', suffix=suffix)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b'%s\n%d %d\n255\n' % (magic, image.shape[1], image.shape[0]))
+            f.write(np.ascontiguousarray(image))
+    else:
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        fd, path = tempfile.mkstemp(prefix='tess_', suffix='.png')
+        os.close(fd)
+        image.convert('RGB' if image.mode not in ('L', 'RGB') else image.mode).save(path)
+    try:
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class TesserocrEngine:
+    """Long-lived in-process Tesseract using the tesserocr C API bindings.
+
+    The language model is loaded once per thread and reused for every call,
+    and numpy buffers are handed to Tesseract directly without a temp file.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, lang='eng'):
+        import tesserocr  # Optional dependency, ImportError selects the fallback
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self._local = threading.local()
+        # Load the model now so a missing traineddata file fails early
+        self._get_api(parse_tesseract_config(OCR_CONFIG))
+
+    def _get_api(self, settings):
+        """Return this thread's API instance set up for the given settings.
+
+        One instance is loaded per set of init-only settings (OEM, model
+        directory, dictionaries); other variables such as whitelists are
+        set on it for the call and restored when a later call omits them.
+        """
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        init_vars = {name: value for name, value in settings['variables'].items()
+                     if is_init_variable(name)}
+        key = (settings['oem'], settings['tessdata_dir'], tuple(sorted(init_vars.items())))
+        entry = apis.get(key)
+        if entry is None:
+            kwargs = {
+                'lang': self.lang,
+                'oem': settings['oem'],
+                'variables': init_vars,
+            }
+            if settings['tessdata_dir']:
+                kwargs['path'] = os.path.join(settings['tessdata_dir'], '')
+            # The API and the original values of the variables set on it
+            entry = apis[key] = (self._tesserocr.PyTessBaseAPI(**kwargs), {})
+        api, saved = entry
+        runtime = {name: value for name, value in settings['variables'].items()
+                   if name not in init_vars}
+        for name in [name for name in saved if name not in runtime]:
+            api.SetVariable(name, saved.pop(name))
+        for name, value in runtime.items():
+            if name not in saved:
+                saved[name] = api.GetVariableAsString(name) or ''
+            api.SetVariable(name, value)
+        return api
+
+    def _set_image(self, api, image, settings):
+        api.SetPageSegMode(settings['psm'])
+        if isinstance(image, np.ndarray):
+            if image.dtype != np.uint8:
+                image = image.astype(np.uint8)
+            height, width = image.shape[:2]
+            channels = 1 if image.ndim == 2 else image.shape[2]
+            # tesserocr only accepts bytes; tobytes() is the one copy, and it
+            # also packs cell crops that are views into a larger image
+            api.SetImageBytes(image.tobytes(), width, height, channels,
+                              width * channels)
+        else:
+            api.SetImage(image)
+
+    def image_to_string(self, image, config=OCR_CONFIG):
+        """Recognize text in a PIL image or numpy array"""
+        check_cancelled()
+        settings = parse_tesseract_config(config)
+        api = self._get_api(settings)
+        self._set_image(api, image, settings)
+        return api.GetUTF8Text()
+
+    def image_to_data(self, image, config=OCR_CONFIG):
+        """Recognize words with their bounding boxes as a dict of lists"""
+        check_cancelled()
+        settings = parse_tesseract_config(config)
+        api = self._get_api(settings)
+        self._set_image(api, image, settings)
+        return parse_tsv_words(api.GetTSVText(0))
+
+
+def parse_tsv_words(tsv):
+    """Parse Tesseract TSV output into the image_to_data dict layout"""
+    data = {field: [] for field in WORD_BOX_FIELDS}
+    for line in tsv.splitlines():
+        parts = line.split('\t')
+        if len(parts) < 12 or not parts[0].isdigit():
+            continue  # Header or malformed line
+        data['left'].append(int(parts[6]))
+        data['top'].append(int(parts[7]))
+        data['width'].append(int(parts[8]))
+        data['height'].append(int(parts[9]))
+        data['conf'].append(float(parts[10]))
+        data['text'].append(parts[11])
+    return data
+
+
+_ocr_engines = {}
+_ocr_engine_lock = threading.Lock()
+
+
+def get_ocr_engine(backend='auto'):
+    """Return the shared OCR engine, preferring the in-process backend.
+
+    'auto' uses tesserocr when it is installed and can load the language
+    model, otherwise it falls back to pytesseract.
+    """
+    with _ocr_engine_lock:
+        engine = _ocr_engines.get(backend)
+        if engine is not None:
+            return engine
+        if backend == 'pytesseract':
+            engine = PytesseractEngine()
+        elif backend == 'tesserocr':
+            engine = TesserocrEngine()
+        else:
+            try:
+                engine = TesserocrEngine()
+            except Exception:
+                engine = PytesseractEngine()
+        _ocr_engines[backend] = engine
+        return engine
+
+
+def to_grayscale(image):
+    """Convert a PIL image, RGB array or BGRA screen frame to a grayscale numpy array.
+
+    Four-channel arrays are taken to be BGRA frames from ScreenCapture;
+    arrays are not copied when they are already grayscale.
+    """
+    if isinstance(image, np.ndarray):
+        img_array = image
+        codes = {3: cv2.COLOR_RGB2GRAY, 4: cv2.COLOR_BGRA2GRAY}
+    else:
+        img_array = np.asarray(image)
+        codes = {3: cv2.COLOR_RGB2GRAY, 4: cv2.COLOR_RGBA2GRAY}
+    if img_array.ndim == 3:
+        return cv2.cvtColor(img_array, codes[img_array.shape[2]])
+    return np.ascontiguousarray(img_array)
+
+
+def _stage_invert_dark(gray):
+    """Invert dark-theme captures so text is dark on a light background"""
+    if gray.mean() < 127:
+        return cv2.bitwise_not(gray)
+    return gray
+
+
+def _stage_scale(gray, factor=2.0):
+    """Resize by a fixed factor (area averaging down, cubic up)"""
+    if factor == 1.0:
+        return gray
+    interpolation = cv2.INTER_AREA if factor < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(gray, None, fx=factor, fy=factor, interpolation=interpolation)
+
+
+# Tesseract reads best when capitals are about this many pixels tall
+OCR_TARGET_TEXT_HEIGHT = 30
+
+
+def estimate_text_height(gray, min_glyphs=10):
+    """Estimate the dominant glyph height of dark text on a light background.
+
+    Connected components of the Otsu-binarized image are filtered down to
+    glyph-like shapes (dropping specks, table rules and stripes) and the
+    75th percentile of their heights is returned, which lands on capital
+    and digit height rather than x-height. Returns None when fewer than
+    min_glyphs glyphs are found.
+    """
+    _, ink = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    widths = stats[1:, cv2.CC_STAT_WIDTH]
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    glyphs = ((heights >= 4) & (heights < 0.9 * gray.shape[0])
+              & (widths <= 3 * heights) & (heights <= 8 * widths))
+    if np.count_nonzero(glyphs) < min_glyphs:
+        return None
+    return float(np.percentile(heights[glyphs], 75))
+
+
+def _stage_normalize_height(gray, target=OCR_TARGET_TEXT_HEIGHT, tolerance=0.2,
+                            min_factor=0.25, max_factor=4.0):
+    """Rescale so text is about target pixels tall.
+
+    Oversized (e.g. Retina) captures are shrunk, which cuts OCR time
+    roughly with the pixel count, and tiny text is enlarged. Images within
+    tolerance of the target, or without measurable text, are returned as is.
+    """
+    height = estimate_text_height(gray)
+    if height is None:
+        return gray
+    factor = min(max(target / height, min_factor), max_factor)
+    if abs(factor - 1.0) <= tolerance:
+        return gray
+    return _stage_scale(gray, factor)
+
+
+def _stage_median(gray, ksize=3):
+    """Median blur, removes speckle noise before thresholding"""
+    return cv2.medianBlur(gray, ksize)
+
+
+def noise_level(gray):
+    """Estimate pixel noise as the median absolute Laplacian.
+
+    Screen-rendered text has perfectly flat backgrounds, so the median is
+    zero; photos, JPEG artifacts and scaled captures push it up.
+    """
+    sample = gray[::2, ::2] if gray.size > 1_000_000 else gray
+    laplacian = cv2.Laplacian(sample, cv2.CV_16S, ksize=1)
+    return float(np.median(np.abs(laplacian)))
+
+
+def _stage_auto_denoise(gray, max_clean_noise=1.0, ksize=3):
+    """Median blur only when the capture is not clean screen-rendered text"""
+    if noise_level(gray) <= max_clean_noise:
+        return gray
+    return cv2.medianBlur(gray, ksize)
+
+
+def _stage_otsu(gray):
+    """Global Otsu binarization"""
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+
+def _stage_adaptive(gray, block_size=31, c=10):
+    """Local (adaptive Gaussian) binarization, copes with gradients and stripes"""
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                 cv2.THRESH_BINARY, block_size, c)
+
+
+def _stage_morph_open(binary, size=2):
+    """Remove isolated specks from a binary image (text is dark)"""
+    kernel = np.ones((size, size), np.uint8)
+    # Text is black, so closing the image opens the text layer
+    return cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel)
+
+
+def _stage_nlmeans(gray, strength=10):
+    """Non-local means denoising (slow, mostly useful for photos)"""
+    return cv2.fastNlMeansDenoising(gray, None, strength, 7, 21)
+
+
+# Preprocessing stages. Contract: a stage takes a 2-D, C-contiguous uint8
+# numpy array and returns one; it may return its input unchanged or a new
+# buffer, and must not modify its input in place. 'grayscale' is the entry
+# point and also accepts the raw capture (PIL image, RGB array or BGRA
+# screen frame). PIL images only appear at the file-load and preview
+# boundaries, never between stages.
+PREPROCESS_STAGES = {
+    'grayscale': to_grayscale,
+    'invert_dark': _stage_invert_dark,
+    'scale': _stage_scale,
+    'normalize_height': _stage_normalize_height,
+    'median': _stage_median,
+    'auto_denoise': _stage_auto_denoise,
+    'otsu': _stage_otsu,
+    'adaptive': _stage_adaptive,
+    'morph_open': _stage_morph_open,
+    'nlmeans': _stage_nlmeans,
+}
+
+# Named stage lists. Entries are a stage name or (name, {params}).
+PREPROCESS_PRESETS = {
+    # Clean screenshots: bring text to OCR size and binarize
+    'fast': ['grayscale', 'invert_dark', 'normalize_height', 'otsu'],
+    # Default: denoise only captures that are not clean screen text. The
+    # noise check runs before rescaling, which would soften clean text.
+    'auto': ['grayscale', 'invert_dark', 'auto_denoise', 'normalize_height', 'otsu'],
+    # Small or noisy text: normalize text size and threshold locally
+    'accurate': ['grayscale', 'invert_dark', 'auto_denoise', 'normalize_height',
+                 'adaptive', 'morph_open'],
+    # The original fixed chain, kept for comparison in benchmarks
+    'legacy': ['grayscale', 'otsu', 'nlmeans'],
+}
+
+DEFAULT_PRESET = 'auto'
+
+
+def preprocess_image(image, preset=DEFAULT_PRESET, trace=None):
+    """Preprocess image to improve OCR accuracy.
+
+    preset is a name from PREPROCESS_PRESETS or a list of stages. Returns a
+    binarized grayscale numpy array. If a trace list is given, one dict per
+    stage is appended with its name, seconds and whether it allocated a new
+    buffer ('copied').
+    """
+    stages = PREPROCESS_PRESETS[preset] if isinstance(preset, str) else preset
+    img = image
+    for stage in stages:
+        name, params = (stage, {}) if isinstance(stage, str) else stage
+        start = time.perf_counter()
+        out = PREPROCESS_STAGES[name](img, **params)
+        if not (isinstance(out, np.ndarray) and out.ndim == 2 and out.dtype == np.uint8
+                and out.flags.c_contiguous):
+            raise TypeError(f"Preprocess stage '{name}' must return a 2-D contiguous uint8 array")
+        if trace is not None:
+            trace.append({
+                'stage': name,
+                'seconds': round(time.perf_counter() - start, 6),
+                'copied': not (isinstance(img, np.ndarray) and np.shares_memory(out, img)),
+            })
+        img = out
+    return img
+
+
+def parse_text_to_rows(text):
+    """Parse OCR text into rows of data"""
+    lines = text.strip().split('\n')
+    rows = []
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Try to split by common delimiters
+        # First, try tab
+        if '\t' in line:
+            cells = [cell.strip() for cell in line.split('\t')]
+        # Then try multiple spaces (at least 2)
+        elif '  ' in line:
+            cells = re.split(r'\s{2,}', line)
+        # Then try pipe
+        elif '|' in line:
+            cells = [cell.strip() for cell in line.split('|')]
+        # Then try comma
+        elif ',' in line:
+            cells = [cell.strip() for cell in line.split(',')]
+        else:
+            # Single column
+            cells = [line]
+
+        # Filter out empty cells
+        cells = [cell for cell in cells if cell]
+
+        if cells:
+            rows.append(cells)
+
+    # Normalize row lengths (pad shorter rows)
+    if rows:
+        max_cols = max(len(row) for row in rows)
+        normalized_rows = []
+        for row in rows:
+            while len(row) < max_cols:
+                row.append('')
+            normalized_rows.append(row)
+        return normalized_rows
+
+    return []
+
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+def get_ocr_pool():
+    """Return the shared thread pool used for concurrent OCR calls.
+
+    The pool is long-lived so per-thread OCR engines stay warm between
+    extractions.
+    """
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            _ocr_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                           thread_name_prefix="ocr")
+        return _ocr_pool
+
+
+def find_row_bands(binary, min_gap=2, min_height=3):
+    """Find text-line bands in a binarized image from its row projection.
+
+    Returns a list of (top, bottom) row ranges containing ink. Runs separated
+    by fewer than min_gap blank rows are merged, runs shorter than
+    min_height are treated as noise.
+    """
+    arr = np.asarray(binary)
+    if arr.ndim != 2 or arr.size == 0:
+        return []
+
+    # Background is whichever of black/white dominates the binarized image
+    background = 255 if arr.mean() >= 127 else 0
+    has_ink = (arr != background).sum(axis=1) > 0
+
+    edges = np.diff(np.concatenate(([0], has_ink.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if len(starts) == 0:
+        return []
+
+    # Merge runs split by tiny gaps (e.g. dots above letters)
+    keep = (starts[1:] - ends[:-1]) >= min_gap
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+
+    tall = (ends - starts) >= min_height
+    return list(zip(starts[tall].tolist(), ends[tall].tolist()))
+
+
+def group_row_bands(bands, height, groups):
+    """Split bands into up to `groups` contiguous strips for parallel OCR.
+
+    Strip boundaries fall halfway through the blank gap between bands so no
+    text line is cut and every strip keeps some background margin.
+    """
+    groups = max(1, min(groups, len(bands)))
+    if groups == 1:
+        return [(0, height)]
+
+    chunks = np.array_split(np.arange(len(bands)), groups)
+    strips = []
+    top = 0
+    for idx, chunk in enumerate(chunks):
+        if idx == len(chunks) - 1:
+            bottom = height
+        else:
+            last_end = bands[chunk[-1]][1]
+            next_start = bands[chunks[idx + 1][0]][0]
+            bottom = (last_end + next_start) // 2
+        strips.append((top, bottom))
+        top = bottom
+    return strips
+
+
+def _ocr_map(func, items, workers=None):
+    """Apply an OCR function to items, concurrently unless workers is 1.
+
+    Runs inside the calling extraction job (if any): items stop being
+    started once the job is cancelled, and each finished item counts
+    towards the job's progress.
+    """
+    job = _current_job.get()
+    if job is not None:
+        job._add_work(len(items))
+
+    def run(item):
+        check_cancelled()
+        result = func(item)
+        if job is not None:
+            job._work_done()
+        return result
+
+    if workers == 1 or len(items) <= 1:
+        return [run(item) for item in items]
+    pool = get_ocr_pool()
+    # Each task gets its own copy of the context so it sees the current job
+    futures = [pool.submit(contextvars.copy_context().run, run, item) for item in items]
+    try:
+        return [future.result() for future in futures]
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+
+
+def ocr_row_bands(binary, engine, config=OCR_CONFIG, workers=None):
+    """OCR a binarized image as row-band strips in parallel, in reading order"""
+    arr = np.asarray(binary)
+    workers = workers or os.cpu_count() or 1
+    bands = find_row_bands(arr)
+    strips = group_row_bands(bands, arr.shape[0], workers)
+    if len(strips) == 1:
+        return engine.image_to_string(arr, config=config)
+
+    crops = [arr[top:bottom] for top, bottom in strips]
+    texts = _ocr_map(lambda crop: engine.image_to_string(crop, config=config),
+                     crops, workers)
+    return '\n'.join(text.strip('\n') for text in texts)
+
+
+def _runs(mask):
+    """Return (start, end) index pairs of the True runs in a 1-D mask"""
+    edges = np.diff(np.concatenate(([0], np.asarray(mask).view(np.int8), [0])))
+    return list(zip(np.flatnonzero(edges == 1).tolist(),
+                    np.flatnonzero(edges == -1).tolist()))
+
+
+def _line_positions(line_mask, axis):
+    """Centre coordinates of ruled lines found by connected components"""
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(line_mask, connectivity=8)
+    positions = sorted(int(round(centroids[idx][1 - axis])) for idx in range(1, count))
+    # Collapse double-drawn lines a few pixels apart
+    merged = []
+    for pos in positions:
+        if merged and pos - merged[-1] <= 3:
+            continue
+        merged.append(pos)
+    return merged
+
+
+def _bounds_from_lines(lines, size, ink_profile, min_size=5):
+    """Turn ruled line positions into cell ranges, keeping inked margins"""
+    edges = [0] + lines + [size]
+    bounds = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end - start < min_size:
+            continue
+        # Outer margins only count if there is text outside the ruling
+        if (start == 0 or end == size) and not ink_profile[start:end].any():
+            continue
+        bounds.append((start, end))
+    return bounds
+
+
+def _zebra_stripes(gray, min_height=8, min_contrast=4):
+    """Detect rows of alternating background shades (FM zebra tables)"""
+    if gray is None:
+        return []
+    # The per-row median ignores text pixels and follows the stripe shade
+    shade = np.median(gray, axis=1).astype(np.int16)
+    changes = np.flatnonzero(np.abs(np.diff(shade)) >= min_contrast) + 1
+    edges = [0] + changes.tolist() + [len(shade)]
+    stripes = [(a, b) for a, b in zip(edges[:-1], edges[1:]) if b - a >= min_height]
+    if len(stripes) < 3:
+        return []
+
+    # Require the shades to actually alternate light/dark
+    levels = np.array([shade[a:b].mean() for a, b in stripes])
+    steps = np.sign(np.diff(levels))
+    if not np.all(steps[1:] == -steps[:-1]):
+        return []
+    return stripes
+
+
+def _column_gaps(ink, row_height):
+    """Split columns at vertical gaps wider than a fraction of the text height"""
+    has_ink = ink.any(axis=0)
+    min_gap = max(8, int(row_height * 0.8))
+    blank = _runs(~has_ink)
+    width = ink.shape[1]
+    cuts = [0]
+    for start, end in blank:
+        if start == 0 or end == width:
+            continue
+        if end - start >= min_gap:
+            cuts.append((start + end) // 2)
+    cuts.append(width)
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if ink[:, a:b].any()]
+
+
+def detect_table_grid(binary, gray=None):
+    """Detect the cell grid of a table in a binarized image.
+
+    Rows come from ruled horizontal lines, zebra row stripes in the
+    grayscale image, or text-line bands, in that order of preference.
+    Columns come from ruled vertical lines or wide blank gaps in the
+    vertical ink profile. Returns (row_bounds, col_bounds, line_mask).
+    """
+    arr = np.asarray(binary)
+    height, width = arr.shape
+    background = 255 if arr.mean() >= 127 else 0
+    ink = (arr != background).astype(np.uint8)
+
+    # Morphological opening keeps only long straight strokes
+    h_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(20, width // 4), 1))
+    v_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(20, height // 4)))
+    h_lines = cv2.morphologyEx(ink, cv2.MORPH_OPEN, h_kernel)
+    v_lines = cv2.morphologyEx(ink, cv2.MORPH_OPEN, v_kernel)
+    line_mask = cv2.bitwise_or(h_lines, v_lines)
+    text_ink = ink.astype(bool) & ~line_mask.astype(bool)
+
+    bands = find_row_bands(np.where(text_ink, 0, 255).astype(np.uint8))
+    row_height = int(np.median([b - a for a, b in bands])) if bands else 10
+
+    row_lines = _line_positions(h_lines, axis=0)
+    if len(row_lines) >= 2:
+        rows = _bounds_from_lines(row_lines, height, text_ink.any(axis=1))
+    else:
+        rows = _zebra_stripes(gray) if gray is not None and gray.shape == arr.shape else []
+        if len(rows) < len(bands) * 0.8:
+            # Stripes missing or merged: fall back to one row per text line
+            strips = group_row_bands(bands, height, len(bands)) if bands else []
+            rows = strips
+
+    col_lines = _line_positions(v_lines, axis=1)
+    if len(col_lines) >= 2:
+        cols = _bounds_from_lines(col_lines, width, text_ink.any(axis=0))
+    else:
+        cols = _column_gaps(text_ink, row_height)
+
+    return rows, cols, line_mask
+
+
+def _cell_crop(arr, background, top, bottom, left, right, border=6):
+    """Crop a cell and pad it with background, as Tesseract needs margins"""
+    crop = arr[top:bottom, left:right]
+    return cv2.copyMakeBorder(crop, border, border, border, border,
+                              cv2.BORDER_CONSTANT, value=int(background))
+
+
+def read_cell_text(engine, crop, config=CELL_OCR_CONFIG):
+    """OCR a single padded cell crop as one line of text"""
+    text = engine.image_to_string(crop, config=config)
+    return ' '.join(text.split())
+
+
+def read_table_grid(binary, engine, gray=None, workers=None):
+    """Detect the table grid and OCR every cell.
+
+    Returns (matrix, row_bounds, col_bounds) where matrix has one entry per
+    grid cell, empty cells included, so cells can be addressed by position.
+    """
+    arr = np.asarray(binary)
+    rows, cols, line_mask = detect_table_grid(arr, gray)
+    if not rows or not cols:
+        return [], rows, cols
+
+    background = 255 if arr.mean() >= 127 else 0
+    # Blank out ruling so borders are not read as | or l characters
+    clean = arr.copy()
+    clean[line_mask.astype(bool)] = background
+
+    cells = []
+    for r, (top, bottom) in enumerate(rows):
+        for c, (left, right) in enumerate(cols):
+            if (clean[top:bottom, left:right] != background).any():
+                cells.append((r, c, _cell_crop(clean, background, top, bottom, left, right)))
+
+    texts = _ocr_map(lambda cell: read_cell_text(engine, cell[2]), cells, workers)
+    matrix = [[''] * len(cols) for _ in rows]
+    for (r, c, _), text in zip(cells, texts):
+        matrix[r][c] = text
+    return matrix, rows, cols
+
+
+def ocr_table_grid(binary, engine, gray=None, workers=None):
+    """OCR each detected table cell separately and return a row matrix"""
+    matrix, _, _ = read_table_grid(binary, engine, gray, workers)
+    return [row for row in matrix if any(row)]
+
+
+def words_to_rows(data, row_factor=0.5, gap_factor=1.0, noise_ratio=0.2):
+    """Cluster OCR word boxes into a table by position.
+
+    Rows are formed by binning word y-centroids: a new row starts wherever
+    the sorted centroids jump by more than row_factor times the median word
+    height. Columns are split at x ranges that no word covers and that are
+    at least gap_factor word heights wide. Words that stick out of a column
+    covered in more than noise_ratio of the rows (OCR noise, one long name)
+    only count where that column is, so they do not bridge the gap to the
+    next column; sparse columns of their own (injury or loan flags) are
+    kept. Everything is vectorized so a capture with thousands of words
+    clusters in milliseconds.
+    """
+    text = np.array([str(t).strip() for t in data['text']], dtype=object)
+    conf = np.asarray(data['conf'], dtype=float)
+    keep = (conf >= 0) & (text != '')
+    if not keep.any():
+        return []
+
+    left = np.asarray(data['left'], dtype=np.int64)[keep]
+    top = np.asarray(data['top'], dtype=np.int64)[keep]
+    width = np.asarray(data['width'], dtype=np.int64)[keep]
+    height = np.asarray(data['height'], dtype=np.int64)[keep]
+    text = text[keep]
+    right = left + width
+    line_height = max(1.0, float(np.median(height)))
+
+    # Rows: y-centroid binning
+    y_center = top + height / 2.0
+    order = np.argsort(y_center, kind='stable')
+    breaks = np.diff(y_center[order]) > line_height * row_factor
+    row_ids = np.empty(len(order), dtype=np.int64)
+    row_ids[order] = np.concatenate(([0], np.cumsum(breaks)))
+    n_rows = int(row_ids.max()) + 1
+
+    # Columns: gaps in the x coverage histogram of all word boxes
+    x_max = int(right.max()) + 1
+    coverage = np.zeros(x_max + 1, dtype=np.int64)
+    np.add.at(coverage, left, 1)
+    np.add.at(coverage, right, -1)
+    counts = np.cumsum(coverage)[:x_max]
+    dense = counts > int(n_rows * noise_ratio)
+    # Words overlapping a dense column add nothing outside it
+    dense_before = np.concatenate(([0], np.cumsum(dense)))
+    alone = dense_before[right] == dense_before[left]
+    coverage = np.zeros(x_max + 1, dtype=np.int64)
+    np.add.at(coverage, left[alone], 1)
+    np.add.at(coverage, right[alone], -1)
+    covered = dense | (np.cumsum(coverage)[:x_max] > 0)
+    x_start = int(left.min())
+    edges = np.diff(np.concatenate(([1], covered[x_start:].view(np.int8), [1])))
+    gap_starts = np.flatnonzero(edges == -1) + x_start
+    gap_ends = np.flatnonzero(edges == 1) + x_start
+    wide = (gap_ends - gap_starts) >= line_height * gap_factor
+    cuts = (gap_starts[wide] + gap_ends[wide]) // 2
+    col_ids = np.searchsorted(cuts, (left + right) // 2)
+    n_cols = len(cuts) + 1
+
+    # Join words per cell in reading order
+    order = np.lexsort((left, col_ids, row_ids))
+    cell_keys = row_ids[order] * n_cols + col_ids[order]
+    starts = np.flatnonzero(np.diff(np.concatenate(([-1], cell_keys))))
+    ends = np.append(starts[1:], len(order))
+
+    matrix = [[''] * n_cols for _ in range(n_rows)]
+    for start, end in zip(starts, ends):
+        key = int(cell_keys[start])
+        matrix[key // n_cols][key % n_cols] = ' '.join(text[order[start:end]])
+
+    # Drop columns that never received a word
+    used = [c for c in range(n_cols) if any(row[c] for row in matrix)]
+    return [[row[c] for c in used] for row in matrix]
+
+
+# Column templates: saved column layouts of recurring FM views (Squad,
+# Scouting, ...). A capture is matched on its header row, then each column
+# strip is OCR'd directly instead of running the generic layout analysis.
+TEMPLATE_PROFILE_BINS = 256  # Resolution of the header row fingerprint
+TEMPLATE_MATCH_SCORE = 0.8  # Minimum fingerprint overlap for a template to match
+TEMPLATE_OCR_CONFIG = r'--oem 3 --psm 6'
+
+# Characters each column kind can contain, so Tesseract can't read O for 0.
+# The space keeps words apart ('£45K p/w'); without it they run together.
+COLUMN_CHARSETS = {
+    'int': '0123456789-, ',
+    'float': '0123456789-,. ',
+    'percent': '0123456789-.% ',
+    'height': '0123456789cm\'"”',  # 185 cm reads as 185cm, which parses the same
+    'money': '0123456789-,.£€$KMBkmbpaw/ ',
+    'position': 'ACDGKLMRSTWB()/, ',
+    'nation': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+}
+
+# FM vocabulary for Tesseract's user-words and user-patterns files
+FM_POSITIONS = ('GK', 'D', 'WB', 'DM', 'M', 'AM', 'ST')
+FM_SIDES = ('R', 'L', 'C', 'RL', 'RC', 'LC', 'RLC')
+FM_NATIONS = (
+    'ALB', 'ALG', 'ARG', 'AUS', 'AUT', 'BEL', 'BIH', 'BRA', 'BUL', 'CAN', 'CHI',
+    'CIV', 'CMR', 'COL', 'CRO', 'CZE', 'DEN', 'ECU', 'EGY', 'ENG', 'ESP', 'FIN',
+    'FRA', 'GER', 'GHA', 'GRE', 'HUN', 'IRL', 'ISL', 'ITA', 'JAM', 'JPN', 'KOR',
+    'MAR', 'MEX', 'MLI', 'NED', 'NGA', 'NIR', 'NOR', 'NZL', 'PAR', 'PER', 'POL',
+    'POR', 'ROU', 'RSA', 'RUS', 'SCO', 'SEN', 'SRB', 'SUI', 'SVK', 'SVN', 'SWE',
+    'TUN', 'TUR', 'UKR', 'URU', 'USA', 'VEN', 'WAL',
+)
+FM_WORDS = ('p/w', 'p/m', 'p/a', 'yrs', 'Free', 'Loan', 'Injured', 'Unknown',
+            'Not for Sale', 'Transfer Listed', 'Loan Listed', 'Youth', 'Reserves')
+POSITION_PATTERN = (r'(?:GK|D|WB|DM|M|AM|ST)(?:\s*\([RLC]{1,3}\))?'
+                    r'(?:\s*[/,]\s*(?:GK|D|WB|DM|M|AM|ST)(?:\s*\([RLC]{1,3}\))?)*')
+# Text column kinds recognized by their shape, after the numeric COLUMN_KINDS
+TEXT_COLUMN_KINDS = (('position', POSITION_PATTERN), ('nation', r'[A-Z]{3}'))
+
+
+def infer_ocr_kind(values):
+    """Kind of a column for OCR constraints.
+
+    Returns a COLUMN_KINDS name, a TEXT_COLUMN_KINDS name ('position',
+    'nation') or None for free text.
+    """
+    text = pd.Series(list(values), dtype=object).astype(str)
+    kind, _, _ = infer_column_kind(text)
+    if kind is not None:
+        return kind
+    text = text.str.strip()
+    present = text[~text.isin(MISSING_VALUES)]
+    if present.empty:
+        return None
+    for kind, pattern in TEXT_COLUMN_KINDS:
+        if present.str.fullmatch(pattern).mean() >= TYPE_MATCH_RATIO:
+            return kind
+    return None
+
+
+_vocabulary_files = []
+_vocabulary_lock = threading.Lock()
+
+
+def fm_vocabulary_files():
+    """Write the FM user-words and user-patterns files once and return their paths.
+
+    Returns (words_path, patterns_path), or None if they can't be written.
+    """
+    with _vocabulary_lock:
+        if _vocabulary_files:
+            return _vocabulary_files[0]
+        # One word per line: "AM (RLC)" is read as the words AM and (RLC)
+        words = list(FM_POSITIONS) + [f"({side})" for side in FM_SIDES] + ['D/WB', 'WB/M']
+        words += list(FM_NATIONS) + [word for phrase in FM_WORDS for word in phrase.split()]
+        patterns = []
+        for currency in '£€$':
+            patterns += [f"{currency}\\d\\*", f"{currency}\\d\\*K", f"{currency}\\d\\*M",
+                         f"{currency}\\d\\*.\\d\\*K", f"{currency}\\d\\*.\\d\\*M",
+                         f"{currency}\\d\\*,\\d\\*"]
+        patterns += ["\\d\\*%", "\\d\\*.\\d\\*%", "\\d\\*-\\d\\*", "\\d\\*cm"]
+        contents = ('\n'.join(sorted(set(words))) + '\n', '\n'.join(patterns) + '\n')
+        # Named after their contents so a vocabulary change writes new files
+        digest = hashlib.sha256(''.join(contents).encode()).hexdigest()[:12]
+        directory = os.path.join(user_cache_dir(), 'vocabulary')
+        paths = (os.path.join(directory, f"fm-{digest}.user-words"),
+                 os.path.join(directory, f"fm-{digest}.user-patterns"))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for path, content in zip(paths, contents):
+                if not os.path.exists(path):
+                    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                        f.write(content)
+                    os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"Could not write OCR vocabulary files: {e}")
+            paths = None
+        _vocabulary_files.append(paths)
+        return paths
+
+
+_fast_tessdata = {}
+
+
+def fast_tessdata_dir(lang='eng'):
+    """Directory holding the fast (integer) model for lang, or None.
+
+    TESSDATA_FAST_PREFIX can point at a tessdata_fast checkout; otherwise a
+    few usual install locations are searched. The result is cached.
+    """
+    if lang in _fast_tessdata:
+        return _fast_tessdata[lang]
+    candidates = [os.getenv('TESSDATA_FAST_PREFIX'),
+                  os.path.join(user_data_dir(), 'tessdata_fast'),
+                  os.path.expanduser('~/tessdata_fast'),
+                  '/usr/share/tessdata_fast', '/usr/local/share/tessdata_fast',
+                  '/opt/homebrew/share/tessdata_fast',
+                  r'C:\Program Files\Tesseract-OCR\tessdata_fast']
+    found = None
+    for directory in candidates:
+        if directory and os.path.isfile(os.path.join(directory, f"{lang}.traineddata")):
+            found = directory
+            break
+    _fast_tessdata[lang] = found
+    return found
+
+
+def column_ocr_config(kind, charset=None, base=TEMPLATE_OCR_CONFIG, lang='eng'):
+    """Tesseract config for a column or region holding data of the given kind.
+
+    Known kinds get a character whitelist (charset overrides it). Numeric
+    kinds also turn off the dictionaries, which only ever "correct" numbers
+    into words, and use the fast model when fast_tessdata_dir finds one.
+    Text columns get the FM user-words and user-patterns files.
+    """
+    parts = [base]
+    charset = charset if charset is not None else COLUMN_CHARSETS.get(kind)
+    if charset:
+        parts.append('-c ' + quote_config_value(f'tessedit_char_whitelist={charset}'))
+    if kind in {name for name, _, _ in COLUMN_KINDS}:
+        parts.append('-c load_system_dawg=0 -c load_freq_dawg=0')
+        fast = fast_tessdata_dir(lang)
+        if fast:
+            parts.append('--tessdata-dir ' + quote_config_value(fast))
+    else:
+        vocabulary = fm_vocabulary_files()
+        if vocabulary:
+            words, patterns = vocabulary
+            parts.append('-c ' + quote_config_value(f'user_words_file={words}'))
+            parts.append('-c ' + quote_config_value(f'user_patterns_file={patterns}'))
+    return ' '.join(parts)
+
+
+def _header_fingerprint(text_ink):
+    """Fingerprint of a header row: where along its width there is ink.
+
+    The ink profile between the first and last inked column is resampled to
+    TEMPLATE_PROFILE_BINS, so it doesn't depend on capture size or margins.
+    Returns (profile, x0, x1) with x0/x1 the inked extent, or None if blank.
+    """
+    inked = np.flatnonzero(text_ink.any(axis=0))
+    if len(inked) < 2:
+        return None
+    x0, x1 = int(inked[0]), int(inked[-1]) + 1
+    starts = np.linspace(0, x1 - x0, TEMPLATE_PROFILE_BINS, endpoint=False).astype(np.int64)
+    profile = np.add.reduceat(text_ink[:, x0:x1].any(axis=0), starts) > 0
+    return profile, x0, x1
+
+
+def table_text_layout(binary, rule_fraction=0.6):
+    """Prepare a binarized table for template matching and reading.
+
+    Returns (clean, background, bands, fingerprint): the image with ruled
+    lines blanked out, its text-line bands and the fingerprint of the first
+    band (the header), or None when there is no text. Only rules spanning
+    rule_fraction of the table are removed; unlike detect_table_grid this
+    is a single pass over the ink projections.
+    """
+    arr = np.asarray(binary)
+    background = 255 if arr.mean() >= 127 else 0
+    ink = arr != background
+    rule_rows = np.flatnonzero(ink.sum(axis=1) >= rule_fraction * arr.shape[1])
+    rule_cols = np.flatnonzero(ink.sum(axis=0) >= rule_fraction * arr.shape[0])
+    clean = arr
+    if len(rule_rows) or len(rule_cols):
+        clean = arr.copy()
+        clean[rule_rows, :] = background
+        clean[:, rule_cols] = background
+        ink[rule_rows, :] = False
+        ink[:, rule_cols] = False
+    bands = find_row_bands(clean)
+    if not bands:
+        return clean, background, bands, None
+    top, bottom = bands[0]
+    return clean, background, bands, _header_fingerprint(ink[top:bottom])
+
+
+class ColumnTemplate:
+    """Column layout of one FM view: header names, x ranges and data kinds.
+
+    columns is a list of dicts with 'name', 'left', 'right' and 'kind' (see
+    infer_ocr_kind) and optionally 'charset' to override the kind's
+    whitelist. left/right are relative to the header row's inked extent, so
+    the template still fits captures of the view at another size or with a
+    slightly different selection.
+    """
+
+    def __init__(self, name, columns, profile):
+        self.name = name
+        self.columns = columns
+        self.profile = np.asarray(profile, dtype=bool)
+
+    @classmethod
+    def learn(cls, name, binary, engine, gray=None, workers=None):
+        """Build a template from a capture with the generic grid analysis"""
+        fingerprint = table_text_layout(binary)[3]
+        matrix, rows, cols = read_table_grid(binary, engine, gray, workers)
+        if fingerprint is None or len(matrix) < 2 or not cols:
+            raise ValueError("No table with a header row found")
+        profile, x0, x1 = fingerprint
+        span = float(x1 - x0)
+        columns = []
+        for idx, (left, right) in enumerate(cols):
+            kind = infer_ocr_kind(row[idx] for row in matrix[1:])
+            columns.append({
+                'name': matrix[0][idx] or f"Column {idx + 1}",
+                'left': round((left - x0) / span, 5),
+                'right': round((right - x0) / span, 5),
+                'kind': kind,
+            })
+        return cls(name, columns, profile)
+
+    def score(self, fingerprint):
+        """Overlap (intersection over union) of a header fingerprint with this template"""
+        if fingerprint is None:
+            return 0.0
+        profile = fingerprint[0]
+        union = np.count_nonzero(profile | self.profile)
+        return np.count_nonzero(profile & self.profile) / union if union else 0.0
+
+    def ocr_config(self, column, lang='eng'):
+        """Tesseract config for a column strip, constrained to its kind"""
+        return column_ocr_config(column.get('kind'), column.get('charset'), lang=lang)
+
+    def cache_key(self, lang='eng'):
+        # Resolved configs, so installing fast models or new vocabulary files
+        # changes the key
+        return (self.name, tuple((c['left'], c['right'], self.ocr_config(c, lang))
+                                 for c in self.columns))
+
+    def to_dict(self):
+        return {'name': self.name, 'columns': self.columns,
+                'profile': ''.join('1' if bit else '0' for bit in self.profile)}
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = np.frombuffer(data['profile'].encode('ascii'), dtype=np.uint8) == ord('1')
+        return cls(data['name'], data['columns'], profile)
+
+
+def read_with_template(layout, template, engine, workers=None, border=6):
+    """OCR a table column by column using a matched template.
+
+    layout comes from table_text_layout. Each column strip below the header
+    is read in one call and its words are assigned to rows by the text-line
+    bands. Returns rows with the template's header names first.
+    """
+    clean, background, bands, (_, x0, x1) = layout
+    header = [column['name'] for column in template.columns]
+    data = bands[1:]
+    if not data:
+        return [header]
+    top, bottom = data[0][0], data[-1][1]
+    # Row boundaries halfway through the gaps between text lines
+    limits = np.array([(end + start) / 2 for (_, end), (start, _) in zip(data[:-1], data[1:])])
+    span = x1 - x0
+    width = clean.shape[1]
+
+    def read(column):
+        left = min(max(0, int(x0 + column['left'] * span)), width - 1)
+        right = max(left + 1, min(width, int(np.ceil(x0 + column['right'] * span))))
+        strip = _cell_crop(clean, background, top, bottom, left, right, border)
+        return engine.image_to_data(strip, config=template.ocr_config(column, engine.lang))
+
+    matrix = [[''] * len(header) for _ in data]
+    for col, words in enumerate(_ocr_map(read, template.columns, workers)):
+        text = np.array([str(t).strip() for t in words['text']], dtype=object)
+        keep = (np.asarray(words['conf'], dtype=float) >= 0) & (text != '')
+        text = text[keep]
+        left = np.asarray(words['left'])[keep]
+        # Word boxes are relative to the padded strip
+        y_center = (top - border + np.asarray(words['top'])[keep]
+                    + np.asarray(words['height'])[keep] / 2.0)
+        row_ids = np.searchsorted(limits, y_center)
+        for idx in np.lexsort((left, row_ids)):
+            row = matrix[row_ids[idx]]
+            row[col] = f"{row[col]} {text[idx]}" if row[col] else text[idx]
+    return [header] + [row for row in matrix if any(row)]
+
+
+class TemplateStore:
+    """Saved column templates, kept as JSON in the user data directory"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_data_dir(), 'templates.json')
+        self.templates = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for data in json.load(f):
+                    self.templates[data['name']] = data  # Parsed on first match
+        except (OSError, ValueError, KeyError) as e:
+            if os.path.exists(self.path):
+                print(f"Could not read column templates: {e}")
+
+    def __len__(self):
+        return len(self.templates)
+
+    def names(self):
+        return sorted(self.templates)
+
+    def _get(self, name):
+        template = self.templates[name]
+        if isinstance(template, dict):
+            template = self.templates[name] = ColumnTemplate.from_dict(template)
+        return template
+
+    def match(self, fingerprint):
+        """Return the best matching template for a header fingerprint, or None"""
+        with self._lock:
+            scored = [(self._get(name).score(fingerprint), name) for name in self.templates]
+        if not scored:
+            return None
+        score, name = max(scored)
+        return self.templates[name] if score >= TEMPLATE_MATCH_SCORE else None
+
+    def save(self, template):
+        """Add or replace a template and write the store to disk"""
+        with self._lock:
+            self.templates[template.name] = template
+            self._write()
+
+    def delete(self, name):
+        with self._lock:
+            self.templates.pop(name, None)
+            self._write()
+
+    def _write(self):
+        data = [t.to_dict() if isinstance(t, ColumnTemplate) else t
+                for t in self.templates.values()]
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+def user_cache_dir():
+    """Platform cache directory for the application"""
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    elif sys.platform == 'win32':
+        base = os.getenv('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    else:
+        base = os.getenv('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'ScreenDataScanner')
+
+
+def user_data_dir():
+    """Platform directory for data the user creates, such as column templates"""
+    if sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    elif sys.platform == 'win32':
+        base = os.getenv('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+    else:
+        base = os.getenv('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'ScreenDataScanner')
+
+
+class OCRCache:
+    """Content-addressed on-disk cache of parsed OCR rows.
+
+    Entries are keyed on a hash of the preprocessed pixels plus the OCR
+    settings, stored as small JSON files and evicted least recently used
+    first once the directory grows past max_bytes.
+    """
+
+    # Bump when parsing changes so stale results are not served
+    VERSION = 1
+
+    def __init__(self, directory=None, max_bytes=64 * 1024 * 1024):
+        self.directory = directory or os.path.join(user_cache_dir(), 'ocr')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, pixels, *settings):
+        """Hash an image buffer together with the settings that produced it"""
+        arr = np.ascontiguousarray(pixels)
+        digest = hashlib.sha256()
+        digest.update(repr((self.VERSION, arr.shape, str(arr.dtype), settings)).encode())
+        digest.update(memoryview(arr).cast('B'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get(self, key):
+        """Return cached rows for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return rows
+
+    def put(self, key, rows):
+        """Store rows for key and evict old entries if over the size limit"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(rows, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+        except OSError as e:
+            print(f"Could not write OCR cache entry: {e}")
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Delete every cached entry"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+
+def _cpu_seconds():
+    """CPU time of this process plus its finished child processes (tesseract)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def _max_rss_mb():
+    """Peak resident memory of this process so far, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20, 1)
+
+
+class PipelineMetrics:
+    """Per-stage timings and resource use for one extraction.
+
+    Each `with metrics.stage(name, image):` block records wall and CPU
+    seconds, the input image size, the process's peak memory and, while
+    tracemalloc is tracing, the peak traced allocation during the stage.
+    CPU time is process wide, so extractions running side by side count
+    each other's work. info holds job details (source, layout, backend,
+    ...) that are included in the JSON record.
+    """
+
+    def __init__(self, **info):
+        self.info = info
+        self.stages = []
+        self.timestamp = datetime.now().isoformat(timespec='milliseconds')
+
+    @contextlib.contextmanager
+    def stage(self, name, image=None):
+        """Time a stage; yields its record so callers can add details"""
+        record = {'stage': name}
+        if image is not None:
+            width, height = image.size if isinstance(image, Image.Image) else image.shape[1::-1]
+            record.update(width=width, height=height)
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield record
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall, 6)
+            record['cpu_seconds'] = round(_cpu_seconds() - cpu, 6)
+            record['max_rss_mb'] = _max_rss_mb()
+            if tracing:
+                record['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+            self.stages.append(record)
+
+    def add(self, record):
+        """Add a stage recorded elsewhere, e.g. the screen grab before a job"""
+        self.stages.append(dict(record))
+
+    def seconds(self):
+        """Wall seconds per stage name, in pipeline order"""
+        totals = {}
+        for record in self.stages:
+            totals[record['stage']] = totals.get(record['stage'], 0.0) + record['wall_seconds']
+        return totals
+
+    def total_seconds(self):
+        return sum(record['wall_seconds'] for record in self.stages)
+
+    def summary(self):
+        """One-line summary for the status bar, e.g. 'ocr 310 ms, parse 2 ms'"""
+        parts = [f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.seconds().items()]
+        return ", ".join(parts + [f"total {self.total_seconds():.2f}s"])
+
+    def to_record(self):
+        """JSON-serializable record of the job and its stages"""
+        return {'timestamp': self.timestamp, **self.info, 'stages': self.stages,
+                'total_seconds': round(self.total_seconds(), 6)}
+
+
+class MetricsLog:
+    """Appends PipelineMetrics records as JSON lines to a file, or stderr for '-'"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, metrics):
+        line = json.dumps(metrics.to_record(), ensure_ascii=False, default=str)
+        with self._lock:
+            if self.path == '-':
+                print(line, file=sys.stderr, flush=True)
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+
+
+def extract_rows(image, engine=None, workers=None, layout='text', cache=None,
+                 stats=None, preset=DEFAULT_PRESET, metrics=None, templates=None):
+    """Run the full OCR pipeline on an image and return parsed rows.
+
+    layout 'text' OCRs row-band strips and splits columns on whitespace,
+    'grid' detects the table grid and OCRs each cell, 'boxes' OCRs once
+    and clusters the word boxes into rows and columns. workers limits how
+    many strips or cells are recognized concurrently (default: CPU count).
+    preset selects the preprocessing stages (see PREPROCESS_PRESETS).
+
+    When a TemplateStore is given and one of its templates matches the
+    capture's header row, the columns are read with that template and
+    layout is ignored.
+
+    When an OCRCache is given it is consulted before running Tesseract, and
+    if a stats dict is passed its 'cache' key is set to 'hit' or 'miss'.
+    Stages are recorded in metrics (a PipelineMetrics) when one is given.
+    """
+    if engine is None:
+        engine = get_ocr_engine()
+    if metrics is None:
+        metrics = PipelineMetrics()
+    metrics.info['backend'] = engine.name
+    with metrics.stage('preprocess', image) as record:
+        record['steps'] = []
+        img = preprocess_image(image, preset, trace=record['steps'])
+
+    template = None
+    if templates:
+        with metrics.stage('template'):
+            text_layout = table_text_layout(img)
+            template = templates.match(text_layout[3])
+        metrics.info['template'] = template.name if template is not None else None
+
+    def run():
+        if template is None:
+            return _ocr_layout(image, img, engine, workers, layout, metrics)
+        with metrics.stage('ocr', img):
+            return read_with_template(text_layout, template, engine, workers)
+
+    if cache is None:
+        return run()
+
+    if template is not None:
+        settings = ('template',) + template.cache_key(engine.lang)
+    else:
+        settings = layout
+    with metrics.stage('cache'):
+        # Backends differ slightly in output, so they do not share entries
+        key = cache.make_key(np.asarray(img), settings, OCR_CONFIG, CELL_OCR_CONFIG,
+                             engine.name, engine.lang)
+        rows = cache.get(key)
+    metrics.info['cache'] = 'miss' if rows is None else 'hit'
+    if stats is not None:
+        stats['cache'] = metrics.info['cache']
+    if rows is None:
+        rows = run()
+        cache.put(key, rows)
+    return rows
+
+
+def grayscale_like(image, processed):
+    """Grayscale version of image resized to match a preprocessed array"""
+    gray = to_grayscale(image)
+    height, width = processed.shape[:2]
+    if gray.shape[:2] != (height, width):
+        gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _ocr_layout(image, img, engine, workers, layout, metrics):
+    """OCR a preprocessed image with the selected column layout"""
+    if layout == 'grid':
+        # Cells are parsed as they are read, so the grid has no parse stage
+        with metrics.stage('ocr', img):
+            return ocr_table_grid(img, engine, gray=grayscale_like(image, img), workers=workers)
+    with metrics.stage('ocr', img):
+        if layout == 'boxes':
+            result = engine.image_to_data(img, config=OCR_CONFIG)
+        else:
+            result = ocr_row_bands(img, engine, workers=workers)
+    with metrics.stage('parse'):
+        return words_to_rows(result) if layout == 'boxes' else parse_text_to_rows(result)
+
+
+def find_scroll_offset(prev, frame, min_score=0.9):
+    """Return how many rows the content moved up between two frames.
+
+    A strip from the bottom of the previous frame is located in the new
+    frame with cv2.matchTemplate. Returns None when no confident overlap is
+    found (for example after scrolling more than a screenful).
+    """
+    if prev.shape != frame.shape:
+        return None
+    height, width = prev.shape
+    strip = max(8, min(height // 4, 80))
+    if height <= strip:
+        return None
+    # Skip the edges where scrollbars and borders move independently
+    left, right = int(width * 0.05), max(int(width * 0.9), int(width * 0.05) + 1)
+    template = prev[height - strip:, left:right]
+    if template.std() < 1.0:
+        return None  # Blank strip, position would be ambiguous
+    scores = cv2.matchTemplate(frame[:, left:right], template, cv2.TM_CCOEFF_NORMED)
+    _, best, _, location = cv2.minMaxLoc(scores)
+    if best < min_score:
+        return None
+    offset = (height - strip) - location[1]
+    return offset if offset >= 0 else None
+
+
+def changed_tiles(prev, frame, tile=WATCH_TILE_SIZE, threshold=WATCH_DIFF_THRESHOLD):
+    """Boolean grid of tiles whose pixels differ between two grayscale frames"""
+    height, width = frame.shape
+    diff = cv2.absdiff(prev, frame) > threshold
+    tiles_y = -(-height // tile)
+    tiles_x = -(-width // tile)
+    padded = np.zeros((tiles_y * tile, tiles_x * tile), dtype=bool)
+    padded[:height, :width] = diff
+    return padded.reshape(tiles_y, tile, tiles_x, tile).any(axis=(1, 3))
+
+
+class RegionWatcher:
+    """Keep a table OCR'd while it changes on screen.
+
+    The first frame is read with the grid layout. After that each frame is
+    diffed against the last one tile by tile and only cells overlapping a
+    changed tile are OCR'd again, constrained to the kind
+    of data their column held in the full read (see column_ocr_config).
+    If most of the region changed (scrolling, a different screen) the
+    whole table is re-read.
+    """
+
+    def __init__(self, engine=None, tile=WATCH_TILE_SIZE,
+                 threshold=WATCH_DIFF_THRESHOLD, full_refresh_ratio=0.5,
+                 preset=DEFAULT_PRESET):
+        self.engine = engine
+        self.preset = preset
+        self.tile = tile
+        self.threshold = threshold
+        self.full_refresh_ratio = full_refresh_ratio
+        self.prev = None
+        self.matrix = []
+        self.rows = []
+        self.cols = []
+        self.configs = []  # Tesseract config per column
+
+    def _full_read(self, gray):
+        binary = preprocess_image(gray, self.preset)
+        self.matrix, rows, cols = read_table_grid(binary, self.engine,
+                                                  grayscale_like(gray, binary))
+        # Presets may rescale; keep cell bounds in frame coordinates
+        scale_y = gray.shape[0] / binary.shape[0]
+        scale_x = gray.shape[1] / binary.shape[1]
+        self.rows = [(int(top * scale_y), int(np.ceil(bottom * scale_y))) for top, bottom in rows]
+        self.cols = [(int(left * scale_x), int(np.ceil(right * scale_x))) for left, right in cols]
+        lang = getattr(self.engine, 'lang', 'eng')
+        self.configs = [column_ocr_config(infer_ocr_kind(row[c] for row in self.matrix[1:]),
+                                          base=CELL_OCR_CONFIG, lang=lang)
+                        for c in range(len(self.cols))]
+
+    def _read_cells(self, gray, cells):
+        """OCR cells (row, col, top, bottom, left, right) of one frame.
+
+        The whole frame is binarized once, like the full read, so a cell's
+        threshold and scale do not depend on the few glyphs inside it.
+        """
+        binary = preprocess_image(gray, self.preset)
+        background = 255 if binary.mean() >= 127 else 0
+        scale_y = binary.shape[0] / gray.shape[0]
+        scale_x = binary.shape[1] / gray.shape[1]
+
+        def read(cell):
+            r, c, top, bottom, left, right = cell
+            top, bottom = int(top * scale_y), int(np.ceil(bottom * scale_y))
+            left, right = int(left * scale_x), int(np.ceil(right * scale_x))
+            if not (binary[top:bottom, left:right] != background).any():
+                return ''
+            # The first row is usually the header, so it is read unconstrained
+            config = self.configs[c] if r else CELL_OCR_CONFIG
+            return read_cell_text(self.engine, _cell_crop(binary, background, top, bottom,
+                                                          left, right), config)
+
+        return _ocr_map(read, cells)
+
+    def update(self, frame):
+        """Process a new frame.
+
+        Returns None when the whole table was (re)read, otherwise a list of
+        (row, col, text) for the cells whose text changed.
+        """
+        if self.engine is None:
+            self.engine = get_ocr_engine()
+        gray = to_grayscale(frame)
+        if self.prev is None or self.prev.shape != gray.shape or not self.matrix:
+            self._full_read(gray)
+            self.prev = gray
+            return None
+
+        tiles = changed_tiles(self.prev, gray, self.tile, self.threshold)
+        self.prev = gray
+        if not tiles.any():
+            return []
+        if tiles.mean() > self.full_refresh_ratio:
+            self._full_read(gray)
+            return None
+
+        tile = self.tile
+        dirty = []
+        for r, (top, bottom) in enumerate(self.rows):
+            row_tiles = tiles[top // tile:(bottom - 1) // tile + 1]
+            if not row_tiles.any():
+                continue
+            for c, (left, right) in enumerate(self.cols):
+                if row_tiles[:, left // tile:(right - 1) // tile + 1].any():
+                    dirty.append((r, c, top, bottom, left, right))
+
+        texts = self._read_cells(gray, dirty)
+        changes = []
+        for (r, c, *_), text in zip(dirty, texts):
+            if self.matrix[r][c] != text:
+                self.matrix[r][c] = text
+                changes.append((r, c, text))
+        return changes
+
+
+class ScrollStitcher:
+    """Stitch frames of a scrolling list into one tall capture.
+
+    Each frame is aligned against the previous one and only the newly
+    revealed rows are kept. take_complete_region() hands out the part of
+    the stitched strip that contains whole text lines and has not been
+    OCR'd yet, so every row is recognized exactly once.
+    """
+
+    def __init__(self):
+        self.prev = None
+        self.pending = None  # Stitched rows not yet handed out for OCR
+        self.strips = []  # Everything stitched so far, for preview
+        self.frames = 0
+        self.lost = 0  # Frames that could not be aligned
+        self.tracking = True  # False while frames do not align with the last one kept
+
+    @property
+    def height(self):
+        return sum(strip.shape[0] for strip in self.strips)
+
+    def add_frame(self, frame):
+        """Align a grayscale frame and append its newly revealed rows"""
+        gray = to_grayscale(frame)
+        self.frames += 1
+        if self.prev is None:
+            new_rows = gray
+        else:
+            offset = find_scroll_offset(self.prev, gray)
+            if offset is None:
+                # Lost track (scrolled too fast): skip frames until the last
+                # stitched rows are back on screen, rather than stitching
+                # rows twice or with a gap
+                self.lost += 1
+                self.tracking = False
+                return 0
+            new_rows = gray[gray.shape[0] - offset:]
+        self.tracking = True
+        self.prev = gray
+        if new_rows.shape[0] == 0:
+            return 0
+
+        new_rows = new_rows.copy()
+        self.strips.append(new_rows)
+        if self.pending is None or self.pending.shape[1] != new_rows.shape[1]:
+            self.pending = new_rows
+        else:
+            self.pending = np.vstack((self.pending, new_rows))
+        return new_rows.shape[0]
+
+    def take_complete_region(self):
+        """Return pending rows up to the last fully visible text line"""
+        if self.pending is None or self.pending.shape[0] == 0:
+            return None
+        _, binary = cv2.threshold(self.pending, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        bands = find_row_bands(binary)
+        height = self.pending.shape[0]
+        # The bottom line may be cut off by the frame edge; wait for more rows
+        complete = [band for band in bands if band[1] < height - 1]
+        if not complete:
+            return None
+        following = [band[0] for band in bands if band[0] >= complete[-1][1]]
+        cut = (complete[-1][1] + (following[0] if following else height)) // 2
+        region = self.pending[:cut]
+        self.pending = self.pending[cut:]
+        return region
+
+    def flush(self):
+        """Return whatever is left once scrolling has stopped"""
+        region = self.pending
+        self.pending = None
+        if region is None or region.shape[0] == 0:
+            return None
+        return region
+
+    def stitched_image(self):
+        """The full stitched capture as a single grayscale array"""
+        if not self.strips:
+            return None
+        return np.vstack(self.strips)
+
+
+class ScreenCapture:
+    """Reusable screen grabber.
+
+    Keeps an mss handle open between grabs (one per thread, as mss handles
+    must not be shared across threads) and returns frames as numpy BGRA
+    arrays that view mss's pixel buffer directly instead of copying it.
+    Pass frames to the pipeline as they are; PreviewPyramid converts them
+    only for display.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._handles.append(sct)
+        return sct
+
+    @property
+    def monitors(self):
+        return self._sct().monitors
+
+    def grab(self, region):
+        """Grab a region dict (top/left/width/height) as an HxWx4 BGRA array"""
+        shot = self._sct().grab(region)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def grab_rect(self, x1, y1, x2, y2):
+        """Grab the screen rectangle between two corners"""
+        return self.grab({"top": min(y1, y2), "left": min(x1, x2),
+                          "width": abs(x2 - x1), "height": abs(y2 - y1)})
+
+    def grab_gray(self, region):
+        """Grab a region straight to a grayscale array"""
+        return cv2.cvtColor(self.grab(region), cv2.COLOR_BGRA2GRAY)
+
+    def close(self):
+        with self._lock:
+            handles, self._handles = self._handles, []
+        for sct in handles:
+            sct.close()
+        self._local = threading.local()
+
+
+# Preview tiles are rendered at this size, only where the canvas shows them
+PREVIEW_TILE_SIZE = 256
+PREVIEW_MAX_ZOOM = 4.0
+PREVIEW_CACHE_SIZE = 4  # Pyramids kept for recently shown images
+
+
+class PreviewPyramid:
+    """Multi-resolution copy of a capture for fast, tiled preview rendering.
+
+    Level k is the image area-averaged down by 2**k; levels are built on
+    first use. render_tile() draws one tile at any zoom from the nearest
+    level at or above that zoom, so the cost per tile does not depend on
+    the size of the capture.
+    """
+
+    def __init__(self, image):
+        frame = image if isinstance(image, np.ndarray) else np.asarray(image)
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB)
+        self.height, self.width = frame.shape[:2]
+        self.levels = [np.ascontiguousarray(frame)]
+        self._lock = threading.Lock()
+
+    def level(self, k):
+        with self._lock:
+            while len(self.levels) <= k:
+                prev = self.levels[-1]
+                size = (max(1, prev.shape[1] // 2), max(1, prev.shape[0] // 2))
+                self.levels.append(cv2.resize(prev, size, interpolation=cv2.INTER_AREA))
+            return self.levels[k]
+
+    def fit_zoom(self, width, height):
+        """Largest zoom (at most 1) showing the whole width and height"""
+        return min(width / self.width, height / self.height, 1.0)
+
+    def fit_width_zoom(self, width):
+        """Zoom showing the full width; tall captures then scroll vertically"""
+        return min(width / self.width, 1.0)
+
+    def scaled_size(self, zoom):
+        return max(1, int(round(self.width * zoom))), max(1, int(round(self.height * zoom)))
+
+    def render_tile(self, zoom, tx, ty, tile=PREVIEW_TILE_SIZE):
+        """PIL image of tile (tx, ty) of the image scaled by zoom"""
+        total_w, total_h = self.scaled_size(zoom)
+        x0, y0 = tx * tile, ty * tile
+        w, h = min(tile, total_w - x0), min(tile, total_h - y0)
+        k = max(0, int(np.floor(np.log2(1.0 / zoom)))) if zoom < 1 else 0
+        source = self.level(k)
+        # Map tile pixel centres back into the level, so tiles line up exactly
+        rx = source.shape[1] / total_w
+        ry = source.shape[0] / total_h
+        matrix = np.float32([[rx, 0, (x0 + 0.5) * rx - 0.5],
+                             [0, ry, (y0 + 0.5) * ry - 0.5]])
+        interpolation = cv2.INTER_NEAREST if zoom >= 2 else cv2.INTER_LINEAR
+        out = cv2.warpAffine(source, matrix, (w, h),
+                             flags=interpolation | cv2.WARP_INVERSE_MAP,
+                             borderMode=cv2.BORDER_REPLICATE)
+        return Image.fromarray(out)
+
+
+# Extractions run at the same time by the GUI job queue. Each one already
+# spreads its OCR over the shared pool, so a couple keep every core busy.
+JOB_WORKERS = 2
+
+
+def load_image(path):
+    """Load a screenshot file (a path or file object) as an RGB PIL image"""
+    return Image.open(path).convert("RGB")
+
+
+class ExtractionJob:
+    """One queued extraction of a capture or screenshot file.
+
+    source is an image (numpy frame or PIL image) or a file path, which is
+    loaded by the worker. status moves from 'queued' to 'running' and ends
+    as 'done', 'failed' or 'cancelled'; progress is the share of OCR calls
+    finished so far.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, source, name, layout='text', preset=DEFAULT_PRESET, session=None,
+                 metrics=None, templates=None):
+        self.id = next(self._ids)
+        self.source = source
+        self.name = name
+        self.layout = layout
+        self.preset = preset
+        self.session = session  # ExtractionSession to merge the rows into, if any
+        self.templates = templates  # TemplateStore to match the capture against, if any
+        self.status = 'queued'
+        self.rows = None
+        self.error = None
+        self.cache_status = None
+        self.metrics = metrics if metrics is not None else PipelineMetrics()
+        self.metrics.info.update(source=name, layout=layout, preset=preset)
+        self.future = None
+        self._queue = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._procs = set()
+        self._total_work = 0
+        self._done_work = 0
+        self._reported = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+    @property
+    def progress(self):
+        if self.status == 'done':
+            return 1.0
+        with self._lock:
+            return self._done_work / self._total_work if self._total_work else 0.0
+
+    def cancel(self):
+        """Cancel the job, killing any tesseract process it is running"""
+        self._cancel.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        if self.future is not None and self.future.cancel():
+            # Never started, so the worker won't report it
+            self.status = 'cancelled'
+            self._queue._notify(self)
+
+    def _track(self, proc):
+        with self._lock:
+            self._procs.add(proc)
+        if self.cancelled:
+            proc.kill()
+
+    def _untrack(self, proc):
+        with self._lock:
+            self._procs.discard(proc)
+
+    def _add_work(self, count):
+        with self._lock:
+            self._total_work += count
+
+    def _work_done(self):
+        with self._lock:
+            self._done_work += 1
+        # Report in steps so hundreds of cells don't flood the listener
+        if self.progress - self._reported >= 0.05:
+            self._reported = self.progress
+            self._queue._notify(self)
+
+
+class ExtractionQueue:
+    """Runs ExtractionJobs first in, first out on a bounded worker pool.
+
+    listener(job) is called from worker threads whenever a job changes
+    state or makes progress.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, cache=None, listener=None):
+        self.cache = cache
+        self.listener = listener
+        self.jobs = []
+        self._executor = ThreadPoolExecutor(max_workers=workers,
+                                            thread_name_prefix="extract-job")
+
+    def submit(self, source, name, layout='text', preset=DEFAULT_PRESET, session=None,
+               metrics=None, templates=None):
+        """Queue an extraction and return its ExtractionJob.
+
+        metrics may be a PipelineMetrics already holding earlier stages,
+        such as the screen grab.
+        """
+        job = ExtractionJob(source, name, layout, preset, session, metrics, templates)
+        job._queue = self
+        self.jobs.append(job)
+        self._notify(job)
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def active(self):
+        return [job for job in self.jobs if not job.finished]
+
+    def cancel_all(self):
+        for job in self.active():
+            job.cancel()
+
+    def clear_finished(self):
+        self.jobs = [job for job in self.jobs if not job.finished]
+
+    def _notify(self, job):
+        if self.listener is not None:
+            self.listener(job)
+
+    def _run(self, job):
+        if job.cancelled:
+            job.status = 'cancelled'
+            self._notify(job)
+            return
+        job.status = 'running'
+        self._notify(job)
+        token = _current_job.set(job)
+        try:
+            if isinstance(job.source, str):
+                with job.metrics.stage('load'):
+                    image = load_image(job.source)
+            else:
+                image = job.source
+            job.rows = extract_rows(image, layout=job.layout, preset=job.preset,
+                                    cache=self.cache, metrics=job.metrics,
+                                    templates=job.templates)
+            job.cache_status = job.metrics.info.get('cache')
+            check_cancelled()
+            job.status = 'done'
+        except JobCancelled:
+            job.status = 'cancelled'
+        except Exception as e:
+            if job.cancelled:
+                job.status = 'cancelled'
+            else:
+                job.status = 'failed'
+                job.error = str(e)
+        finally:
+            _current_job.reset(token)
+            job.source = None  # Let large captures be freed once finished
+        self._notify(job)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+
+
+class ExtractionSession:
+    """Accumulates several extractions into one de-duplicated table.
+
+    Columns are aligned by header text, so captures of the same view with
+    columns in a different order (or with extra columns) line up; columns
+    with a blank header are matched by position. Rows are
+    identified by key_columns (e.g. ["Name", "Club"]) through a dict index;
+    when no key is set, or the key columns are not in the table, the whole
+    row is the key. The first occurrence of a row is kept.
+    """
+
+    def __init__(self, key_columns=None, header=True):
+        self.header = header
+        self.columns = []
+        self.rows = []
+        self.captures = 0
+        self.duplicates = 0
+        self._lookup = {}  # normalized header -> column index
+        self._index = {}  # row key -> row index
+        self._key_positions = None
+        self.key_columns = []
+        self.set_key_columns(key_columns)
+
+    @staticmethod
+    def _normalize(value):
+        return ' '.join(str(value).split()).casefold()
+
+    def set_key_columns(self, key_columns):
+        """Change the columns that identify a row"""
+        if isinstance(key_columns, str):
+            key_columns = key_columns.split(',')
+        key_columns = [col.strip() for col in key_columns or [] if col.strip()]
+        if key_columns != self.key_columns:
+            self.key_columns = key_columns
+            self._key_positions = None
+            self._reindex()
+
+    def _resolve_key(self):
+        positions = tuple(self._lookup.get(self._normalize(col)) for col in self.key_columns)
+        if not positions or None in positions:
+            return ()
+        return positions
+
+    def _reindex(self):
+        self._key_positions = self._resolve_key()
+        self._index = {}
+        for i, row in enumerate(self.rows):
+            key = self._row_key(row)
+            if key is not None:
+                self._index.setdefault(key, i)
+
+    def _row_key(self, row):
+        if self._key_positions:
+            key = tuple(self._normalize(row[i]) if i < len(row) else ''
+                        for i in self._key_positions)
+        else:
+            key = tuple(self._normalize(value) for value in row)
+            while key and not key[-1]:
+                key = key[:-1]
+        return key if any(key) else None
+
+    def _add_column(self, name=None):
+        index = len(self.columns)
+        name = str(name).strip() if name is not None else ''
+        if not name or self._normalize(name) in self._lookup:
+            name = f"{name or 'Column'} {index + 1}"
+        self.columns.append(name)
+        self._lookup[self._normalize(name)] = index
+        return index
+
+    def _header_positions(self, header_row):
+        positions = [None] * len(header_row)
+        used = set()
+        for i, name in enumerate(header_row):
+            index = self._lookup.get(self._normalize(name)) if str(name).strip() else None
+            if index is not None and index not in used:
+                positions[i] = index
+                used.add(index)
+        # Blank header cells (padding, unlabeled columns) keep their position
+        for i, name in enumerate(header_row):
+            if positions[i] is None:
+                if str(name).strip() or i >= len(self.columns) or i in used:
+                    index = self._add_column(name)
+                else:
+                    index = i
+                positions[i] = index
+                used.add(index)
+        return positions
+
+    @staticmethod
+    def _starts_with_header(rows):
+        """Whether a capture's first row is a header rather than list data.
+
+        It is a header when it contains letters and, in the columns whose
+        other rows parse as numbers or money, does not parse itself. Tables
+        without such columns, or whose header is blank above all of them,
+        are assumed to start with their header.
+        """
+        first = [str(value).strip() for value in rows[0]]
+        if not any(re.search(r'[A-Za-z]', value) for value in first):
+            return False
+        if len(rows) < 2:
+            return True
+        below = pd.DataFrame(rows[1:]).fillna('')
+        typed = False
+        for position, value in enumerate(first[:below.shape[1]]):
+            # A blank header cell says nothing either way
+            if not value or infer_column_kind(below.iloc[:, position])[0] is None:
+                continue
+            typed = True
+            if infer_column_kind(pd.Series([value]))[0] is None:
+                return True
+        return not typed
+
+    def add(self, rows):
+        """Merge one extraction's rows, returning the rows that were new"""
+        rows = [list(row) for row in rows if any(str(value).strip() for value in row)]
+        if not rows:
+            return []
+        self.captures += 1
+
+        positions = None
+        if self.header:
+            first = [self._normalize(value) for value in rows[0]]
+            if self.columns:
+                known = sum(name in self._lookup for name in first if name)
+                is_header = known * 2 >= len([name for name in first if name])
+            else:
+                is_header = self._starts_with_header(rows)
+            # Captures that continue a list below its header have no header row
+            if is_header:
+                positions = self._header_positions(rows[0])
+                header_key = tuple(first)
+                rows = rows[1:]
+        if positions is None:
+            positions = list(range(len(self.columns)))
+            header_key = None
+
+        resolved = self._resolve_key()
+        if resolved != self._key_positions:
+            self._reindex()
+
+        added = []
+        for row in rows:
+            if header_key is not None and tuple(self._normalize(v) for v in row) == header_key:
+                continue  # Header repeated inside the capture
+            while len(positions) < len(row):
+                positions.append(self._add_column())
+            aligned = [''] * len(self.columns)
+            for position, value in zip(positions, row):
+                aligned[position] = value
+            key = self._row_key(aligned)
+            if key is not None:
+                if key in self._index:
+                    self.duplicates += 1
+                    continue
+                self._index[key] = len(self.rows)
+            self.rows.append(aligned)
+            added.append(aligned)
+        return added
+
+    def to_frame(self, rows=None):
+        """Return the accumulated rows (or the given subset) as a DataFrame"""
+        rows = self.rows if rows is None else rows
+        width = len(self.columns)
+        return pd.DataFrame([row + [''] * (width - len(row)) for row in rows],
+                            columns=self.columns)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+# Typed column conversion for FM value formats. Each pattern is matched
+# against whole, stripped cell values by the vectorized converters below.
+MONEY_PATTERN = (
+    r'^(?P<sign>-)?\s*[£€$]?\s*(?P<sign2>-)?(?P<number>\d[\d,]*(?:\.\d+)?|\.\d+)\s*'
+    r'(?P<suffix>bn|[kmb])?\s*'
+    r'(?:p\s*[/|il1]?\s*[wma]|/\s*(?:w|wk|m|mth|yr|y)|per\s+(?:week|month|year|annum))?$'
+)
+MONEY_MULTIPLIERS = {'k': 1e3, 'm': 1e6, 'b': 1e9, 'bn': 1e9}
+RANGE_PATTERN = r'^(?P<low>[£€$]?\s*\d.*?)\s*(?:\s-\s|–|-(?=\s*[£€$]?\d))\s*(?P<high>[£€$]?\s*\d.*)$'
+HEIGHT_PATTERN = r'^(?:(?P<feet>\d)\s*\'\s*(?P<inches>\d{1,2})\s*(?:"|\'\'|”)?|(?P<cm>\d{2,3})\s*cm)$'
+MISSING_VALUES = ('', '-', '--', '—', 'n/a', 'N/A')
+TYPE_MATCH_RATIO = 0.9  # Share of non-empty cells that must parse for a column to convert
+
+
+def parse_money(value):
+    """Parse a money string such as "£1.2M", "€45K p/w" or "1,250.50".
+
+    Values that do not look like money fall back to stripping everything
+    but digits, the decimal point and minus sign; unparseable input is 0.0.
+    """
+    if value is None:
+        return 0.0
+    text = str(value).strip()
+    match = re.match(MONEY_PATTERN, text, re.IGNORECASE)
+    if match:
+        number = float(match.group('number').replace(',', ''))
+        suffix = (match.group('suffix') or '').lower()
+        number *= MONEY_MULTIPLIERS.get(suffix, 1)
+        if match.group('sign') or match.group('sign2'):
+            number = -number
+        return number
+    cleaned = re.sub(r'[^0-9.\-]', '', text)
+    if cleaned in ('', '-', '.', '-.'):
+        return 0.0
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+def _money_values(values):
+    """Vectorized parse_money for a string Series, NaN where it doesn't match"""
+    parts = values.str.extract(MONEY_PATTERN, flags=re.IGNORECASE)
+    number = pd.to_numeric(parts['number'].str.replace(',', '', regex=False), errors='coerce')
+    multiplier = parts['suffix'].str.lower().map(MONEY_MULTIPLIERS).fillna(1.0)
+    sign = np.where(parts['sign'].notna() | parts['sign2'].notna(), -1.0, 1.0)
+    return number * multiplier * sign
+
+
+def _number_values(values):
+    cleaned = values.where(values.str.fullmatch(r'-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|-?\.\d+'))
+    return pd.to_numeric(cleaned.str.replace(',', '', regex=False), errors='coerce')
+
+
+def _integer_values(values):
+    number = _number_values(values)
+    return number.where(values.str.fullmatch(r'-?[\d,]+'))
+
+
+def _percent_values(values):
+    number = values.str.extract(r'^(-?\d+(?:\.\d+)?)\s*%$', expand=False)
+    return pd.to_numeric(number, errors='coerce')
+
+
+def _height_values(values):
+    parts = values.str.extract(HEIGHT_PATTERN)
+    inches = pd.to_numeric(parts['feet'], errors='coerce') * 12 + pd.to_numeric(parts['inches'], errors='coerce')
+    return (inches * 2.54).round().fillna(pd.to_numeric(parts['cm'], errors='coerce'))
+
+
+# Column kinds in the order they are tried: (name, parser, integer result)
+COLUMN_KINDS = (
+    ('int', _integer_values, True),
+    ('float', _number_values, False),
+    ('percent', _percent_values, False),
+    ('height', _height_values, True),
+    ('money', _money_values, False),
+)
+
+
+def _compact(number, integer):
+    """Cast parsed numbers to the smallest fitting dtype"""
+    if not integer:
+        return number.astype('float32')
+    present = number.dropna()
+    low, high = (present.min(), present.max()) if len(present) else (0, 0)
+    for bits in (8, 16, 32, 64):
+        info = np.iinfo(f'int{bits}')
+        if info.min <= low and high <= info.max:
+            break
+    if number.isna().any():
+        return number.astype(f'Int{bits}')  # Nullable so missing cells stay missing
+    return number.astype(f'int{bits}')
+
+
+def infer_column_kind(values):
+    """Return (kind, parsed numbers, range high values or None) for a string Series"""
+    # Parse each distinct value once; FM columns repeat heavily (ages, attributes)
+    codes, uniques = pd.factorize(values.astype(str), use_na_sentinel=False)
+    counts = np.bincount(codes, minlength=len(uniques))
+    text = pd.Series(uniques, dtype=object).str.strip()
+    present = ~text.isin(MISSING_VALUES).to_numpy()
+    needed = counts[present].sum() * TYPE_MATCH_RATIO
+    if not present.any():
+        return None, None, None
+
+    def matched(parsed):
+        return counts[parsed.notna().to_numpy() & present].sum() >= needed
+
+    def expand(parsed, integer):
+        parsed = parsed.where(present).to_numpy()[codes]
+        return _compact(pd.Series(parsed, index=values.index, dtype='float64'), integer)
+
+    # Every kind starts with a digit, so text columns are rejected in one pass
+    if not matched(text.where(text.str.match(r'-?\s*[£€$]?\s*-?\.?\d'))):
+        return None, None, None
+    ranges = text.str.extract(RANGE_PATTERN)
+    is_range = ranges['low'].notna().to_numpy() & present
+    low_text = ranges['low'].where(is_range, text)
+    high_text = ranges['high'].where(is_range, text)
+    for kind, parser, integer in COLUMN_KINDS:
+        low = parser(low_text.fillna(''))
+        if not matched(low):
+            continue
+        if not is_range.any():
+            return kind, expand(low, integer), None
+        high = parser(high_text.fillna(''))
+        if matched(high):
+            return kind, expand(low, integer), expand(high, integer)
+    return None, None, None
+
+
+def convert_column_types(df, header='auto'):
+    """Convert string columns of extracted FM data to compact numeric dtypes.
+
+    Money ("£1.2M", "€45K p/w") becomes float32, whole numbers the smallest
+    integer type that fits (int8 for attributes), percentages float32 and
+    heights (6'1", 185 cm) integer centimetres. Columns holding ranges such
+    as "12-15" or "£1M - £2M" are split into "<name> min" and "<name> max".
+    Columns where fewer than TYPE_MATCH_RATIO of the cells parse are left
+    as text. With header='auto' the first row becomes the column names when
+    the columns are unnamed and it looks like a header row.
+    """
+    if df.empty:
+        return df.copy()
+    data = df.copy()
+    if header == 'auto':
+        header = isinstance(data.columns, pd.RangeIndex) and len(data) > 1 and _looks_like_header(data)
+    if header:
+        names = [str(v).strip() if str(v).strip() else f"Column {i + 1}"
+                 for i, v in enumerate(data.iloc[0])]
+        data = data.iloc[1:].reset_index(drop=True)
+        data.columns = names
+
+    columns = {}
+    for name in data.columns:
+        kind, low, high = infer_column_kind(data[name].fillna(''))
+        if kind is None:
+            columns[name] = data[name]
+        elif high is None:
+            columns[name] = low
+        else:
+            columns[f"{name} min"] = low
+            columns[f"{name} max"] = high
+    return pd.DataFrame(columns)
+
+
+def _looks_like_header(data):
+    """True when the first row fails to parse in columns whose other rows are numeric"""
+    first = data.iloc[0].fillna('').astype(str).str.strip()
+    if not first.str.contains(r'[A-Za-z]').any():
+        return False
+    for position in range(data.shape[1]):
+        kind, low, _ = infer_column_kind(data.iloc[1:, position].fillna(''))
+        if kind is not None:
+            parsed, _, _ = infer_column_kind(pd.Series([first.iloc[position]]))
+            if parsed is None:
+                return True
+    return False
+
+
+class TableExporter:
+    """Streams DataFrame chunks to a file as they are produced.
+
+    Subclasses implement _write(frame) for one format. Column names are
+    normalized to strings and the set of columns may grow between chunks;
+    each format handles that in its own way. Use as a context manager or
+    call close() when done.
+    """
+
+    supports_append = True
+
+    def __init__(self, path, append=False):
+        if append and not self.supports_append:
+            raise ValueError(f"Appending is not supported for {os.path.basename(path)}")
+        self.path = path
+        self.append = append
+        self.columns = []
+        self.rows_written = 0
+
+    def write(self, frame):
+        """Write a DataFrame (or list of row lists) chunk"""
+        if not isinstance(frame, pd.DataFrame):
+            frame = pd.DataFrame(frame)
+        if frame.empty:
+            return
+        frame = frame.rename(columns=str)
+        new_columns = [col for col in frame.columns if col not in self.columns]
+        if new_columns:
+            self._add_columns(new_columns)
+            self.columns.extend(new_columns)
+        self._write(frame.reindex(columns=self.columns))
+        self.rows_written += len(frame)
+
+    def _add_columns(self, new_columns):
+        pass
+
+    def _write(self, frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CSVExporter(TableExporter):
+    """CSV rows appended to the file as each chunk arrives"""
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self._has_header = False
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, newline='', encoding='utf-8') as f:
+                self.columns = next(csv.reader(f), [])
+            self._has_header = True
+        elif not append or not os.path.exists(path):
+            open(path, 'w', encoding='utf-8').close()
+
+    def _add_columns(self, new_columns):
+        if self._has_header:
+            # Rare: widen the header by rewriting what is already on disk
+            existing = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+            existing = existing.reindex(columns=self.columns + new_columns, fill_value='')
+            existing.to_csv(self.path, index=False)
+
+    def _write(self, frame):
+        # pandas prints float32 as e.g. 1.12e+07; write the shortest plain decimal
+        for col in frame.columns[frame.dtypes == 'float32']:
+            frame[col] = [np.format_float_positional(v, trim='-') if v == v else ''
+                          for v in frame[col].to_numpy()]
+        frame.to_csv(self.path, mode='a', header=not self._has_header, index=False)
+        self._has_header = True
+
+
+class NDJSONExporter(TableExporter):
+    """One JSON object per row, appended per chunk"""
+
+    def __init__(self, path, append=False):
+        super().__init__(path, append)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def _write(self, frame):
+        text = frame.to_json(orient='records', lines=True, force_ascii=False)
+        self._file.write(text if text.endswith('\n') else text + '\n')
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class SQLiteExporter(TableExporter):
+    """Rows inserted into a SQLite table, one transaction per chunk"""
+
+    def __init__(self, path, append=False, table='extracted_data'):
+        super().__init__(path, append)
+        self.table = table
+        self._conn = sqlite3.connect(path)
+        quoted = self._quote(table)
+        if not append:
+            self._conn.execute(f"DROP TABLE IF EXISTS {quoted}")
+        info = self._conn.execute(f"PRAGMA table_info({quoted})").fetchall()
+        self.columns = [row[1] for row in info]
+
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def _add_columns(self, new_columns):
+        quoted = self._quote(self.table)
+        if not self.columns:
+            column_defs = ', '.join(f"{self._quote(col)}" for col in new_columns)
+            self._conn.execute(f"CREATE TABLE {quoted} ({column_defs})")
+        else:
+            for col in new_columns:
+                self._conn.execute(f"ALTER TABLE {quoted} ADD COLUMN {self._quote(col)}")
+
+    def _write(self, frame):
+        placeholders = ', '.join('?' for _ in self.columns)
+        column_list = ', '.join(self._quote(col) for col in self.columns)
+        # sqlite3 only binds plain Python values, not numpy scalars or pd.NA
+        values = (
+            tuple(None if pd.isna(v) else v.item() if hasattr(v, 'item') else v for v in row)
+            for row in frame.itertuples(index=False, name=None)
+        )
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO {self._quote(self.table)} ({column_list}) VALUES ({placeholders})",
+                values,
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+class ArrowExporter(TableExporter):
+    """Parquet or Feather file written through pyarrow.
+
+    Each chunk is written as it arrives (a Parquet row group or an Arrow
+    record batch), so memory use does not grow with the run. The first
+    chunk sets the file's schema, with numbers widened to 64 bits so later
+    typed chunks fit. A column that first appears in a later chunk is rare;
+    the file is then rewritten with the column added, empty in earlier rows.
+    """
+
+    supports_append = False
+
+    def __init__(self, path, append=False, fmt='parquet'):
+        super().__init__(path, append)
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError(
+                f"Writing {fmt} files requires pyarrow: uv pip install pyarrow"
+            ) from None
+        self._pa = pyarrow
+        self.fmt = fmt
+        self._schema = None
+        self._writer = None
+        self._sink = None
+        self._widening = False
+
+    def _add_columns(self, new_columns):
+        # The new columns' types are only known once their chunk is converted
+        self._widening = self._writer is not None
+
+    def _widen(self, arrow_type):
+        types = self._pa.types
+        if types.is_integer(arrow_type):
+            return self._pa.int64()
+        if types.is_floating(arrow_type):
+            return self._pa.float64()
+        if types.is_null(arrow_type):
+            return self._pa.string()  # Column empty in the first chunk
+        return arrow_type
+
+    def _open(self, schema):
+        pa = self._pa
+        self._schema = pa.schema([pa.field(field.name, self._widen(field.type))
+                                  for field in schema])
+        if self.fmt == 'feather':
+            # Feather v2 is the Arrow IPC file format
+            self._sink = pa.OSFile(self.path, 'wb')
+            options = pa.ipc.IpcWriteOptions(compression='lz4') \
+                if pa.Codec.is_available('lz4') else None
+            self._writer = pa.ipc.new_file(self._sink, self._schema, options=options)
+        else:
+            import pyarrow.parquet
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, self._schema)
+
+    def _read_written(self):
+        """Everything written so far, read back after closing the writer"""
+        pa = self._pa
+        self.close()
+        if self.fmt == 'feather':
+            with pa.OSFile(self.path, 'rb') as source:
+                return pa.ipc.open_file(source).read_all()
+        import pyarrow.parquet
+        return pyarrow.parquet.read_table(self.path)
+
+    def _write(self, frame):
+        table = self._pa.Table.from_pandas(frame, preserve_index=False)
+        if self._widening:
+            # Rare: widen the schema by rewriting what is already on disk
+            self._widening = False
+            written = self._read_written()
+            for field in table.schema:
+                if field.name not in written.column_names:
+                    written = written.append_column(
+                        field.name, self._pa.nulls(len(written), self._widen(field.type)))
+            self._open(written.schema)
+            self._writer.write_table(written)
+        elif self._writer is None:
+            self._open(table.schema)
+        try:
+            table = table.cast(self._schema)
+        except (self._pa.ArrowInvalid, self._pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Rows do not match the column types of {self.path}: {e}") from None
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+# Export formats by file extension
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.sqlite': 'sqlite',
+    '.sqlite3': 'sqlite',
+    '.db': 'sqlite',
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+}
+
+# File dialog choices for the GUI export
+EXPORT_FILETYPES = [
+    ("CSV files", "*.csv"),
+    ("NDJSON files", "*.ndjson *.jsonl"),
+    ("SQLite database", "*.sqlite *.db"),
+    ("Parquet files (pyarrow)", "*.parquet"),
+    ("Feather files (pyarrow)", "*.feather"),
+    ("All files", "*.*"),
+]
+
+
+def open_exporter(path, fmt=None, append=False, table='extracted_data'):
+    """Create the exporter for a path, picking the format from its extension"""
+    if fmt is None:
+        fmt = EXPORT_FORMATS.get(os.path.splitext(path)[1].lower(), 'csv')
+    if fmt == 'csv':
+        return CSVExporter(path, append)
+    if fmt == 'ndjson':
+        return NDJSONExporter(path, append)
+    if fmt == 'sqlite':
+        return SQLiteExporter(path, append, table=table)
+    if fmt in ('parquet', 'feather'):
+        return ArrowExporter(path, append, fmt=fmt)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+WAGE_WEEKS_PER_YEAR = 52
+WAGE_MIN_BUDGET_SHARE = 0.75  # The budget never drops below this share of the wage bill
+WAGE_MAX_PLAYER_FACTOR = 2  # Top earner may take this multiple of the average wage
+WAGE_SCENARIO_MODES = ('grid', 'monte carlo')
+WAGE_SCENARIO_GRID_STEPS = 5  # Values taken from each "low..high" range in grid mode
+WAGE_SCENARIO_SAMPLES = 2000
+WAGE_SCENARIO_PERCENTILES = (10, 50, 90)
+WAGE_SCENARIO_TABLE_ROWS = 200  # Scenarios listed in the results table
+
+
+def wage_budget_scenarios(current_balance, prior_balance, prize_actual, prize_expected,
+                          net_transfer, current_wages, squad_size=25, weekly=False,
+                          seasons=1):
+    """Project wage budgets for many scenarios at once.
+
+    Inputs are numbers or arrays that broadcast to (scenarios,) or
+    (scenarios, seasons); the second axis gives each season its own prize
+    money, transfer spend or squad size. Each season's budget becomes the
+    next season's wage bill. Returns a dict of (scenarios, seasons) arrays,
+    except 'profit' and 'current_wages' which describe the past season.
+    """
+    def as_2d(value):
+        array = np.asarray(value, dtype=float)
+        return array.reshape(-1, 1) if array.ndim < 2 else array
+
+    inputs = [as_2d(value) for value in (current_balance, prior_balance, prize_actual,
+                                         prize_expected, net_transfer, current_wages,
+                                         squad_size, weekly)]
+    shape = np.broadcast_shapes((1, max(1, int(seasons))), *(a.shape for a in inputs))
+    (balance, prior, actual, prize, transfer, wages, squad,
+     weekly) = (np.broadcast_to(a, shape) for a in inputs)
+
+    wages = np.where(weekly[:, 0] > 0, wages[:, 0] * WAGE_WEEKS_PER_YEAR, wages[:, 0])
+    balance = balance[:, 0]
+    profit = balance - prior[:, 0]
+    # Last season's profit without its one-off prize money, at the current wage bill
+    operating = profit - actual[:, 0]
+    squad = np.maximum(1, squad)
+
+    result = {'profit': profit, 'current_wages': wages, 'prize_expected': prize,
+              'net_transfer': transfer, 'squad_size': squad}
+    for key in ('wage_bill', 'adjusted_profit', 'available', 'expected_balance'):
+        result[key] = np.empty(shape)
+    bill = wages
+    for season in range(shape[1]):
+        adjusted = operating - (bill - wages) + prize[:, season] - transfer[:, season]
+        available = np.maximum(adjusted + bill, bill * WAGE_MIN_BUDGET_SHARE)
+        balance = balance + adjusted - (available - bill)
+        result['wage_bill'][:, season] = bill
+        result['adjusted_profit'][:, season] = adjusted
+        result['available'][:, season] = available
+        result['expected_balance'][:, season] = balance
+        bill = available
+    result['avg_per_player'] = result['available'] / squad
+    result['max_per_player'] = result['avg_per_player'] * WAGE_MAX_PLAYER_FACTOR
+    return result
+
+
+def parse_scenario_values(spec, integer=False):
+    """Parse a scenario input: a value "5M", a range "2M..8M" or a list "2M; 5M; 8M".
+
+    Returns (kind, values) with kind 'value', 'range' or 'list'; blank input
+    gives None. Raises ValueError for parts that are not amounts.
+    """
+    text = (spec or '').strip()
+    if not text:
+        return None
+
+    def parse(part):
+        if not re.match(MONEY_PATTERN, part.strip(), re.IGNORECASE):
+            raise ValueError(f"Cannot read {part.strip()!r} as a number")
+        value = parse_money(part)
+        return float(int(value)) if integer else value
+
+    if '..' in text:
+        low, high = sorted(parse(part) for part in text.split('..', 1))
+        return 'range', [low, high]
+    parts = [part for part in text.split(';') if part.strip()]
+    if len(parts) > 1:
+        return 'list', [parse(part) for part in parts]
+    return 'value', [parse(parts[0] if parts else text)]  # "2M;" is one value
+
+
+def sample_scenarios(specs, mode='grid', seasons=1, samples=WAGE_SCENARIO_SAMPLES,
+                     steps=WAGE_SCENARIO_GRID_STEPS, seed=None):
+    """Turn parsed scenario inputs into arrays for wage_budget_scenarios.
+
+    specs maps an input name to (parsed, integer) from parse_scenario_values.
+    Grid mode takes every combination of the listed or evenly spaced range
+    values, giving (scenarios,) arrays. Monte Carlo draws each varying input
+    independently per season, uniformly from ranges or from lists, giving
+    (samples, seasons) arrays. Fixed values stay scalars.
+    """
+    if mode not in WAGE_SCENARIO_MODES:
+        raise ValueError(f"Unknown scenario mode: {mode}")
+    fixed = {name: parsed[1][0] for name, (parsed, integer) in specs.items()
+             if parsed[0] == 'value'}
+    varying = {name: spec for name, spec in specs.items() if name not in fixed}
+    if not varying:
+        return fixed
+    if mode == 'grid':
+        axes = []
+        for (kind, values), integer in varying.values():
+            if kind == 'range':
+                values = np.linspace(values[0], values[1], max(2, int(steps)))
+                values = np.unique(np.round(values)) if integer else values
+            axes.append(np.asarray(values, dtype=float))
+        grids = np.meshgrid(*axes, indexing='ij')
+        fixed.update((name, grid.ravel()) for name, grid in zip(varying, grids))
+        return fixed
+    rng = np.random.default_rng(seed)
+    size = (max(1, int(samples)), max(1, int(seasons)))
+    for name, ((kind, values), integer) in varying.items():
+        if kind == 'list':
+            fixed[name] = rng.choice(np.asarray(values, dtype=float), size)
+        elif integer:
+            fixed[name] = rng.integers(int(values[0]), int(values[1]), size,
+                                       endpoint=True).astype(float)
+        else:
+            fixed[name] = rng.uniform(values[0], values[1], size)
+    return fixed
+
+
+# Seconds a window list stays fresh before the next refresh
+WINDOW_LIST_TTL = 5.0
+
+# One sweep over foreground apps only; fields are tab separated, one window per line
+MACOS_WINDOW_SCRIPT = """
+tell application "System Events"
+    set output to ""
+    repeat with proc in (processes whose background only is false)
+        try
+            set procName to name of proc
+            if procName is not "Screen Data Scanner" and procName is not "SystemUIServer" then
+                repeat with win in windows of proc
+                    try
+                        set winTitle to title of win
+                        if winTitle is not "" then
+                            set output to output & procName & tab & winTitle & linefeed
+                        end if
+                    end try
+                end repeat
+            end if
+        end try
+    end repeat
+    return output
+end tell
+"""
+
+
+def list_windows_macos():
+    """Return [{'title', 'app'}] for titled windows of foreground macOS apps"""
+    result = subprocess.run(['osascript', '-e', MACOS_WINDOW_SCRIPT],
+                            capture_output=True, text=True, timeout=10)
+    windows = []
+    if result.returncode == 0:
+        for line in result.stdout.splitlines():
+            app, _, title = line.partition('\t')
+            if title.strip():
+                windows.append({'title': f"{app} - {title}", 'app': app})
+    return windows
+
+
+def list_windows_win32(app_names=None):
+    """Return [{'title', 'app', 'hwnd'}] for visible titled windows.
+
+    app_names caches executable names by process id across calls, so only
+    processes not seen before are opened. Raises ImportError without pywin32.
+    """
+    import win32gui
+    import win32process
+    import win32api
+
+    if app_names is None:
+        app_names = {}
+    windows = []
+
+    def enum_windows_callback(hwnd, windows):
+        if win32gui.IsWindowVisible(hwnd):
+            title = win32gui.GetWindowText(hwnd)
+            if title:
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                if pid not in app_names:
+                    try:
+                        handle = win32api.OpenProcess(0x0410, False, pid)
+                        try:
+                            app_names[pid] = os.path.basename(
+                                win32process.GetModuleFileNameEx(handle, 0))
+                        finally:
+                            win32api.CloseHandle(handle)
+                    except Exception:
+                        app_names[pid] = 'Unknown'
+                windows.append({'title': title, 'app': app_names[pid], 'hwnd': hwnd})
+        return True
+
+    win32gui.EnumWindows(enum_windows_callback, windows)
+    return windows
+
+
+class WindowList:
+    """Cached list of open windows, refreshed on a background thread.
+
+    snapshot() returns the last list immediately; refresh() starts at most
+    one enumeration at a time and calls every listener with the new list
+    (on the worker thread) when it finishes. error is set to the exception
+    from the last failed enumeration.
+    """
+
+    def __init__(self, ttl=WINDOW_LIST_TTL):
+        self.ttl = ttl
+        self.windows = []
+        self.updated = None
+        self.error = None
+        self._app_names = {}  # pid -> executable name (Windows)
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def is_stale(self):
+        return self.updated is None or time.monotonic() - self.updated > self.ttl
+
+    def is_refreshing(self):
+        return self._thread is not None
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.windows)
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def refresh(self, force=False):
+        """Start a background refresh if the list is stale; returns True if one is running"""
+        with self._lock:
+            if self._thread is not None:
+                return True
+            if not force and not self.is_stale():
+                return False
+            self._thread = threading.Thread(target=self._refresh_thread, daemon=True)
+            self._thread.start()
+            return True
+
+    def _enumerate(self):
+        if sys.platform == 'darwin':
+            return list_windows_macos()
+        if sys.platform == 'win32':
+            return list_windows_win32(self._app_names)
+        return []
+
+    def _refresh_thread(self):
+        try:
+            windows, error = self._enumerate(), None
+        except Exception as e:
+            windows, error = None, e
+        with self._lock:
+            if windows is not None:
+                self.windows = windows
+            self.error = error
+            self.updated = time.monotonic()
+            self._thread = None
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(self.snapshot())
+
+
+class ScreenScannerApp:
+    def __init__(self, root, startup_profile=False, metrics_log=None):
+        self.root = root
+        self.startup_profile = startup_profile
+        self.metrics_log = MetricsLog(metrics_log) if metrics_log else None
+        self.root.title("Screen Data Scanner")
+        self.root.geometry("800x600")
+        
+        # Variables
+        self.captured_image = None  # Screenshot loaded from a file (PIL)
+        self.captured_frame = None  # Screen capture as a BGRA or gray array
+        self._capture_stage = None  # Timing of the screen grab, for job metrics
+        self.screen = ScreenCapture()  # Kept open for repeated grabs
+        self._preview = None  # PreviewPyramid being shown
+        self._preview_zoom = 1.0
+        self._preview_tiles = {}  # (tx, ty) -> (PhotoImage, canvas item)
+        self._preview_token = 0
+        self._preview_cache = OrderedDict()  # id(image) -> (image, PreviewPyramid)
+        self._preview_render_pending = False
+        self.processed_data = None
+        self.screenshot_path = None
+        self.selected_window = None  # Store selected window info
+        self.ocr_cache = OCRCache()  # Reuse results for repeat extractions
+        self.capture_rect = None  # Last captured screen area (x1, y1, x2, y2)
+        self.scroll_stitcher = None  # Active scroll capture, if any
+        self.region_watcher = None  # Active watch mode, if any
+        self.session = ExtractionSession()  # Accumulated captures
+        self.window_list = WindowList()  # Open windows, refreshed in the background
+        self.templates = TemplateStore()  # Saved column templates of FM views
+        # Queued extractions; workers report back through the Tk event loop
+        self.jobs = ExtractionQueue(
+            cache=self.ocr_cache,
+            listener=lambda job: self.root.after(0, self._job_changed, job))
+        self._jobs_finished = set()  # Ids of jobs whose result has been shown
+        
+        # Setup GUI
+        self.setup_ui()
+        self._ui_ready_time = time.perf_counter()
+        
+        # Load heavy modules and check for Tesseract without blocking the UI
+        self.root.after_idle(self._start_warm_up)
+    
+    def _start_warm_up(self):
+        """Start background import of heavy modules and the Tesseract probe"""
+        self._first_idle_time = time.perf_counter()
+        self.status_var.set("Starting up - loading OCR components...")
+        thread = threading.Thread(target=self._warm_up_thread, daemon=True)
+        thread.start()
+    
+    def _warm_up_thread(self):
+        """Import heavy modules and probe Tesseract (background thread)"""
+        start = time.perf_counter()
+        for module in WARM_UP_MODULES:
+            try:
+                module.load()
+            except Exception as e:
+                print(f"Failed to load {module._name}: {e}")
+        imports_done = time.perf_counter()
+        result = self._probe_tesseract()
+        probe_done = time.perf_counter()
+        timings = {
+            'warm_up_imports': imports_done - start,
+            'tesseract_probe': probe_done - imports_done,
+        }
+        self.root.after(0, self._warm_up_complete, result, timings)
+    
+    def _warm_up_complete(self, result, timings):
+        """Show the Tesseract probe result and the optional startup profile"""
+        self.check_tesseract(result)
+        # Have the window list ready before "Select Window" is first clicked
+        self.window_list.refresh()
+        if self.startup_profile:
+            print_startup_profile({
+                'window_ready': self._ui_ready_time - _STARTUP_T0,
+                'first_idle': self._first_idle_time - _STARTUP_T0,
+                **timings,
+                'fully_ready': time.perf_counter() - _STARTUP_T0,
+            })
+    
+    def setup_ui(self):
+        """Create the user interface"""
+        # Main frame
+        main_frame = ttk.Frame(self.root, padding="10")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Title
+        title_label = ttk.Label(main_frame, text="Screen Data Scanner", 
+                               font=("Arial", 16, "bold"))
+        title_label.grid(row=0, column=0, columnspan=2, pady=(0, 20))
+        
+        # Tabs
+        notebook = ttk.Notebook(main_frame)
+        notebook.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        scan_tab = ttk.Frame(notebook, padding="10")
+        budget_tab = ttk.Frame(notebook, padding="10")
+        notebook.add(scan_tab, text="Screen Scan")
+        notebook.add(budget_tab, text="Wage Budget")
+
+        # Instructions
+        instructions = ttk.Label(
+            scan_tab,
+            text="1. Click 'Select Window' to choose a window, or 'Select Area' for manual selection\n"
+                 "2. Preview and adjust if needed\n"
+                 "3. Click 'Extract Data' to process\n"
+                 "4. Click 'Export Data' to save as CSV, NDJSON, SQLite or Parquet",
+            justify=tk.LEFT,
+        )
+        instructions.grid(row=0, column=0, columnspan=2, pady=(0, 20), sticky=tk.W)
+        
+        # Buttons frame
+        button_frame = ttk.Frame(scan_tab)
+        button_frame.grid(row=1, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
+        for idx in range(6):
+            button_frame.columnconfigure(idx, weight=1, uniform="scan_buttons")
+        
+        # Select Window button
+        self.select_window_btn = ttk.Button(button_frame, text="Select Window",
+                                           command=self.select_window)
+        self.select_window_btn.grid(row=0, column=0, padx=5, sticky=(tk.W, tk.E))
+        
+        # Select Area button
+        self.select_btn = ttk.Button(button_frame, text="Select Area to Scan",
+                                     command=self.select_area)
+        self.select_btn.grid(row=0, column=1, padx=5, sticky=(tk.W, tk.E))
+        
+        # Extract Data button
+        self.extract_btn = ttk.Button(button_frame, text="Extract Data",
+                                      command=self.extract_data,
+                                      state=tk.DISABLED)
+        self.extract_btn.grid(row=0, column=2, padx=5, sticky=(tk.W, tk.E))
+        
+        # Export Data button
+        self.export_btn = ttk.Button(button_frame, text="Export Data",
+                                     command=self.export_data,
+                                     state=tk.DISABLED)
+        self.export_btn.grid(row=0, column=3, padx=5, sticky=(tk.W, tk.E))
+
+        # Upload Screenshot button
+        self.upload_btn = ttk.Button(button_frame, text="Upload Screenshot",
+                                     command=self.upload_screenshot)
+        self.upload_btn.grid(row=0, column=4, padx=5, sticky=(tk.W, tk.E))
+
+        # Scroll Capture button
+        self.scroll_btn = ttk.Button(button_frame, text="Scroll Capture",
+                                     command=self.toggle_scroll_capture,
+                                     state=tk.DISABLED)
+        self.scroll_btn.grid(row=0, column=5, padx=5, sticky=(tk.W, tk.E))
+
+        # Extraction options
+        options_frame = ttk.Frame(button_frame)
+        options_frame.grid(row=1, column=0, columnspan=6, padx=5, pady=(8, 0), sticky=tk.W)
+        ttk.Label(options_frame, text="Layout:").pack(side=tk.LEFT)
+        self.layout_var = tk.StringVar(value="text")
+        layout_combo = ttk.Combobox(options_frame, textvariable=self.layout_var,
+                                    values=LAYOUT_MODES, state="readonly", width=8)
+        layout_combo.pack(side=tk.LEFT, padx=(5, 0))
+
+        ttk.Label(options_frame, text="Preprocess:").pack(side=tk.LEFT, padx=(20, 0))
+        self.preset_var = tk.StringVar(value=DEFAULT_PRESET)
+        preset_combo = ttk.Combobox(options_frame, textvariable=self.preset_var,
+                                    values=list(PREPROCESS_PRESETS), state="readonly", width=9)
+        preset_combo.pack(side=tk.LEFT, padx=(5, 0))
+
+        ttk.Label(options_frame, text="Watch every (s):").pack(side=tk.LEFT, padx=(20, 0))
+        self.watch_interval_var = tk.StringVar(value="1.0")
+        ttk.Spinbox(options_frame, textvariable=self.watch_interval_var,
+                    from_=0.2, to=60, increment=0.2, width=5).pack(side=tk.LEFT, padx=(5, 0))
+        self.watch_btn = ttk.Button(options_frame, text="Watch Area",
+                                    command=self.toggle_watch, state=tk.DISABLED)
+        self.watch_btn.pack(side=tk.LEFT, padx=(5, 0))
+
+        self.typed_export_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Numeric columns",
+                        variable=self.typed_export_var).pack(side=tk.LEFT, padx=(20, 0))
+
+        self.export_append_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(options_frame, text="Append on export",
+                        variable=self.export_append_var).pack(side=tk.LEFT, padx=(20, 0))
+
+        # Session: combine several captures into one table
+        session_frame = ttk.Frame(button_frame)
+        session_frame.grid(row=2, column=0, columnspan=6, padx=5, pady=(8, 0), sticky=tk.W)
+        self.session_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(session_frame, text="Add extractions to session",
+                        variable=self.session_var).pack(side=tk.LEFT)
+        ttk.Label(session_frame, text="Key columns:").pack(side=tk.LEFT, padx=(20, 0))
+        self.session_key_var = tk.StringVar(value="Name, Club")
+        ttk.Entry(session_frame, textvariable=self.session_key_var,
+                  width=20).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(session_frame, text="Clear Session",
+                   command=self.clear_session).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Column templates: known FM views skip layout detection
+        template_frame = ttk.Frame(button_frame)
+        template_frame.grid(row=3, column=0, columnspan=6, padx=5, pady=(8, 0), sticky=tk.W)
+        self.use_templates_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(template_frame, text="Use column templates",
+                        variable=self.use_templates_var).pack(side=tk.LEFT)
+        ttk.Label(template_frame, text="Templates:").pack(side=tk.LEFT, padx=(20, 0))
+        self.template_var = tk.StringVar()
+        self.template_combo = ttk.Combobox(template_frame, textvariable=self.template_var,
+                                           values=self.templates.names(), state="readonly",
+                                           width=16)
+        self.template_combo.pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(template_frame, text="Save Template...",
+                   command=self.save_template).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(template_frame, text="Delete",
+                   command=self.delete_template).pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Wage budget estimator frame
+        budget_frame = ttk.LabelFrame(budget_tab, text="Wage Budget Estimator", padding="10")
+        budget_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        budget_frame.columnconfigure(1, weight=1)
+        budget_frame.columnconfigure(3, weight=1)
+
+        ttk.Label(budget_frame, text="Current balance:").grid(row=0, column=0, sticky=tk.W)
+        ttk.Label(budget_frame, text="Balance a year ago:").grid(row=1, column=0, sticky=tk.W)
+        ttk.Label(budget_frame, text="Prize money (actual):").grid(row=2, column=0, sticky=tk.W)
+        ttk.Label(budget_frame, text="Prize money (expected):").grid(row=3, column=0, sticky=tk.W)
+        ttk.Label(budget_frame, text="Net transfer spend:").grid(row=0, column=2, sticky=tk.W)
+        ttk.Label(budget_frame, text="Current wages:").grid(row=1, column=2, sticky=tk.W)
+        ttk.Label(budget_frame, text="Squad size:").grid(row=2, column=2, sticky=tk.W)
+
+        self.current_balance_var = tk.StringVar()
+        self.prior_balance_var = tk.StringVar()
+        self.prize_actual_var = tk.StringVar()
+        self.prize_expected_var = tk.StringVar()
+        self.net_transfer_var = tk.StringVar()
+        self.current_wages_var = tk.StringVar()
+        self.squad_size_var = tk.StringVar(value="25")
+        self.wage_period_var = tk.StringVar(value="annual")
+
+        self.current_balance_entry = ttk.Entry(budget_frame, textvariable=self.current_balance_var, width=18)
+        self.current_balance_entry.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        self.prior_balance_entry = ttk.Entry(budget_frame, textvariable=self.prior_balance_var, width=18)
+        self.prior_balance_entry.grid(row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        self.prize_actual_entry = ttk.Entry(budget_frame, textvariable=self.prize_actual_var, width=18)
+        self.prize_actual_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        self.prize_expected_entry = ttk.Entry(budget_frame, textvariable=self.prize_expected_var, width=18)
+        self.prize_expected_entry.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        self.net_transfer_entry = ttk.Entry(budget_frame, textvariable=self.net_transfer_var, width=18)
+        self.net_transfer_entry.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
+        self.current_wages_entry = ttk.Entry(budget_frame, textvariable=self.current_wages_var, width=18)
+        self.current_wages_entry.grid(row=1, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
+        self.squad_size_entry = ttk.Entry(budget_frame, textvariable=self.squad_size_var, width=18)
+        self.squad_size_entry.grid(row=2, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
+
+        wage_period_label = ttk.Label(budget_frame, text="Wage period:")
+        wage_period_label.grid(row=3, column=2, sticky=tk.W, pady=(4, 0))
+        wage_period_frame = ttk.Frame(budget_frame)
+        wage_period_frame.grid(row=3, column=3, sticky=tk.W, pady=(4, 0))
+        ttk.Radiobutton(
+            wage_period_frame,
+            text="Weekly",
+            variable=self.wage_period_var,
+            value="weekly",
+            command=self.calculate_wage_budget,
+        ).pack(side=tk.LEFT)
+        ttk.Radiobutton(
+            wage_period_frame,
+            text="Annual",
+            variable=self.wage_period_var,
+            value="annual",
+            command=self.calculate_wage_budget,
+        ).pack(side=tk.LEFT, padx=(8, 0))
+
+        self._money_trace_lock = False
+        for entry, var in (
+            (self.current_balance_entry, self.current_balance_var),
+            (self.prior_balance_entry, self.prior_balance_var),
+            (self.prize_actual_entry, self.prize_actual_var),
+            (self.prize_expected_entry, self.prize_expected_var),
+            (self.net_transfer_entry, self.net_transfer_var),
+            (self.current_wages_entry, self.current_wages_var),
+        ):
+            var.trace_add("write", lambda *args, v=var, e=entry: self._format_money_live(v, e))
+        self.squad_size_var.trace_add(
+            "write",
+            lambda *args: self._format_int_live(self.squad_size_var, self.squad_size_entry),
+        )
+
+        calc_btn = ttk.Button(budget_frame, text="Calculate", command=self.calculate_wage_budget)
+        calc_btn.grid(row=4, column=0, columnspan=4, pady=(8, 6))
+
+        self.current_balance_display_var = tk.StringVar(value="Current balance: -")
+        self.expected_balance_var = tk.StringVar(value="Expected balance (1y): -")
+        self.profit_var = tk.StringVar(value="Profit: -")
+        self.adjusted_profit_var = tk.StringVar(value="Adjusted profit: -")
+        self.total_budget_var = tk.StringVar(value="Available wages: -")
+        self.current_wages_display_var = tk.StringVar(value="Current wages: -")
+        self.expected_wages_var = tk.StringVar(value="Expected wages budget: -")
+        self.avg_spend_var = tk.StringVar(value="Average per player: -")
+        self.max_spend_var = tk.StringVar(value="Max per player (2x avg): -")
+
+        ttk.Label(budget_frame, textvariable=self.current_balance_display_var).grid(row=5, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.expected_balance_var).grid(row=5, column=2, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.profit_var).grid(row=6, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.adjusted_profit_var).grid(row=6, column=2, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.total_budget_var).grid(row=7, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.current_wages_display_var).grid(row=7, column=2, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.expected_wages_var).grid(row=8, column=0, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.avg_spend_var).grid(row=8, column=2, columnspan=2, sticky=tk.W)
+        ttk.Label(budget_frame, textvariable=self.max_spend_var).grid(row=9, column=0, columnspan=2, sticky=tk.W)
+
+        # Scenario explorer: many budget projections at once
+        scenario_frame = ttk.LabelFrame(budget_tab, text="Scenarios", padding="10")
+        scenario_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scenario_frame.columnconfigure(1, weight=1)
+        scenario_frame.columnconfigure(3, weight=1)
+        scenario_frame.rowconfigure(6, weight=1)
+
+        self.scenario_prize_var = tk.StringVar()
+        self.scenario_transfer_var = tk.StringVar()
+        self.scenario_squad_var = tk.StringVar()
+        self.scenario_seasons_var = tk.StringVar(value="3")
+        self.scenario_mode_var = tk.StringVar(value=WAGE_SCENARIO_MODES[0])
+        self.scenario_samples_var = tk.StringVar(value=str(WAGE_SCENARIO_SAMPLES))
+
+        ttk.Label(scenario_frame, text="Prize money (expected):").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(scenario_frame, textvariable=self.scenario_prize_var, width=18).grid(
+            row=0, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        ttk.Label(scenario_frame, text="Net transfer spend:").grid(row=0, column=2, sticky=tk.W)
+        ttk.Entry(scenario_frame, textvariable=self.scenario_transfer_var, width=18).grid(
+            row=0, column=3, sticky=(tk.W, tk.E), padx=(5, 0))
+        ttk.Label(scenario_frame, text="Squad size:").grid(row=1, column=0, sticky=tk.W)
+        ttk.Entry(scenario_frame, textvariable=self.scenario_squad_var, width=18).grid(
+            row=1, column=1, sticky=(tk.W, tk.E), padx=(5, 15))
+        ttk.Label(scenario_frame, text="Seasons:").grid(row=1, column=2, sticky=tk.W)
+        ttk.Spinbox(scenario_frame, textvariable=self.scenario_seasons_var,
+                    from_=1, to=10, increment=1, width=5).grid(row=1, column=3, sticky=tk.W, padx=(5, 0))
+
+        scenario_mode_frame = ttk.Frame(scenario_frame)
+        scenario_mode_frame.grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(4, 0))
+        ttk.Radiobutton(scenario_mode_frame, text="Grid", variable=self.scenario_mode_var,
+                        value="grid").pack(side=tk.LEFT)
+        ttk.Radiobutton(scenario_mode_frame, text="Monte Carlo", variable=self.scenario_mode_var,
+                        value="monte carlo").pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Label(scenario_mode_frame, text="Samples:").pack(side=tk.LEFT, padx=(15, 0))
+        ttk.Entry(scenario_mode_frame, textvariable=self.scenario_samples_var,
+                  width=7).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(scenario_mode_frame, text="Run Scenarios",
+                   command=self.run_wage_scenarios).pack(side=tk.LEFT, padx=(15, 0))
+
+        ttk.Label(
+            scenario_frame,
+            text="Blank uses the value above. Ranges: 2M..8M, lists: 2M; 5M; 8M",
+        ).grid(row=3, column=0, columnspan=4, sticky=tk.W, pady=(4, 0))
+        self.scenario_summary_var = tk.StringVar(value="")
+        ttk.Label(scenario_frame, textvariable=self.scenario_summary_var).grid(
+            row=4, column=0, columnspan=4, sticky=tk.W, pady=(4, 4))
+
+        band_columns = ["season"] + [
+            f"{metric}_p{q}" for metric in ("wages", "balance") for q in WAGE_SCENARIO_PERCENTILES
+        ]
+        self.scenario_bands_tree = ttk.Treeview(scenario_frame, columns=band_columns,
+                                                show="headings", height=4)
+        self.scenario_bands_tree.heading("season", text="Season")
+        self.scenario_bands_tree.column("season", width=60, anchor=tk.CENTER)
+        for column in band_columns[1:]:
+            metric, q = column.split("_p")
+            self.scenario_bands_tree.heading(column, text=f"{metric.title()} P{q}")
+            self.scenario_bands_tree.column(column, width=110, anchor=tk.E)
+        self.scenario_bands_tree.grid(row=5, column=0, columnspan=4, sticky=(tk.W, tk.E))
+
+        self._scenario_columns = OrderedDict((
+            ("prize", "Prize"),
+            ("transfer", "Transfers"),
+            ("squad", "Squad"),
+            ("available", "Wages (S1)"),
+            ("avg", "Avg/player"),
+            ("max", "Max/player"),
+            ("balance", "Final balance"),
+        ))
+        self._scenario_table = None
+        self._scenario_sort = ("balance", True)
+        self.scenario_tree = ttk.Treeview(scenario_frame, columns=list(self._scenario_columns),
+                                          show="headings", height=10)
+        for column, text in self._scenario_columns.items():
+            self.scenario_tree.heading(column, text=text,
+                                       command=lambda c=column: self._sort_scenarios(c))
+            self.scenario_tree.column(column, width=60 if column == "squad" else 110, anchor=tk.E)
+        self.scenario_tree.grid(row=6, column=0, columnspan=4, sticky=(tk.W, tk.E, tk.N, tk.S),
+                                pady=(8, 0))
+        scenario_scrollbar = ttk.Scrollbar(scenario_frame, orient=tk.VERTICAL,
+                                           command=self.scenario_tree.yview)
+        self.scenario_tree.configure(yscrollcommand=scenario_scrollbar.set)
+        scenario_scrollbar.grid(row=6, column=4, sticky=(tk.N, tk.S), pady=(8, 0))
+
+        # Preview frame
+        preview_label = ttk.Label(scan_tab, text="Preview:", font=("Arial", 10, "bold"))
+        preview_label.grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(10, 5))
+        
+        # Zoom controls
+        zoom_frame = ttk.Frame(scan_tab)
+        zoom_frame.grid(row=2, column=1, sticky=tk.E, pady=(10, 5))
+        ttk.Button(zoom_frame, text="-", width=3,
+                   command=lambda: self.zoom_preview(1 / 1.25)).pack(side=tk.LEFT)
+        ttk.Button(zoom_frame, text="Fit", width=5,
+                   command=self.fit_preview).pack(side=tk.LEFT, padx=2)
+        ttk.Button(zoom_frame, text="+", width=3,
+                   command=lambda: self.zoom_preview(1.25)).pack(side=tk.LEFT)
+        self.zoom_var = tk.StringVar(value="")
+        ttk.Label(zoom_frame, textvariable=self.zoom_var, width=6,
+                  anchor=tk.E).pack(side=tk.LEFT, padx=(5, 0))
+
+        # Canvas for image preview, drawn in tiles
+        preview_frame = ttk.Frame(scan_tab)
+        preview_frame.grid(row=3, column=0, columnspan=2, pady=10, sticky=(tk.N, tk.S, tk.E, tk.W))
+        preview_frame.columnconfigure(0, weight=1)
+        preview_frame.rowconfigure(0, weight=1)
+        self.canvas = tk.Canvas(preview_frame, width=750, height=400, bg="white", 
+                               relief=tk.SUNKEN, borderwidth=2)
+        self.canvas.grid(row=0, column=0, sticky=(tk.N, tk.S, tk.E, tk.W))
+        
+        # Scrollbars for canvas
+        scrollbar = ttk.Scrollbar(preview_frame, orient=tk.VERTICAL,
+                                  command=lambda *args: self._scroll_preview('y', *args))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        hscrollbar = ttk.Scrollbar(preview_frame, orient=tk.HORIZONTAL,
+                                   command=lambda *args: self._scroll_preview('x', *args))
+        hscrollbar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.canvas.configure(yscrollcommand=scrollbar.set, xscrollcommand=hscrollbar.set)
+
+        # Wheel scrolls (Shift: sideways, Ctrl: zoom), drag pans
+        self.canvas.bind("<MouseWheel>", self._on_preview_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", lambda e: self._on_preview_wheel(e, axis='x'))
+        self.canvas.bind("<Control-MouseWheel>", lambda e: self._on_preview_wheel(e, zoom=True))
+        self.canvas.bind("<Button-4>", lambda e: self._on_preview_wheel(e, delta=120))
+        self.canvas.bind("<Button-5>", lambda e: self._on_preview_wheel(e, delta=-120))
+        self.canvas.bind("<Control-Button-4>", lambda e: self._on_preview_wheel(e, delta=120, zoom=True))
+        self.canvas.bind("<Control-Button-5>", lambda e: self._on_preview_wheel(e, delta=-120, zoom=True))
+        self.canvas.bind("<ButtonPress-1>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B1-Motion>", self._on_preview_drag)
+        self.canvas.bind("<Configure>", lambda e: self._schedule_preview_render())
+        
+        # Status bar
+        self.status_var = tk.StringVar(value="Ready - Click 'Select Area' to begin")
+        status_bar = ttk.Label(scan_tab, textvariable=self.status_var, 
+                              relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        # Progress bar
+        self.progress = ttk.Progressbar(scan_tab, mode='indeterminate')
+        self.progress.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
+
+        # Extraction jobs
+        jobs_frame = ttk.LabelFrame(scan_tab, text="Jobs", padding="5")
+        jobs_frame.grid(row=6, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.jobs_tree = ttk.Treeview(jobs_frame, columns=("status", "progress", "rows"),
+                                      height=4, selectmode="extended")
+        self.jobs_tree.heading("#0", text="Image")
+        self.jobs_tree.heading("status", text="Status")
+        self.jobs_tree.heading("progress", text="Progress")
+        self.jobs_tree.heading("rows", text="Rows")
+        self.jobs_tree.column("#0", width=260)
+        for column in ("status", "progress", "rows"):
+            self.jobs_tree.column(column, width=90, anchor=tk.CENTER)
+        self.jobs_tree.grid(row=0, column=0, rowspan=2, sticky=(tk.W, tk.E))
+        jobs_scrollbar = ttk.Scrollbar(jobs_frame, orient=tk.VERTICAL,
+                                       command=self.jobs_tree.yview)
+        self.jobs_tree.configure(yscrollcommand=jobs_scrollbar.set)
+        jobs_scrollbar.grid(row=0, column=1, rowspan=2, sticky=(tk.N, tk.S))
+        ttk.Button(jobs_frame, text="Cancel Selected",
+                   command=self.cancel_selected_jobs).grid(row=0, column=2, padx=(5, 0), sticky=(tk.W, tk.E))
+        ttk.Button(jobs_frame, text="Clear Finished",
+                   command=self.clear_finished_jobs).grid(row=1, column=2, padx=(5, 0), sticky=(tk.W, tk.E))
+        jobs_frame.columnconfigure(0, weight=1)
+        
+        # Configure grid weights
+        self.root.columnconfigure(0, weight=1)
+        self.root.rowconfigure(0, weight=1)
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+        scan_tab.columnconfigure(0, weight=1)
+        scan_tab.columnconfigure(1, weight=1)
+        scan_tab.rowconfigure(3, weight=1)
+        budget_tab.columnconfigure(0, weight=1)
+        budget_tab.rowconfigure(1, weight=1)
+
+    def _parse_money_input(self, value):
+        """Parse money input allowing commas, currency symbols and K/M suffixes."""
+        return parse_money(value)
+
+    def _format_money(self, value):
+        """Format money value with commas and sensible decimals."""
+        if float(value).is_integer():
+            return f"{value:,.0f}"
+        return f"{value:,.2f}"
+
+    def _format_money_var(self, var):
+        """Format a money StringVar in-place with commas."""
+        raw = (var.get() or "").strip()
+        if raw == "":
+            return
+        value = self._parse_money_input(raw)
+        var.set(self._format_money(value))
+
+    def _normalize_money_input(self, raw):
+        """Keep only digits, one decimal point, leading minus and a trailing K/M/B."""
+        suffix = re.search(r'[KMB]$', raw.strip(), re.IGNORECASE)
+        cleaned = re.sub(r'[^0-9.\-]', '', raw)
+        if not cleaned:
+            return ""
+        negative = cleaned.startswith('-')
+        cleaned = cleaned.replace('-', '')
+        if cleaned.count('.') > 1:
+            parts = cleaned.split('.')
+            cleaned = parts[0] + '.' + ''.join(parts[1:])
+        cleaned = ('-' if negative else '') + cleaned
+        if suffix:
+            cleaned += suffix.group().upper()
+        return cleaned
+
+    def _format_money_live(self, var, entry):
+        """Live format input with commas while typing."""
+        if self._money_trace_lock:
+            return
+        raw = var.get()
+        if raw is None:
+            return
+        normalized = self._normalize_money_input(raw)
+        if normalized in ("", "-", "."):
+            return
+        if normalized[-1].isalpha():
+            # Leave "5M" as typed rather than expanding it mid-entry
+            formatted = normalized
+        else:
+            formatted = self._format_money(self._parse_money_input(normalized))
+        if formatted == raw:
+            return
+        self._money_trace_lock = True
+        try:
+            var.set(formatted)
+            if entry is not None:
+                entry.icursor(tk.END)
+        finally:
+            self._money_trace_lock = False
+
+    def _format_int_live(self, var, entry):
+        """Live format integer input while typing."""
+        if self._money_trace_lock:
+            return
+        raw = var.get()
+        if raw is None:
+            return
+        cleaned = re.sub(r'[^0-9]', '', str(raw))
+        if cleaned == "":
+            return
+        if cleaned == raw:
+            return
+        self._money_trace_lock = True
+        try:
             var.set(cleaned)
             if entry is not None:
                 entry.icursor(tk.END)
         finally:
             self._money_trace_lock = False
 
-    def calculate_wage_budget(self):
-        """Calculate wage budget estimates for a 25-player squad."""
+    def _budget_inputs(self):
+        """Read the Wage Budget inputs as keyword arguments for wage_budget_scenarios."""
         current_balance = self._parse_money_input(self.current_balance_var.get())
         prior_raw = (self.prior_balance_var.get() or "").strip()
         if prior_raw == "":
             prior_balance = current_balance
         else:
             prior_balance = self._parse_money_input(prior_raw)
-        prize_actual = self._parse_money_input(self.prize_actual_var.get())
-        prize_expected = self._parse_money_input(self.prize_expected_var.get())
-        net_transfer_spend = self._parse_money_input(self.net_transfer_var.get())
-        current_wages_input = self._parse_money_input(self.current_wages_var.get())
         squad_size_raw = (self.squad_size_var.get() or "").strip()
         if squad_size_raw == "":
             squad_size = 25
@@ -347,36 +3632,36 @@ class ScreenScannerApp:
                 squad_size = max(1, int(squad_size_raw))
             except ValueError:
                 squad_size = 25
-        wage_period = self.wage_period_var.get()
-        if wage_period == "weekly":
-            current_wages_annual = current_wages_input * 52
-        else:
-            current_wages_annual = current_wages_input
-        current_wages_weekly = current_wages_annual / 52 if current_wages_annual else 0.0
+        return {
+            'current_balance': current_balance,
+            'prior_balance': prior_balance,
+            'prize_actual': self._parse_money_input(self.prize_actual_var.get()),
+            'prize_expected': self._parse_money_input(self.prize_expected_var.get()),
+            'net_transfer': self._parse_money_input(self.net_transfer_var.get()),
+            'current_wages': self._parse_money_input(self.current_wages_var.get()),
+            'squad_size': squad_size,
+            'weekly': self.wage_period_var.get() == "weekly",
+        }
 
-        year_profit = current_balance - prior_balance
-        adjusted_profit = (
-            year_profit - prize_actual + prize_expected - net_transfer_spend
-        )
-        base_budget = adjusted_profit + current_wages_annual
-        minimum_budget = current_wages_annual * 0.75
-        if base_budget < minimum_budget:
-            base_budget = minimum_budget
-
-        total_available = base_budget
-
-        avg_per_player = total_available / squad_size if total_available else 0.0
-        max_per_player = avg_per_player * 2
-
-        expected_balance = (
-            current_balance
-            + adjusted_profit
-            - (total_available - current_wages_annual)
-        )
-        expected_wages_weekly = total_available / 52 if total_available else 0.0
+    def calculate_wage_budget(self):
+        """Calculate wage budget estimates for a 25-player squad."""
+        inputs = self._budget_inputs()
+        result = wage_budget_scenarios(**inputs)
+        current_balance = inputs['current_balance']
+        squad_size = inputs['squad_size']
+        wage_period = self.wage_period_var.get()
+        year_profit = float(result['profit'][0])
+        adjusted_profit = float(result['adjusted_profit'][0, 0])
+        total_available = float(result['available'][0, 0])
+        avg_per_player = float(result['avg_per_player'][0, 0])
+        max_per_player = float(result['max_per_player'][0, 0])
+        expected_balance = float(result['expected_balance'][0, 0])
+        current_wages_annual = float(result['current_wages'][0])
+        current_wages_weekly = current_wages_annual / WAGE_WEEKS_PER_YEAR
+        expected_wages_weekly = total_available / WAGE_WEEKS_PER_YEAR
 
         if wage_period == "weekly":
-            display_factor = 1 / 52
+            display_factor = 1 / WAGE_WEEKS_PER_YEAR
             period_label = "weekly"
         else:
             display_factor = 1
@@ -410,13 +3695,110 @@ class ScreenScannerApp:
         self.max_spend_var.set(
             f"Max per player (2x avg, {period_label}): {self._format_money(max_per_player * display_factor)}"
         )
+
+    def run_wage_scenarios(self):
+        """Evaluate the scenario inputs as a grid or Monte Carlo sample and show the results."""
+        inputs = self._budget_inputs()
+        try:
+            seasons = max(1, int(self.scenario_seasons_var.get()))
+            samples = max(1, int(self.scenario_samples_var.get()))
+        except ValueError:
+            messagebox.showerror("Error", "Seasons and samples must be whole numbers")
+            return
+        specs = {}
+        for name, label, var, integer in (
+            ('prize_expected', "Prize money (expected)", self.scenario_prize_var, False),
+            ('net_transfer', "Net transfer spend", self.scenario_transfer_var, False),
+            ('squad_size', "Squad size", self.scenario_squad_var, True),
+        ):
+            try:
+                parsed = parse_scenario_values(var.get(), integer)
+            except ValueError as e:
+                messagebox.showerror("Error", f"{label}: {e}")
+                return
+            specs[name] = (parsed or ('value', [inputs[name]]), integer)
+
+        start = time.perf_counter()
+        inputs.update(sample_scenarios(specs, self.scenario_mode_var.get(), seasons, samples))
+        result = wage_budget_scenarios(seasons=seasons, **inputs)
+        elapsed = time.perf_counter() - start
+
+        weekly = self.wage_period_var.get() == "weekly"
+        display_factor = 1 / WAGE_WEEKS_PER_YEAR if weekly else 1
+        period_label = "weekly" if weekly else "annual"
+        available = result['available'] * display_factor
+        self._scenario_table = {
+            'prize': result['prize_expected'].mean(axis=1),
+            'transfer': result['net_transfer'].mean(axis=1),
+            'squad': result['squad_size'].mean(axis=1),
+            'available': available[:, 0],
+            'avg': result['avg_per_player'][:, 0] * display_factor,
+            'max': result['max_per_player'][:, 0] * display_factor,
+            'balance': result['expected_balance'][:, -1],
+        }
+
+        self.scenario_bands_tree.delete(*self.scenario_bands_tree.get_children())
+        wage_bands = np.percentile(available, WAGE_SCENARIO_PERCENTILES, axis=0)
+        balance_bands = np.percentile(result['expected_balance'], WAGE_SCENARIO_PERCENTILES, axis=0)
+        for season in range(available.shape[1]):
+            values = [season + 1]
+            values += [self._format_money(round(float(v))) for v in wage_bands[:, season]]
+            values += [self._format_money(round(float(v))) for v in balance_bands[:, season]]
+            self.scenario_bands_tree.insert("", tk.END, values=values)
+
+        count = available.shape[0]
+        self.scenario_summary_var.set(
+            f"{count:,} scenario{'s' if count != 1 else ''} over {available.shape[1]} "
+            f"season{'s' if available.shape[1] != 1 else ''} in {elapsed * 1000:.1f} ms "
+            f"(wages {period_label}; showing up to {WAGE_SCENARIO_TABLE_ROWS})"
+        )
+        self._show_scenarios()
+
+    def _sort_scenarios(self, column):
+        """Sort the scenario table by a column; clicking it again reverses the order."""
+        current, descending = self._scenario_sort
+        self._scenario_sort = (column, not descending if column == current else True)
+        self._show_scenarios()
+
+    def _show_scenarios(self):
+        """Fill the scenario table with the top rows in the current sort order."""
+        column, descending = self._scenario_sort
+        for name, text in self._scenario_columns.items():
+            arrow = (" ▼" if descending else " ▲") if name == column else ""
+            self.scenario_tree.heading(name, text=text + arrow)
+        self.scenario_tree.delete(*self.scenario_tree.get_children())
+        if self._scenario_table is None:
+            return
+        order = np.argsort(self._scenario_table[column], kind='stable')
+        if descending:
+            order = order[::-1]
+        for index in order[:WAGE_SCENARIO_TABLE_ROWS]:
+            values = []
+            for name in self._scenario_columns:
+                value = float(self._scenario_table[name][index])
+                if name == "squad":
+                    values.append(f"{round(value, 1):g}")
+                else:
+                    values.append(self._format_money(round(value)))
+            self.scenario_tree.insert("", tk.END, values=values)
     
-    def check_tesseract(self):
-        """Check if Tesseract OCR is installed"""
+    def _probe_tesseract(self):
+        """Find a working OCR engine; returns its name or None (any thread)"""
         try:
-            pytesseract.get_tesseract_version()
-            self.status_var.set("Ready - Tesseract OCR detected")
-        except Exception as e:
+            engine = get_ocr_engine()
+            if engine.name == 'pytesseract':
+                pytesseract.get_tesseract_version()
+            return engine.name
+        except Exception:
+            return None
+    
+    def check_tesseract(self, engine_name=None):
+        """Report whether Tesseract OCR is installed"""
+        if engine_name is None:
+            engine_name = self._probe_tesseract()
+        if engine_name:
+            self.status_var.set(f"Ready - Tesseract OCR detected ({engine_name})")
+        else:
             self.status_var.set("Warning: Tesseract OCR not found. Please install Tesseract.")
             messagebox.showwarning(
                 "Tesseract Not Found",
@@ -427,158 +3809,61 @@ class ScreenScannerApp:
             )
     
     def get_windows_list(self):
-        """Get list of open windows (platform-specific)"""
-        windows = []
-        
-        if sys.platform == 'darwin':  # macOS
-            try:
-                # Use AppleScript to get window list
-                script = '''
-                tell application "System Events"
-                    set windowList to {}
-                    repeat with proc in processes
-                        try
-                            set procName to name of proc
-                            repeat with win in windows of proc
-                                try
-                                    set winTitle to title of win
-                                    set winPos to position of win
-                                    set winSize to size of win
-                                    set end of windowList to {procName, winTitle, winPos, winSize}
-                                end try
-                            end repeat
-                        end try
-                    end repeat
-                    return windowList
-                end tell
-                '''
-                result = subprocess.run(
-                    ['osascript', '-e', script],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode == 0:
-                    # Parse AppleScript output (it's a bit complex, so we'll use a simpler approach)
-                    # Let's use a different AppleScript that returns JSON-like data
-                    script2 = '''
-                    tell application "System Events"
-                        set windowInfo to {}
-                        repeat with proc in processes
-                            try
-                                set procName to name of proc
-                                if procName is not "Screen Data Scanner" and procName is not "SystemUIServer" then
-                                    repeat with win in windows of proc
-                                        try
-                                            set winTitle to title of win
-                                            if winTitle is not "" then
-                                                set end of windowInfo to procName & " - " & winTitle
-                                            end if
-                                        end try
-                                    end repeat
-                                end if
-                            end try
-                        end repeat
-                        return windowInfo
-                    end tell
-                    '''
-                    result = subprocess.run(
-                        ['osascript', '-e', script2],
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    
-                    if result.returncode == 0:
-                        lines = result.stdout.strip().split(', ')
-                        for line in lines:
-                            if line and line.strip():
-                                windows.append({
-                                    'title': line.strip(),
-                                    'app': line.split(' - ')[0] if ' - ' in line else line
-                                })
-            except Exception as e:
-                print(f"Error getting windows on macOS: {e}")
-        
-        elif sys.platform == 'win32':  # Windows
-            try:
-                # Try using pywin32 if available
-                try:
-                    import win32gui
-                    import win32process
-                    import win32api
-                    
-                    def enum_windows_callback(hwnd, windows):
-                        if win32gui.IsWindowVisible(hwnd):
-                            title = win32gui.GetWindowText(hwnd)
-                            if title:
-                                try:
-                                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                                    handle = win32api.OpenProcess(0x0410, False, pid)
-                                    exe_path = win32process.GetModuleFileNameEx(handle, 0)
-                                    app_name = os.path.basename(exe_path)
-                                    windows.append({
-                                        'title': title,
-                                        'app': app_name,
-                                        'hwnd': hwnd
-                                    })
-                                except:
-                                    windows.append({
-                                        'title': title,
-                                        'app': 'Unknown',
-                                        'hwnd': hwnd
-                                    })
-                        return True
-                    
-                    win32gui.EnumWindows(enum_windows_callback, windows)
-                except ImportError:
-                    # Fallback: use a simple method
-                    messagebox.showinfo(
-                        "Window Selection",
-                        "For better window selection on Windows, install pywin32:\n"
-                        "uv pip install pywin32\n\n"
-                        "Falling back to area selection."
-                    )
-                    return []
-            except Exception as e:
-                print(f"Error getting windows on Windows: {e}")
-        
-        return windows
+        """Return the cached list of open windows, refreshing it in the background when stale"""
+        self.window_list.refresh()
+        return self.window_list.snapshot()
 
     def upload_screenshot(self):
-        """Load a screenshot from disk."""
-        filename = filedialog.askopenfilename(
-            title="Select Screenshot",
+        """Load a screenshot from disk, or queue several for extraction."""
+        filenames = filedialog.askopenfilenames(
+            title="Select Screenshots",
             filetypes=[
-                ("Image files", "*.png *.jpg *.jpeg *.bmp *.tiff *.webp"),
+                ("Image files", " ".join("*" + ext for ext in IMAGE_EXTENSIONS)),
                 ("All files", "*.*"),
             ],
         )
-        if not filename:
+        if not filenames:
             return
+        if len(filenames) > 1:
+            session = self._job_session()
+            templates = self._job_templates()
+            for filename in filenames:
+                self.jobs.submit(filename, os.path.basename(filename), self.layout_var.get(),
+                                 self.preset_var.get(), session, templates=templates)
+            self.status_var.set(f"Queued {len(filenames)} screenshots for extraction")
+            return
+        filename = filenames[0]
         try:
-            img = Image.open(filename).convert("RGB")
-            self.captured_image = img
-            self.display_preview(img)
+            img = load_image(filename)
+            self._set_capture(image=img)
+            self.screenshot_path = filename
             self.extract_btn.config(state=tk.NORMAL)
             self.status_var.set(f"Screenshot loaded: {os.path.basename(filename)}")
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load image:\n{str(e)}")
             self.status_var.set("Error loading screenshot")
     
+    def _show_pywin32_hint(self):
+        messagebox.showinfo(
+            "Window Selection",
+            "For better window selection on Windows, install pywin32:\n"
+            "uv pip install pywin32\n\n"
+            "Falling back to area selection."
+        )
+
     def select_window(self):
         """Show window selection dialog"""
-        self.status_var.set("Getting list of windows...")
-        windows = self.get_windows_list()
-        
-        if not windows:
+        if sys.platform not in ('darwin', 'win32'):
             messagebox.showwarning(
                 "No Windows Found",
                 "Could not retrieve window list. Please use 'Select Area' instead."
             )
             self.status_var.set("Ready - Use 'Select Area' to manually select region")
             return
+        if isinstance(self.window_list.error, ImportError):
+            self._show_pywin32_hint()
+            return
+
         
         # Create window selection dialog
         dialog = tk.Toplevel(self.root)
@@ -607,15 +3892,62 @@ class ScreenScannerApp:
         listbox = tk.Listbox(frame, yscrollcommand=scrollbar.set, font=("Arial", 10))
         listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=listbox.yview)
-        
-        # Populate listbox
-        for window in windows:
-            display_text = f"{window['app']} - {window['title']}"
-            listbox.insert(tk.END, display_text)
-        
-        if not listbox.size():
-            listbox.insert(tk.END, "No windows found")
-            listbox.config(state=tk.DISABLED)
+
+        list_status = ttk.Label(dialog, text="")
+        list_status.pack()
+
+        def window_key(window):
+            return window.get('hwnd') or window['title']
+
+        def populate(new_windows):
+            # Keep the user's selection when the list is refreshed
+            selection = listbox.curselection()
+            selected_key = window_key(windows[selection[0]]) if selection and windows else None
+            windows[:] = new_windows
+            listbox.config(state=tk.NORMAL)
+            listbox.delete(0, tk.END)
+            for index, window in enumerate(windows):
+                display_text = f"{window['app']} - {window['title']}"
+                listbox.insert(tk.END, display_text)
+                if window_key(window) == selected_key:
+                    listbox.selection_set(index)
+                    listbox.see(index)
+            if not listbox.size():
+                loading = self.window_list.refresh()
+                listbox.insert(tk.END, "Loading windows..." if loading else "No windows found")
+                listbox.config(state=tk.DISABLED)
+            elif not listbox.curselection():
+                listbox.selection_set(0)
+            list_status.config(text="Updating..." if self.window_list.is_refreshing() else "")
+
+        def on_update(new_windows):
+            if not dialog.winfo_exists():
+                return
+            if isinstance(self.window_list.error, ImportError):
+                dialog.destroy()
+                self._show_pywin32_hint()
+                return
+            populate(new_windows)
+
+        def listener(new_windows):
+            self.root.after(0, on_update, new_windows)
+
+        def refresh_tick():
+            if dialog.winfo_exists():
+                if self.window_list.refresh():
+                    list_status.config(text="Updating...")
+                dialog.after(int(self.window_list.ttl * 1000), refresh_tick)
+
+        def on_destroy(event):
+            if event.widget is dialog:
+                self.window_list.remove_listener(listener)
+
+        # Open straight away with the cached list; a refresh updates it live
+        self.window_list.add_listener(listener)
+        dialog.bind("<Destroy>", on_destroy)
+        windows = []
+        populate(self.get_windows_list())
+        dialog.after(int(self.window_list.ttl * 1000), refresh_tick)
         
         # Buttons
         button_frame = ttk.Frame(dialog)
@@ -623,7 +3955,7 @@ class ScreenScannerApp:
         
         def on_select():
             selection = listbox.curselection()
-            if selection:
+            if selection and selection[0] < len(windows):
                 selected_index = selection[0]
                 self.selected_window = windows[selected_index]
                 dialog.destroy()
@@ -648,8 +3980,6 @@ class ScreenScannerApp:
         
         # Focus on listbox
         listbox.focus_set()
-        if listbox.size() > 0:
-            listbox.selection_set(0)
     
     def capture_selected_window(self):
         """Capture the selected window"""
@@ -699,23 +4029,12 @@ class ScreenScannerApp:
                             width = int(coords[2].strip())
                             height = int(coords[3].strip())
                             
-                            # Capture using mss
-                            with mss.mss() as sct:
-                                region = {
-                                    "top": top,
-                                    "left": left,
-                                    "width": width,
-                                    "height": height
-                                }
-                                screenshot = sct.grab(region)
-                                img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                                
-                                self.captured_image = img
-                                self.display_preview(img)
-                                self.extract_btn.config(state=tk.NORMAL)
-                                self.status_var.set(f"Window captured: {img.width}x{img.height} pixels")
-                                self.selected_window = None
-                                return
+                            frame, stage = self._grab_capture(left, top, left + width, top + height)
+                            width, height = self._set_capture(frame, capture_stage=stage)
+                            self.extract_btn.config(state=tk.NORMAL)
+                            self.status_var.set(f"Window captured: {width}x{height} pixels")
+                            self.selected_window = None
+                            return
                     
                     # Fallback: show message and use area selection
                     messagebox.showinfo(
@@ -757,21 +4076,11 @@ class ScreenScannerApp:
                         left, top, right, bottom = rect
                         
                         # Capture the window
-                        with mss.mss() as sct:
-                            region = {
-                                "top": top,
-                                "left": left,
-                                "width": right - left,
-                                "height": bottom - top
-                            }
-                            screenshot = sct.grab(region)
-                            img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                            
-                            self.captured_image = img
-                            self.display_preview(img)
-                            self.extract_btn.config(state=tk.NORMAL)
-                            self.status_var.set(f"Window captured: {img.width}x{img.height} pixels")
-                            self.selected_window = None
+                        frame, stage = self._grab_capture(left, top, right, bottom)
+                        width, height = self._set_capture(frame, capture_stage=stage)
+                        self.extract_btn.config(state=tk.NORMAL)
+                        self.status_var.set(f"Window captured: {width}x{height} pixels")
+                        self.selected_window = None
                     else:
                         raise Exception("Window handle not available")
                 except ImportError:
@@ -811,10 +4120,9 @@ class ScreenScannerApp:
         time.sleep(0.1)  # Small delay to ensure window is hidden
         
         # Get all monitor information
-        with mss.mss() as sct:
-            monitors = sct.monitors
-            # Use monitor 0 (all monitors combined) or monitor 1 (primary)
-            all_monitors = monitors[0]
+        monitors = self.screen.monitors
+        # Use monitor 0 (all monitors combined) or monitor 1 (primary)
+        all_monitors = monitors[0]
         
         # Create selection window covering all screens
         selection_window = tk.Toplevel()
@@ -899,223 +4207,1422 @@ class ScreenScannerApp:
             text="Click and drag to select area, or press ESC to cancel",
             bg='black', fg='white', font=("Arial", 14)
         )
-        instruction_label.place(relx=0.5, rely=0.05, anchor=tk.CENTER)
-    
-    def capture_region(self, x1, y1, x2, y2):
-        """Capture the selected screen region"""
+        instruction_label.place(relx=0.5, rely=0.05, anchor=tk.CENTER)
+    
+    def capture_region(self, x1, y1, x2, y2):
+        """Capture the selected screen region"""
+        try:
+            frame, stage = self._grab_capture(x1, y1, x2, y2)
+            width, height = self._set_capture(frame, capture_stage=stage)
+            self.capture_rect = (x1, y1, x2, y2)
+            self.extract_btn.config(state=tk.NORMAL)
+            self.scroll_btn.config(state=tk.NORMAL)
+            self.watch_btn.config(state=tk.NORMAL)
+            self.status_var.set(f"Area captured: {width}x{height} pixels")
+        
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to capture screen: {str(e)}")
+            self.status_var.set("Error capturing screen")
+    
+    def _grab_capture(self, x1, y1, x2, y2):
+        """Grab a screen rectangle; returns the frame and its timing record"""
+        metrics = PipelineMetrics()
+        with metrics.stage('capture') as record:
+            frame = self.screen.grab_rect(x1, y1, x2, y2)
+            record.update(width=frame.shape[1], height=frame.shape[0])
+        return frame, metrics.stages[0]
+
+    def _set_capture(self, frame=None, image=None, capture_stage=None):
+        """Make a grabbed frame (or a loaded PIL image) the current capture and preview it.
+
+        Returns the capture's (width, height).
+        """
+        self.captured_frame = frame
+        self.captured_image = image
+        self._capture_stage = capture_stage
+        source = frame if frame is not None else image
+        self.display_preview(source)
+        return (frame.shape[1], frame.shape[0]) if frame is not None else image.size
+
+    def toggle_scroll_capture(self):
+        """Start or stop stitching the captured area while the user scrolls"""
+        if self.scroll_stitcher is not None:
+            self._stop_scroll_capture()
+            return
+        if self.capture_rect is None:
+            messagebox.showinfo("Scroll Capture", "Select an area to scan first")
+            return
+
+        x1, y1, x2, y2 = self.capture_rect
+        self._scroll_region = {"top": y1, "left": x1,
+                               "width": x2 - x1, "height": y2 - y1}
+        self.scroll_stitcher = ScrollStitcher()
+        # One worker keeps OCR results in scroll order
+        self._scroll_executor = ThreadPoolExecutor(max_workers=1)
+        self._scroll_layout = self.layout_var.get()
+        self._scroll_preset = self.preset_var.get()
+        self._scroll_rows = []
+        self.processed_data = None
+
+        self.scroll_btn.config(text="Stop Scrolling")
+        for button in (self.select_btn, self.select_window_btn, self.extract_btn,
+                       self.upload_btn, self.watch_btn):
+            button.config(state=tk.DISABLED)
+        self.progress.start()
+        self.status_var.set("Scroll capture running - scroll the list slowly, then click Stop")
+        self._scroll_capture_tick()
+
+    def _scroll_capture_tick(self):
+        """Grab the area, stitch new rows and queue complete lines for OCR"""
+        stitcher = self.scroll_stitcher
+        if stitcher is None:
+            return
+        try:
+            stitcher.add_frame(self.screen.grab_gray(self._scroll_region))
+            region = stitcher.take_complete_region()
+            if region is not None:
+                self._scroll_executor.submit(self._scroll_ocr_region, region)
+        except Exception as e:
+            self._stop_scroll_capture()
+            messagebox.showerror("Scroll Capture", f"Scroll capture failed:\n{str(e)}")
+            return
+
+        if not stitcher.tracking:
+            lost_note = " - lost track, scroll back to the last captured rows"
+        elif stitcher.lost:
+            lost_note = f", {stitcher.lost} lost - scroll slower"
+        else:
+            lost_note = ""
+        self.status_var.set(
+            f"Scroll capture: {stitcher.frames} frames, {stitcher.height} px, "
+            f"{len(self._scroll_rows)} rows{lost_note}"
+        )
+        self.root.after(SCROLL_CAPTURE_INTERVAL_MS, self._scroll_capture_tick)
+
+    def _scroll_ocr_region(self, region):
+        """OCR one newly revealed strip (scroll worker thread)"""
         try:
-            with mss.mss() as sct:
-                # Get monitor dimensions
-                monitor = sct.monitors[0]
-                
-                # Calculate region
-                region = {
-                    "top": y1,
-                    "left": x1,
-                    "width": abs(x2 - x1),
-                    "height": abs(y2 - y1)
-                }
-                
-                # Capture screenshot
-                screenshot = sct.grab(region)
-                img = Image.frombytes("RGB", screenshot.size, screenshot.bgra, "raw", "BGRX")
-                
-                self.captured_image = img
-                self.display_preview(img)
-                self.extract_btn.config(state=tk.NORMAL)
-                self.status_var.set(f"Area captured: {img.width}x{img.height} pixels")
-        
+            rows = extract_rows(region, layout=self._scroll_layout,
+                                preset=self._scroll_preset)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to capture screen: {str(e)}")
-            self.status_var.set("Error capturing screen")
-    
+            print(f"Scroll capture OCR failed: {e}")
+            return
+        self.root.after(0, self._scroll_rows_ready, rows)
+
+    def _scroll_rows_ready(self, rows):
+        """Append OCR'd rows from a strip to the growing table"""
+        if not rows:
+            return
+        self._scroll_rows.extend(rows)
+        self.processed_data = pd.DataFrame(self._scroll_rows).fillna('')
+        self.export_btn.config(state=tk.NORMAL)
+
+    def _stop_scroll_capture(self):
+        """Stop grabbing, OCR the remaining rows and show the stitched result"""
+        stitcher = self.scroll_stitcher
+        self.scroll_stitcher = None
+        region = stitcher.flush()
+        if region is not None:
+            self._scroll_executor.submit(self._scroll_ocr_region, region)
+        # Runs after all queued strips because the executor has one worker
+        self._scroll_executor.submit(lambda: self.root.after(0, self._scroll_capture_done, stitcher))
+        self._scroll_executor.shutdown(wait=False)
+        self.scroll_btn.config(state=tk.DISABLED)
+        self.status_var.set("Finishing scroll capture...")
+
+    def _scroll_capture_done(self, stitcher):
+        """Restore the UI once every stitched strip has been OCR'd"""
+        self.progress.stop()
+        self.scroll_btn.config(text="Scroll Capture", state=tk.NORMAL)
+        for button in (self.select_btn, self.select_window_btn, self.upload_btn,
+                       self.watch_btn):
+            button.config(state=tk.NORMAL)
+
+        stitched = stitcher.stitched_image()
+        if stitched is not None:
+            self._set_capture(stitched)
+            self.extract_btn.config(state=tk.NORMAL)
+        row_count = len(self._scroll_rows)
+        self.status_var.set(
+            f"Scroll capture complete: {stitcher.frames} frames, {row_count} rows. Ready to export."
+        )
+
+    def toggle_watch(self):
+        """Start or stop re-reading the captured area as it changes"""
+        if self.region_watcher is not None:
+            self._stop_watch()
+            return
+        if self.capture_rect is None:
+            messagebox.showinfo("Watch Area", "Select an area to scan first")
+            return
+        try:
+            interval = float(self.watch_interval_var.get())
+        except ValueError:
+            interval = 1.0
+        self._watch_interval_ms = max(100, int(interval * 1000))
+
+        x1, y1, x2, y2 = self.capture_rect
+        self._watch_region = {"top": y1, "left": x1,
+                              "width": x2 - x1, "height": y2 - y1}
+        self._watch_busy = False
+        self._watch_updates = 0
+        self._watch_frame = None  # The processed_data this watcher owns
+        self.region_watcher = RegionWatcher(preset=self.preset_var.get())
+
+        self.watch_btn.config(text="Stop Watching")
+        for button in (self.select_btn, self.select_window_btn, self.extract_btn,
+                       self.upload_btn, self.scroll_btn):
+            button.config(state=tk.DISABLED)
+        self.status_var.set("Watching area - reading table...")
+        self._watch_tick()
+
+    def _watch_tick(self):
+        """Grab the watched area and hand it to the watcher if it is idle"""
+        watcher = self.region_watcher
+        if watcher is None:
+            return
+        if not self._watch_busy:
+            try:
+                frame = self.screen.grab(self._watch_region)
+            except Exception as e:
+                self._stop_watch()
+                messagebox.showerror("Watch Area", f"Failed to capture screen:\n{str(e)}")
+                return
+            self._watch_busy = True
+            thread = threading.Thread(target=self._watch_update_thread,
+                                      args=(watcher, frame), daemon=True)
+            thread.start()
+        self.root.after(self._watch_interval_ms, self._watch_tick)
+
+    def _watch_update_thread(self, watcher, frame):
+        """Diff the frame and re-OCR changed cells (background thread)"""
+        try:
+            changes = watcher.update(frame)
+        except Exception as e:
+            self.root.after(0, self._watch_failed, str(e))
+            return
+        self.root.after(0, self._watch_applied, watcher, changes)
+
+    def _watch_applied(self, watcher, changes):
+        """Patch processed_data with the cells that changed"""
+        self._watch_busy = False
+        if watcher is not self.region_watcher:
+            return
+        if changes is None:
+            self._watch_frame = pd.DataFrame(watcher.matrix) if watcher.matrix else None
+            self.processed_data = self._watch_frame
+            note = "table read"
+        elif self.processed_data is not self._watch_frame:
+            # Another extraction replaced the table; its cells are not ours
+            self._stop_watch()
+            self.status_var.set("Stopped watching: the table was replaced")
+            return
+        else:
+            for r, c, text in changes:
+                self.processed_data.iat[r, c] = text
+            note = f"{len(changes)} cells updated" if changes else "no changes"
+        self._watch_updates += 1
+        if self.processed_data is not None:
+            self.export_btn.config(state=tk.NORMAL)
+        self.status_var.set(
+            f"Watching area ({datetime.now().strftime('%H:%M:%S')}): {note}"
+        )
+
+    def _watch_failed(self, error_msg):
+        self._watch_busy = False
+        self._stop_watch()
+        messagebox.showerror("Watch Area", f"Failed to read watched area:\n{error_msg}")
+
+    def _stop_watch(self):
+        """Stop watch mode and restore the buttons"""
+        self.region_watcher = None
+        self.watch_btn.config(text="Watch Area")
+        for button in (self.select_btn, self.select_window_btn, self.extract_btn,
+                       self.upload_btn, self.scroll_btn):
+            button.config(state=tk.NORMAL)
+        self.status_var.set("Stopped watching")
+
     def display_preview(self, image):
-        """Display image preview in canvas"""
-        # Resize if too large
-        max_width = 750
-        max_height = 400
-        
-        if image.width > max_width or image.height > max_height:
-            ratio = min(max_width / image.width, max_height / image.height)
-            new_width = int(image.width * ratio)
-            new_height = int(image.height * ratio)
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Convert to PhotoImage
-        photo = ImageTk.PhotoImage(image)
-        
-        # Update canvas
+        """Display image preview in canvas.
+
+        The preview pyramid is built on a background thread (or reused from
+        the cache when the same image is shown again); tiles are then drawn
+        only for the visible part of the canvas.
+        """
+        self._preview_token += 1
+        token = self._preview_token
+        cached = self._preview_cache.get(id(image))
+        if cached is not None and cached[0] is image:
+            self._preview_cache.move_to_end(id(image))
+            self._preview_ready(token, cached[1])
+            return
+        self.canvas.delete("all")
+        self._preview_tiles = {}
+        self._preview = None
+        self.zoom_var.set("")
+        self.canvas.create_text(10, 10, anchor=tk.NW, text="Rendering preview...")
+        width, _ = self._preview_viewport()
+        thread = threading.Thread(target=self._build_preview_thread,
+                                  args=(token, image, width), daemon=True)
+        thread.start()
+
+    def _build_preview_thread(self, token, image, width):
+        """Build the preview pyramid and the level the first view needs (background thread)"""
+        try:
+            pyramid = PreviewPyramid(image)
+            zoom = pyramid.fit_width_zoom(width)
+            k = max(0, int(np.floor(np.log2(1.0 / zoom)))) if zoom < 1 else 0
+            pyramid.level(k)
+        except Exception as e:
+            print(f"Preview failed: {e}")
+            return
+        self.root.after(0, self._preview_cached, token, image, pyramid)
+
+    def _preview_cached(self, token, image, pyramid):
+        self._preview_cache[id(image)] = (image, pyramid)
+        while len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+            self._preview_cache.popitem(last=False)
+        self._preview_ready(token, pyramid)
+
+    def _preview_ready(self, token, pyramid):
+        """Show a built pyramid, fitted to the canvas width"""
+        if token != self._preview_token:
+            return  # A newer image replaced this one
+        self._preview = pyramid
+        width, _ = self._preview_viewport()
+        self._set_preview_zoom(pyramid.fit_width_zoom(width), reset=True)
+
+    def _preview_viewport(self):
+        width = max(self.canvas.winfo_width() - 6, 1)
+        height = max(self.canvas.winfo_height() - 6, 1)
+        if width <= 1:  # Not mapped yet
+            width, height = int(self.canvas['width']), int(self.canvas['height'])
+        return width, height
+
+    def _set_preview_zoom(self, zoom, anchor=None, reset=False):
+        """Change zoom, keeping the image point under anchor (canvas x, y) in place.
+
+        With reset the view starts at the top-left corner instead.
+        """
+        pyramid = self._preview
+        if pyramid is None:
+            return
+        width, height = self._preview_viewport()
+        min_zoom = min(pyramid.fit_zoom(width, height), 1.0)
+        zoom = max(min_zoom, min(zoom, PREVIEW_MAX_ZOOM))
+        if anchor is None:
+            anchor = (width / 2, height / 2)
+        if reset:
+            image_x = image_y = 0.0
+            anchor = (0, 0)
+        else:
+            image_x = self.canvas.canvasx(anchor[0]) / self._preview_zoom
+            image_y = self.canvas.canvasy(anchor[1]) / self._preview_zoom
+
+        self._preview_zoom = zoom
         self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=photo)
-        self.canvas.image = photo  # Keep a reference
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self._preview_tiles = {}
+        total_w, total_h = pyramid.scaled_size(zoom)
+        self.canvas.configure(scrollregion=(0, 0, total_w, total_h))
+        self.canvas.xview_moveto(max(0.0, (image_x * zoom - anchor[0]) / total_w))
+        self.canvas.yview_moveto(max(0.0, (image_y * zoom - anchor[1]) / total_h))
+        self.zoom_var.set(f"{zoom:.0%}")
+        self._render_preview_tiles()
+
+    def zoom_preview(self, factor, anchor=None):
+        """Zoom the preview in or out by factor"""
+        if self._preview is not None:
+            self._set_preview_zoom(self._preview_zoom * factor, anchor)
+
+    def fit_preview(self):
+        """Zoom the preview to show the whole capture"""
+        if self._preview is not None:
+            width, height = self._preview_viewport()
+            self._set_preview_zoom(self._preview.fit_zoom(width, height), anchor=(0, 0))
+
+    def _scroll_preview(self, axis, *args):
+        (self.canvas.xview if axis == 'x' else self.canvas.yview)(*args)
+        self._schedule_preview_render()
+
+    def _on_preview_wheel(self, event, axis='y', zoom=False, delta=None):
+        delta = event.delta if delta is None else delta
+        if not delta:
+            return
+        if zoom:
+            self.zoom_preview(1.25 if delta > 0 else 1 / 1.25, anchor=(event.x, event.y))
+            return
+        # Windows reports multiples of 120 per notch, macOS small values
+        steps = -int(delta / 120) if abs(delta) >= 120 else (-1 if delta > 0 else 1)
+        self._scroll_preview(axis, 'scroll', steps * 3, 'units')
+
+    def _on_preview_drag(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self._schedule_preview_render()
+
+    def _schedule_preview_render(self):
+        if not self._preview_render_pending:
+            self._preview_render_pending = True
+            self.root.after_idle(self._render_preview_tiles)
+
+    def _render_preview_tiles(self):
+        """Draw the tiles covering the visible part of the canvas and drop the rest"""
+        self._preview_render_pending = False
+        pyramid = self._preview
+        if pyramid is None:
+            return
+        zoom = self._preview_zoom
+        tile = PREVIEW_TILE_SIZE
+        total_w, total_h = pyramid.scaled_size(zoom)
+        width, height = self._preview_viewport()
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        # One tile of margin so short scrolls don't show blank edges
+        tx0, ty0 = max(0, int(left // tile) - 1), max(0, int(top // tile) - 1)
+        tx1 = min((total_w - 1) // tile, int((left + width) // tile) + 1)
+        ty1 = min((total_h - 1) // tile, int((top + height) // tile) + 1)
+        wanted = {(tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)}
+
+        for key in list(self._preview_tiles):
+            if key not in wanted:
+                _, item = self._preview_tiles.pop(key)
+                self.canvas.delete(item)
+        for tx, ty in sorted(wanted - set(self._preview_tiles)):
+            photo = ImageTk.PhotoImage(pyramid.render_tile(zoom, tx, ty, tile))
+            item = self.canvas.create_image(tx * tile, ty * tile, anchor=tk.NW, image=photo)
+            self._preview_tiles[(tx, ty)] = (photo, item)  # Keep a reference
     
     def extract_data(self):
-        """Extract tabular data from captured image"""
-        if self.captured_image is None:
+        """Queue extraction of the captured image"""
+        if self.captured_frame is None and self.captured_image is None:
             messagebox.showwarning("No Image", "Please capture an area first")
             return
-        
-        self.progress.start()
-        self.status_var.set("Extracting data... This may take a moment")
-        self.extract_btn.config(state=tk.DISABLED)
-        
-        # Run extraction in separate thread to keep UI responsive
-        thread = threading.Thread(target=self._extract_data_thread)
+
+        metrics = PipelineMetrics()
+        if self._capture_stage is not None:
+            metrics.add(self._capture_stage)
+        if self.captured_frame is not None:
+            source = self.captured_frame
+            name = time.strftime("Capture %H:%M:%S")
+        else:
+            source = self.captured_image
+            name = os.path.basename(self.screenshot_path or "") or "Screenshot"
+        self.jobs.submit(source, name, self.layout_var.get(), self.preset_var.get(),
+                         self._job_session(), metrics, self._job_templates())
+        self.status_var.set("Extracting data... You can keep capturing meanwhile")
+
+    def _job_session(self):
+        """The session new jobs merge into, or None when not accumulating"""
+        if not self.session_var.get():
+            return None
+        self.session.set_key_columns(self.session_key_var.get())
+        return self.session
+
+    def _job_templates(self):
+        """The template store new jobs match against, or None when disabled"""
+        if not self.use_templates_var.get() or not self.templates:
+            return None
+        return self.templates
+
+    def save_template(self):
+        """Learn a column template for the current FM view from the capture"""
+        if self.captured_frame is None and self.captured_image is None:
+            messagebox.showwarning("No Image", "Capture a table with its header row first")
+            return
+        name = simpledialog.askstring(
+            "Save Column Template",
+            "Name of this FM view (e.g. Squad, Scouting, Transfer list):",
+            initialvalue=self.template_var.get(), parent=self.root)
+        if not name or not name.strip():
+            return
+        source = self.captured_frame if self.captured_frame is not None else self.captured_image
+        self.status_var.set(f"Learning column template '{name.strip()}'...")
+        thread = threading.Thread(target=self._learn_template_thread,
+                                  args=(name.strip(), source, self.preset_var.get()))
         thread.daemon = True
         thread.start()
-    
-    def _extract_data_thread(self):
-        """Extract data in background thread"""
+
+    def _learn_template_thread(self, name, source, preset):
+        """Detect the columns with the generic grid analysis (background thread)"""
         try:
-            # Preprocess image for better OCR
-            img = self.preprocess_image(self.captured_image)
-            
-            # Use OCR to extract text
-            ocr_config = r'--oem 3 --psm 6'  # Assume uniform block of text
-            text = pytesseract.image_to_string(img, config=ocr_config)
-            
-            # Parse text into rows
-            rows = self.parse_text_to_rows(text)
-            
-            # Convert to DataFrame
-            if rows:
-                self.processed_data = pd.DataFrame(rows)
-                self.root.after(0, self._extraction_complete, True)
-            else:
-                self.root.after(0, self._extraction_complete, False)
-        
+            binary = preprocess_image(source, preset)
+            template = ColumnTemplate.learn(name, binary, get_ocr_engine(),
+                                            gray=grayscale_like(source, binary))
+            self.templates.save(template)
+            self.root.after(0, self._template_saved, template)
         except Exception as e:
-            self.root.after(0, self._extraction_complete_error, str(e))
-    
-    def preprocess_image(self, image):
-        """Preprocess image to improve OCR accuracy"""
-        # Convert to numpy array
-        img_array = np.array(image)
-        
-        # Convert to grayscale
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+            self.root.after(0, self._template_failed, str(e))
+
+    def _template_saved(self, template):
+        self.template_combo.config(values=self.templates.names())
+        self.template_var.set(template.name)
+        columns = ", ".join(column['name'] for column in template.columns)
+        self.status_var.set(f"Template '{template.name}' saved: {columns}")
+
+    def _template_failed(self, error_msg):
+        self.status_var.set(f"Could not learn template: {error_msg}")
+        messagebox.showerror("Template Error", f"Could not learn a column template:\n{error_msg}")
+
+    def delete_template(self):
+        """Delete the template selected in the templates list"""
+        name = self.template_var.get()
+        if not name or not messagebox.askyesno("Delete Template", f"Delete template '{name}'?"):
+            return
+        self.templates.delete(name)
+        self.template_combo.config(values=self.templates.names())
+        self.template_var.set("")
+        self.status_var.set(f"Template '{name}' deleted")
+
+    def _job_changed(self, job):
+        """Update the jobs list when a job changes state (UI thread)"""
+        item = str(job.id)
+        rows = len(job.rows) if job.rows is not None else ""
+        values = (job.status, f"{job.progress:.0%}", rows)
+        if self.jobs_tree.exists(item):
+            self.jobs_tree.item(item, values=values)
+        elif job in self.jobs.jobs:
+            self.jobs_tree.insert("", tk.END, iid=item, text=job.name, values=values)
+
+        if self.jobs.active():
+            self.progress.start()
         else:
-            gray = img_array
-        
-        # Apply thresholding
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(thresh, None, 10, 7, 21)
-        
-        # Convert back to PIL Image
-        processed = Image.fromarray(denoised)
-        
-        # Enhance contrast
-        enhancer = ImageEnhance.Contrast(processed)
-        processed = enhancer.enhance(2.0)
-        
-        return processed
-    
-    def parse_text_to_rows(self, text):
-        """Parse OCR text into rows of data"""
-        lines = text.strip().split('\n')
-        rows = []
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Try to split by common delimiters
-            # First, try tab
-            if '\t' in line:
-                cells = [cell.strip() for cell in line.split('\t')]
-            # Then try multiple spaces (at least 2)
-            elif '  ' in line:
-                cells = re.split(r'\s{2,}', line)
-            # Then try pipe
-            elif '|' in line:
-                cells = [cell.strip() for cell in line.split('|')]
-            # Then try comma
-            elif ',' in line:
-                cells = [cell.strip() for cell in line.split(',')]
-            else:
-                # Single column
-                cells = [line]
-            
-            # Filter out empty cells
-            cells = [cell for cell in cells if cell]
-            
-            if cells:
-                rows.append(cells)
-        
-        # Normalize row lengths (pad shorter rows)
-        if rows:
-            max_cols = max(len(row) for row in rows)
-            normalized_rows = []
-            for row in rows:
-                while len(row) < max_cols:
-                    row.append('')
-                normalized_rows.append(row)
-            return normalized_rows
-        
-        return []
-    
-    def _extraction_complete(self, success):
-        """Called when extraction completes"""
-        self.progress.stop()
-        self.extract_btn.config(state=tk.NORMAL)
-        
-        if success and self.processed_data is not None:
+            self.progress.stop()
+        if job.finished and job.id not in self._jobs_finished:
+            # Progress updates queued earlier can arrive after the job ended
+            self._jobs_finished.add(job.id)
+            self._job_finished(job)
+
+    def _job_finished(self, job):
+        """Show the result of a finished job and log its metrics"""
+        self._show_job_result(job)
+        job.metrics.info.update(status=job.status, rows=len(job.rows or []), error=job.error)
+        if self.metrics_log is not None:
+            try:
+                self.metrics_log.write(job.metrics)
+            except OSError as e:
+                print(f"Could not write metrics log: {e}")
+
+    def _show_job_result(self, job):
+        details = job.metrics.summary()
+        if job.metrics.info.get('template'):
+            details = f"template {job.metrics.info['template']}; {details}"
+        if job.status == 'cancelled':
+            self.status_var.set(f"Cancelled: {job.name}")
+        elif job.status == 'failed':
+            self.status_var.set(f"Error: {job.error}")
+            if len(self.jobs.jobs) == 1:
+                messagebox.showerror("Extraction Error", f"Failed to extract data:\n{job.error}")
+        elif job.rows and job.session is not None:
+            # Merged here so jobs finishing together don't race on the session
+            before = job.session.duplicates
+            with job.metrics.stage('dataframe'):
+                added = job.session.add(job.rows)
+                if job.session is self.session:
+                    self.processed_data = job.session.to_frame()
+            if job.session is self.session:
+                self._session_updated(job.session, len(added),
+                                      job.session.duplicates - before, job.cache_status)
+                self.status_var.set(f"{self.status_var.get()} [{details}]")
+        elif job.rows:
+            with job.metrics.stage('dataframe'):
+                self.processed_data = pd.DataFrame(job.rows)
             self.export_btn.config(state=tk.NORMAL)
             row_count = len(self.processed_data)
             col_count = len(self.processed_data.columns)
+            cache_note = f" (cache {job.cache_status})" if job.cache_status else ""
             self.status_var.set(
-                f"Extraction complete: {row_count} rows, {col_count} columns. Ready to export."
+                f"Extraction complete: {job.name}: {row_count} rows, {col_count} columns{cache_note}. "
+                f"Ready to export. [{details}]"
             )
-            messagebox.showinfo("Success", f"Extracted {row_count} rows with {col_count} columns")
         else:
-            self.status_var.set("Extraction failed: No data found. Try adjusting the selection.")
-            messagebox.showwarning("No Data", "Could not extract data. Try selecting a different area.")
+            self.status_var.set(f"Extraction failed: No data found in {job.name}. Try adjusting the selection.")
+            if len(self.jobs.jobs) == 1:
+                messagebox.showwarning("No Data", "Could not extract data. Try selecting a different area.")
+
+    def cancel_selected_jobs(self):
+        """Cancel the jobs selected in the jobs list"""
+        selected = set(self.jobs_tree.selection())
+        for job in self.jobs.active():
+            if str(job.id) in selected:
+                job.cancel()
+
+    def clear_finished_jobs(self):
+        """Remove finished jobs from the jobs list"""
+        for job in self.jobs.jobs:
+            if job.finished and self.jobs_tree.exists(str(job.id)):
+                self.jobs_tree.delete(str(job.id))
+        self.jobs.clear_finished()
+
+    def preprocess_image(self, image, preset=DEFAULT_PRESET):
+        """Preprocess image to improve OCR accuracy"""
+        return preprocess_image(image, preset)
     
-    def _extraction_complete_error(self, error_msg):
-        """Called when extraction fails with error"""
-        self.progress.stop()
-        self.extract_btn.config(state=tk.NORMAL)
-        self.status_var.set(f"Error: {error_msg}")
-        messagebox.showerror("Extraction Error", f"Failed to extract data:\n{error_msg}")
+    def parse_text_to_rows(self, text):
+        """Parse OCR text into rows of data"""
+        return parse_text_to_rows(text)
     
-    def export_csv(self):
-        """Export extracted data to CSV file"""
+    def _session_updated(self, session, added, duplicates, cache_status=None):
+        """Called when an extraction has been merged into the session"""
+        self.export_btn.config(state=tk.NORMAL)
+        cache_note = f" (cache {cache_status})" if cache_status else ""
+        self.status_var.set(
+            f"Session: {len(session)} rows from {session.captures} captures - "
+            f"{added} new, {duplicates} duplicates skipped{cache_note}"
+        )
+
+    def clear_session(self):
+        """Start a new session, dropping accumulated rows"""
+        self.session = ExtractionSession(self.session_key_var.get())
+        if self.session_var.get():
+            self.processed_data = None
+            self.export_btn.config(state=tk.DISABLED)
+        self.status_var.set("Session cleared")
+
+    def export_data(self):
+        """Export extracted data to a CSV, NDJSON, SQLite, Parquet or Feather file"""
         if self.processed_data is None:
             messagebox.showwarning("No Data", "Please extract data first")
             return
-        
-        # Get save location
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"extracted_data_{timestamp}.csv"
-        
-        filename = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-            initialfile=default_filename
-        )
-        
+
+        append = self.export_append_var.get()
+        if append:
+            # Appending targets an existing file, so don't suggest a fresh name
+            filename = filedialog.askopenfilename(
+                title="Append to file",
+                filetypes=EXPORT_FILETYPES[:3] + EXPORT_FILETYPES[-1:],
+            )
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                filetypes=EXPORT_FILETYPES,
+                initialfile=f"extracted_data_{timestamp}.csv",
+            )
+
         if filename:
             try:
-                self.processed_data.to_csv(filename, index=False)
-                self.status_var.set(f"Data exported to: {os.path.basename(filename)}")
-                messagebox.showinfo("Success", f"Data exported successfully to:\n{filename}")
+                data = self.processed_data
+                if self.typed_export_var.get():
+                    data = convert_column_types(data)
+                with open_exporter(filename, append=append) as exporter:
+                    exporter.write(data)
+                action = "appended to" if append else "exported to"
+                self.status_var.set(f"{exporter.rows_written} rows {action}: {os.path.basename(filename)}")
+                messagebox.showinfo("Success", f"Data {action}:\n{filename}")
             except Exception as e:
-                messagebox.showerror("Export Error", f"Failed to export CSV:\n{str(e)}")
+                messagebox.showerror("Export Error", f"Failed to export data:\n{str(e)}")
                 self.status_var.set("Export failed")
 
 
-def main():
+# Synthetic Football Manager style data for the benchmark suite
+BENCH_FIRST_NAMES = ('James', 'Luka', 'Mateo', 'Kai', 'Oliver', 'Joao', 'Erling',
+                     'Bukayo', 'Pedri', 'Rafael', 'Declan', 'Florian', 'Khvicha')
+BENCH_LAST_NAMES = ('Walker', 'Silva', 'Martinez', 'Havertz', 'Costa', 'Haaland',
+                    'Saka', 'Leao', 'Rice', 'Wirtz', 'Kvaratskhelia', 'Mendes')
+BENCH_POSITIONS = ('GK', 'D (C)', 'D (R)', 'D/WB (L)', 'DM', 'M (C)',
+                   'AM (RLC)', 'AM (L)', 'ST (C)')
+BENCH_HEADERS = ('Name', 'Position', 'Age', 'Value', 'Wage', 'CA')
+BENCH_FONTS = ('DejaVuSans.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf',
+               'Helvetica.ttc', 'Verdana.ttf')
+BENCH_THEMES = {
+    # background, zebra stripe, text
+    'light': ((246, 246, 246), (228, 232, 238), (20, 20, 20)),
+    'dark': ((38, 40, 46), (50, 53, 61), (225, 225, 225)),
+}
+
+
+def _bench_font(size):
+    """Load an FM-like sans font, falling back to Pillow's built-in one"""
+    for name in BENCH_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def _bench_money(rng, low, high, suffix=''):
+    value = rng.uniform(low, high)
+    if value >= 1_000_000:
+        return f"£{value / 1_000_000:.1f}M{suffix}"
+    return f"£{value / 1_000:.0f}K{suffix}"
+
+
+def render_synthetic_table(rows=20, font_size=16, theme='light', zebra=True, seed=0):
+    """Render an FM-style player table and return (image, ground truth rows).
+
+    The ground truth includes the header row and matches the rendered text
+    exactly, so OCR output can be scored cell by cell.
+    """
+    rng = random.Random(seed)
+    truth = [list(BENCH_HEADERS)]
+    for _ in range(rows):
+        truth.append([
+            f"{rng.choice(BENCH_FIRST_NAMES)} {rng.choice(BENCH_LAST_NAMES)}",
+            rng.choice(BENCH_POSITIONS),
+            str(rng.randint(16, 38)),
+            _bench_money(rng, 50_000, 95_000_000),
+            _bench_money(rng, 1_000, 400_000, ' p/w'),
+            str(rng.randint(60, 190)),
+        ])
+
+    font = _bench_font(font_size)
+    background, stripe, text_color = BENCH_THEMES[theme]
+    pad_x = font_size
+    row_height = int(font_size * 1.9)
+    widths = [max(int(font.getlength(row[c])) for row in truth) for c in range(len(BENCH_HEADERS))]
+    x_positions = []
+    x = pad_x
+    for width in widths:
+        x_positions.append(x)
+        x += width + pad_x * 2
+    image = Image.new("RGB", (x, row_height * len(truth) + pad_x), background)
+    draw = ImageDraw.Draw(image)
+    for r, row in enumerate(truth):
+        top = pad_x // 2 + r * row_height
+        if zebra and r % 2 == 1:
+            draw.rectangle([0, top, image.width, top + row_height - 1], fill=stripe)
+        for c, value in enumerate(row):
+            draw.text((x_positions[c], top + (row_height - font_size) // 2), value,
+                      fill=text_color, font=font)
+    return image, truth
+
+
+def score_cells(rows, truth):
+    """Compare extracted rows to ground truth by position.
+
+    Returns (exact cell accuracy, mean character similarity) over the
+    ground truth cells.
+    """
+    total = 0
+    exact = 0
+    similarity = 0.0
+    for r, truth_row in enumerate(truth):
+        row = rows[r] if r < len(rows) else []
+        for c, expected in enumerate(truth_row):
+            got = ' '.join(str(row[c]).split()) if c < len(row) else ''
+            total += 1
+            if got == expected:
+                exact += 1
+                similarity += 1.0
+            else:
+                similarity += difflib.SequenceMatcher(None, got, expected).ratio()
+    return (exact / total, similarity / total) if total else (0.0, 0.0)
+
+
+def _bench_extract(image, engine, layout, preset):
+    """Run the pipeline once, timing each stage.
+
+    Returns (rows, PipelineMetrics, number of preprocess stages that copied
+    the image).
+    """
+    metrics = PipelineMetrics()
+    rows = extract_rows(image, engine=engine, layout=layout, preset=preset, metrics=metrics)
+    with metrics.stage('dataframe'):
+        pd.DataFrame(rows)
+    copies = sum(step['copied'] for record in metrics.stages
+                 if record['stage'] == 'preprocess' for step in record['steps'])
+    return rows, metrics, copies
+
+
+def run_benchmark(row_counts=(10, 40), font_sizes=(12, 16, 24), themes=('light', 'dark'),
+                  layouts=LAYOUT_MODES, presets=('fast', 'auto'), repeat=3,
+                  backend='auto', seed=0):
+    """Benchmark the extraction pipeline on synthetic tables.
+
+    Every combination of table shape, layout and preset is run `repeat`
+    times; the median stage timings, throughput, cell accuracy and the peak
+    traced memory of one extra run are returned as a JSON-serializable dict.
+    """
+    engine = get_ocr_engine(backend)
+    # Warm up so model loading and lazy imports are not charged to the first case
+    engine.image_to_string(np.full((32, 32), 255, dtype=np.uint8), config=OCR_CONFIG)
+    cv2.load()
+    pd.load()
+
+    results = []
+    for rows, font_size, theme in [(r, f, t) for r in row_counts
+                                   for f in font_sizes for t in themes]:
+        image, truth = render_synthetic_table(rows, font_size, theme, seed=seed)
+        # Feed the pipeline what ScreenCapture produces: a BGRA array
+        image = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGRA)
+        for layout in layouts:
+            for preset in presets:
+                runs = []
+                cpu_runs = []
+                for _ in range(repeat):
+                    extracted, metrics, copies = _bench_extract(image, engine, layout, preset)
+                    runs.append({**metrics.seconds(), 'total': metrics.total_seconds()})
+                    cpu_runs.append(sum(record['cpu_seconds'] for record in metrics.stages))
+                # Memory in a separate run: tracing slows allocations down
+                tracemalloc.start()
+                try:
+                    _, metrics, _ = _bench_extract(image, engine, layout, preset)
+                finally:
+                    tracemalloc.stop()
+                peak = max(record['traced_peak_mb'] for record in metrics.stages)
+
+                stages = {stage: float(np.median([run[stage] for run in runs]))
+                          for stage in runs[0]}
+                exact, chars = score_cells(extracted, truth)
+                results.append({
+                    'rows': rows,
+                    'font_size': font_size,
+                    'theme': theme,
+                    'width': image.shape[1],
+                    'height': image.shape[0],
+                    'layout': layout,
+                    'preset': preset,
+                    'stage_seconds': {k: round(v, 5) for k, v in stages.items()},
+                    'cpu_seconds': round(float(np.median(cpu_runs)), 5),
+                    'preprocess_copies': copies,
+                    'images_per_sec': round(1.0 / stages['total'], 3) if stages['total'] else None,
+                    'rows_per_sec': round((rows + 1) / stages['total'], 1) if stages['total'] else None,
+                    'peak_traced_mb': peak,
+                    'cell_accuracy': round(exact, 4),
+                    'char_similarity': round(chars, 4),
+                })
+                print(f"{rows:>4} rows {font_size:>3}px {theme:<5} {layout:<5} {preset:<8} "
+                      f"{stages['total'] * 1000:8.1f} ms  cells {exact:6.1%}", file=sys.stderr)
+
+    summary = {}
+    for key in ('layout', 'preset'):
+        for value in sorted({result[key] for result in results}):
+            subset = [result for result in results if result[key] == value]
+            summary[f"{key}={value}"] = {
+                'median_total_seconds': round(float(np.median(
+                    [result['stage_seconds']['total'] for result in subset])), 5),
+                'mean_cell_accuracy': round(float(np.mean(
+                    [result['cell_accuracy'] for result in subset])), 4),
+            }
+
+    report = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'ocr_backend': engine.name,
+        'repeat': repeat,
+        'seed': seed,
+        'cases': results,
+        'summary': summary,
+    }
+    try:
+        report['tesseract'] = str(pytesseract.get_tesseract_version())
+    except Exception:
+        report['tesseract'] = None
+    report['max_rss_mb'] = _max_rss_mb()
+    return report
+
+
+def run_bench(args):
+    """Run the synthetic benchmark suite and write the JSON report"""
+    report = run_benchmark(row_counts=args.rows, font_sizes=args.font_sizes,
+                           themes=args.themes, layouts=args.layouts,
+                           presets=args.presets, repeat=args.repeat,
+                           backend=args.ocr_backend, seed=args.seed)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+        print(f"Benchmark report written to: {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+def collect_image_paths(inputs):
+    """Expand directories and glob patterns into a sorted list of image files"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        elif glob.has_magic(item):
+            candidates = glob.glob(item, recursive=True)
+        else:
+            candidates = [item]
+        for path in sorted(candidates):
+            if os.path.isfile(path) and path.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(path)
+
+    # Drop duplicates while keeping order
+    seen = set()
+    return [p for p in paths if not (p in seen or seen.add(p))]
+
+
+def _init_batch_worker(options):
+    """Process pool initializer: load the OCR engine once per worker"""
+    _batch_options.update(options)
+    if options.get('cache'):
+        _batch_options['ocr_cache'] = OCRCache()
+    if options.get('templates'):
+        _batch_options['template_store'] = TemplateStore()
+    try:
+        get_ocr_engine(options['backend'])
+    except Exception:
+        pass  # Reported per image by _batch_extract
+    if options.get('warm'):
+        _warm_batch_worker()
+
+
+# Settings shared by every batch worker, filled in by _init_batch_worker
+_batch_options = {'backend': 'auto', 'layout': 'text', 'preset': DEFAULT_PRESET}
+
+
+def _batch_extract(path, data=None, layout=None, preset=None):
+    """Process pool worker: load one screenshot and run the OCR pipeline.
+
+    data holds the image bytes when they were uploaded rather than read
+    from path; layout and preset override the pool's settings.
+    """
+    layout = layout or _batch_options['layout']
+    preset = preset or _batch_options['preset']
+    metrics = PipelineMetrics(source=path, layout=layout, preset=preset)
+    try:
+        engine = get_ocr_engine(_batch_options['backend'])
+        with metrics.stage('load'):
+            try:
+                img = load_image(path if data is None else io.BytesIO(data))
+            except OSError as e:
+                if data is None:
+                    raise
+                # PIL's messages name the BytesIO object rather than the upload
+                reason = ("not a supported image format"
+                          if isinstance(e, Image.UnidentifiedImageError) else e)
+                raise ValueError(f"could not decode image: {reason}") from None
+        # One strip per process, the pool already uses every core
+        rows = extract_rows(img, engine=engine, workers=1, layout=layout, preset=preset,
+                            cache=_batch_options.get('ocr_cache'), metrics=metrics,
+                            templates=_batch_options.get('template_store'))
+        return path, rows, None, engine.name, metrics
+    except Exception as e:
+        return path, [], str(e), None, metrics
+
+
+def _unique_output_path(output_dir, path, used, extension=".csv"):
+    """Build a per-image output path that does not clash with earlier outputs"""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    candidate = stem
+    suffix = 1
+    while candidate in used:
+        candidate = f"{stem}_{suffix}"
+        suffix += 1
+    used.add(candidate)
+    return os.path.join(output_dir, candidate + extension)
+
+
+def run_batch(args):
+    """Run the OCR pipeline headlessly over many screenshots"""
+    for flag, value in (("--append", args.append), ("--dedupe", args.dedupe is not None)):
+        if value and not args.merge:
+            print(f"{flag} requires --merge", file=sys.stderr)
+            return 2
+    paths = collect_image_paths(args.inputs)
+    if not paths:
+        print("No images found", file=sys.stderr)
+        return 1
+
+    if args.merge:
+        output_file = args.output
+        if os.path.isdir(output_file) or output_file.endswith(os.sep):
+            output_file = os.path.join(output_file, f"merged.{args.format or 'csv'}")
+        os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+        try:
+            merged = open_exporter(output_file, fmt=args.format, append=args.append)
+        except (ImportError, ValueError) as e:
+            print(f"Cannot write {output_file}: {e}", file=sys.stderr)
+            return 1
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        extension = "." + (args.format or "csv")
+
+    workers = args.workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+    print(f"Processing {len(paths)} images with {workers} workers...")
+
+    options = {'backend': args.ocr_backend, 'layout': args.layout, 'preset': args.preset,
+               'cache': not args.no_cache, 'templates': args.templates}
+    pending = {}
+    next_index = 0
+    session = ExtractionSession(args.dedupe) if args.dedupe is not None else None
+    failures = 0
+    backends = set()
+    used_names = set()
+    metrics_log = MetricsLog(args.metrics) if args.metrics else None
+    start = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                 initargs=(options,)) as executor:
+            futures = {executor.submit(_batch_extract, path): index
+                       for index, path in enumerate(paths)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                path, rows, error, backend, metrics = future.result()
+                if backend:
+                    backends.add(backend)
+                metrics.info.update(rows=len(rows), error=error)
+                if error:
+                    failures += 1
+                    rows = None
+                    print(f"[{done}/{len(paths)}] {path}: error: {error}", file=sys.stderr)
+                else:
+                    cache_note = " (cached)" if metrics.info.get('cache') == 'hit' else ""
+                    print(f"[{done}/{len(paths)}] {path}: {len(rows)} rows{cache_note}")
+                if args.merge:
+                    # Stream to the merged file in input order: hold results only
+                    # until every earlier image has been written
+                    pending[futures[future]] = (path, rows, metrics)
+                    while next_index in pending:
+                        path, rows, metrics = pending.pop(next_index)
+                        next_index += 1
+                        with metrics.stage('dataframe'):
+                            if rows and session is not None:
+                                rows = session.add(rows)
+                                df = session.to_frame(rows)
+                            else:
+                                df = pd.DataFrame(rows)
+                            if rows and args.typed:
+                                df = convert_column_types(df)
+                        if rows:
+                            df.insert(0, "source", os.path.basename(path))
+                            try:
+                                with metrics.stage('export'):
+                                    merged.write(df)
+                            except ValueError as e:
+                                failures += 1
+                                print(f"{path}: cannot write to {output_file}: {e}",
+                                      file=sys.stderr)
+                        if metrics_log is not None:
+                            metrics_log.write(metrics)
+                    continue
+                if rows:
+                    out_path = _unique_output_path(args.output, path, used_names, extension)
+                    try:
+                        with metrics.stage('dataframe'):
+                            df = pd.DataFrame(rows)
+                            if args.typed:
+                                df = convert_column_types(df)
+                        with metrics.stage('export'):
+                            with open_exporter(out_path, fmt=args.format) as exporter:
+                                exporter.write(df)
+                    except (ImportError, ValueError) as e:
+                        failures += 1
+                        print(f"{path}: cannot write {out_path}: {e}", file=sys.stderr)
+                if metrics_log is not None:
+                    metrics_log.write(metrics)
+    finally:
+        # Finish the merged file even if the pool fails part way
+        if args.merge:
+            merged.close()
+
+    if args.merge:
+        if merged.rows_written:
+            action = "appended to" if args.append else "written to"
+            print(f"Merged data {action}: {output_file} ({merged.rows_written} rows)")
+        if session is not None:
+            print(f"Skipped {session.duplicates} duplicate rows")
+
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed if elapsed > 0 else float("inf")
+    print(f"Processed {len(paths)} images in {elapsed:.2f}s ({rate:.2f} images/sec), "
+          f"{failures} failed")
+    if backends:
+        print(f"OCR backend: {', '.join(sorted(backends))}")
+    return 1 if failures else 0
+
+
+SERVE_PORT = 8765
+SERVE_QUEUE_SIZE = 16  # Requests that may wait for a busy pool before getting a 503
+SERVE_MAX_UPLOAD = 32 * 1024 * 1024
+SERVE_FORMATS = ('json', 'csv')
+
+
+class ServiceBusy(Exception):
+    """Raised when every extraction worker is busy and the request queue is full"""
+
+
+def _warm_batch_worker():
+    """Import the pipeline and OCR a tiny image once, so the first request is fast"""
+    for module in (np, cv2, Image, pd):
+        module.load()
+    image = Image.new('RGB', (160, 40), 'white')
+    ImageDraw.Draw(image).text((8, 12), "Warm 123", fill='black')
+    try:
+        extract_rows(image, engine=get_ocr_engine(_batch_options['backend']), workers=1,
+                     layout=_batch_options['layout'], preset=_batch_options['preset'])
+    except Exception:
+        pass  # Reported per request by _batch_extract
+
+
+class ExtractionService:
+    """Warm worker pool behind the serve command.
+
+    Uses the batch workers, so each process keeps its OCR engine, cache and
+    templates loaded between requests. At most workers requests run at once
+    and queue_size more wait; beyond that extract() raises ServiceBusy.
+    """
+
+    def __init__(self, workers, options, queue_size=SERVE_QUEUE_SIZE, metrics_log=None):
+        self.workers = workers
+        self.options = dict(options, warm=True)  # Each worker warms up in _init_batch_worker
+        self.queue_size = queue_size
+        self.metrics_log = metrics_log
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._served = 0
+        self._rejected = 0
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_batch_worker,
+                                   initargs=(self.options,))
+
+    def warm_up(self, wait=True):
+        """Start every worker; with wait, block until each has warmed up and return their pids"""
+        pids = set()
+        while len(pids) < self.workers:
+            # A worker answers only once its initializer has warmed it, but a
+            # quick one may answer several probes, so ask until all have
+            futures = [self._executor.submit(os.getpid) for _ in range(self.workers)]
+            if not wait:
+                return None
+            pids.update(future.result() for future in futures)
+        return pids
+
+    def _replace_executor(self, broken):
+        """Swap in a fresh pool after a worker process died"""
+        with self._lock:
+            if self._executor is not broken:
+                return  # Another request already replaced it
+            self._executor = self._new_executor()
+        broken.shutdown(wait=False)
+        self.warm_up(wait=False)
+
+    def extract(self, data, name, layout=None, preset=None):
+        """Run the pipeline on image bytes; returns (rows, error, backend, metrics)"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ServiceBusy()
+        with self._lock:
+            self._pending += 1
+        executor = self._executor
+        try:
+            _, rows, error, backend, metrics = executor.submit(
+                _batch_extract, name, data, layout, preset).result()
+        except BrokenProcessPool:
+            self._replace_executor(executor)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._served += 1
+            self._slots.release()
+        metrics.info.update(rows=len(rows), error=error)
+        if self.metrics_log is not None:
+            self.metrics_log.write(metrics)
+        return rows, error, backend, metrics
+
+    def status(self):
+        with self._lock:
+            return {'status': 'ok', 'workers': self.workers, 'queue_size': self.queue_size,
+                    'running': min(self._pending, self.workers),
+                    'queued': max(0, self._pending - self.workers),
+                    'served': self._served, 'rejected': self._rejected,
+                    'backend': self.options['backend'], 'layout': self.options['layout'],
+                    'preset': self.options['preset']}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+def make_serve_handler(service):
+    """Build the HTTP request handler class answering for an ExtractionService"""
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qs, urlsplit
+
+    class ExtractionHandler(BaseHTTPRequestHandler):
+        server_version = "ScreenDataScanner"
+        # Keep-alive saves scripted clients a connection per request
+        protocol_version = "HTTP/1.1"
+
+        def address_string(self):
+            # Unix socket clients have no address
+            return self.client_address[0] if self.client_address else "local"
+
+        def _send(self, status, body, content_type, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for header in headers:
+                self.send_header(*header)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status, payload, headers=()):
+            body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            self._send(status, body, "application/json; charset=utf-8", headers)
+
+        def _send_error(self, status, message, headers=()):
+            self._send_json(status, {'error': message}, headers)
+
+        def _reject(self, status, message):
+            # Answered before reading the body, which would otherwise be
+            # taken for the next request on this keep-alive connection
+            self._send_error(status, message, headers=(("Connection", "close"),))
+
+        def do_GET(self):
+            if urlsplit(self.path).path == "/health":
+                self._send_json(200, service.status())
+            else:
+                self._send_error(404, "Unknown path; POST images to /extract")
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path != "/extract":
+                self._reject(404, "Unknown path; POST images to /extract")
+                return
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            accept = self.headers.get("Accept", "")
+            fmt = query.get("format", "csv" if "text/csv" in accept else "json")
+            layout = query.get("layout")
+            preset = query.get("preset")
+            for value, choices in ((fmt, SERVE_FORMATS), (layout, LAYOUT_MODES),
+                                   (preset, PREPROCESS_PRESETS)):
+                if value is not None and value not in choices:
+                    self._reject(400, f"Unknown option {value!r}; use one of "
+                                      f"{', '.join(choices)}")
+                    return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = 0
+            if length <= 0:
+                self._reject(411, "Send the image file as the request body")
+                return
+            if length > SERVE_MAX_UPLOAD:
+                self._reject(413, f"Images are limited to {SERVE_MAX_UPLOAD // 2**20} MB")
+                return
+            data = self.rfile.read(length)
+            name = query.get("name") or self.headers.get("X-Filename") or "upload"
+            try:
+                rows, error, backend, metrics = service.extract(data, name, layout, preset)
+            except ServiceBusy:
+                self._send_error(503, "All workers are busy, retry shortly",
+                                 headers=(("Retry-After", "1"),))
+                return
+            except BrokenProcessPool:
+                self._send_error(500, "An extraction worker crashed; the workers "
+                                      "have been restarted, retry the request")
+                return
+            if error:
+                self._send_error(422, error)
+                return
+            if fmt == "csv":
+                out = io.StringIO()
+                csv.writer(out).writerows(rows)
+                self._send(200, out.getvalue().encode('utf-8'), "text/csv; charset=utf-8")
+                return
+            self._send_json(200, {
+                'source': name,
+                'rows': rows,
+                'backend': backend,
+                'cache': metrics.info.get('cache'),
+                'template': metrics.info.get('template'),
+                'seconds': round(metrics.total_seconds(), 4),
+            })
+
+    return ExtractionHandler
+
+
+def run_serve(args):
+    """Answer extraction requests over local HTTP or a Unix socket"""
+    import socketserver
+    from http.server import ThreadingHTTPServer
+
+    if args.socket:
+        if not hasattr(socketserver, "UnixStreamServer"):
+            print("--socket needs Unix domain sockets; use --port", file=sys.stderr)
+            return 2
+
+        class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)  # Left behind by a server that did not shut down
+
+    workers = max(1, args.workers or os.cpu_count() or 1)
+    options = {'backend': args.ocr_backend, 'layout': args.layout, 'preset': args.preset,
+               'cache': not args.no_cache, 'templates': args.templates}
+    metrics_log = MetricsLog(args.metrics) if args.metrics else None
+    service = ExtractionService(workers, options, queue_size=max(0, args.queue),
+                                metrics_log=metrics_log)
+    start = time.perf_counter()
+    service.warm_up()
+    handler = make_serve_handler(service)
+    try:
+        if args.socket:
+            server = UnixHTTPServer(args.socket, handler)
+            os.chmod(args.socket, 0o600)
+            address = f"unix:{args.socket}"
+        else:
+            server = ThreadingHTTPServer((args.host, args.port), handler)
+            address = f"http://{args.host}:{server.server_address[1]}"
+    except OSError as e:
+        print(f"Cannot listen: {e}", file=sys.stderr)
+        service.shutdown()
+        return 1
+    print(f"Serving on {address} with {workers} warm workers "
+          f"(ready in {time.perf_counter() - start:.2f}s); Ctrl+C to stop", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    return 0
+
+
+def build_arg_parser():
+    """Build the command line parser for headless modes"""
+    parser = argparse.ArgumentParser(
+        prog="screen_scanner.py",
+        description="Screen Data Scanner. Run without arguments to open the GUI.",
+    )
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Print import and initialization timings once the GUI is ready")
+    parser.add_argument("--metrics-log", metavar="FILE", default=None,
+                        help="Append per-stage timings of each GUI extraction "
+                             "to FILE as JSON lines")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch = subparsers.add_parser(
+        "batch", help="Extract tables from screenshot files without the GUI"
+    )
+    batch.add_argument("inputs", nargs="+",
+                       help="Image files, directories or glob patterns")
+    batch.add_argument("-o", "--output", required=True,
+                       help="Output directory (or output file with --merge)")
+    batch.add_argument("--merge", action="store_true",
+                       help="Write all rows to a single file with a 'source' column")
+    batch.add_argument("--format", choices=sorted(set(EXPORT_FORMATS.values())), default=None,
+                       help="Output format (default: from the --merge file "
+                            "extension, otherwise csv)")
+    batch.add_argument("--dedupe", nargs="?", const="", default=None, metavar="KEY",
+                       help="With --merge, align columns by header and drop "
+                            "duplicate rows, identified by the comma separated "
+                            "KEY columns (e.g. \"Name,Club\") or the whole row")
+    batch.add_argument("--typed", action="store_true",
+                       help="Convert money, numbers, percentages, heights and "
+                            "ranges to compact numeric columns")
+    batch.add_argument("--append", action="store_true",
+                       help="With --merge, add rows to an existing CSV, NDJSON "
+                            "or SQLite file instead of replacing it")
+    batch.add_argument("-j", "--workers", type=int, default=None,
+                       help="Number of worker processes (default: CPU count)")
+    batch.add_argument("--ocr-backend", choices=OCR_BACKENDS, default="auto",
+                       help="OCR engine: in-process tesserocr, the tesseract "
+                            "command via pytesseract, or auto (default)")
+    batch.add_argument("--layout", choices=LAYOUT_MODES, default="text",
+                       help="Column detection: whitespace splitting of text "
+                            "lines (default) or per-cell OCR of a detected grid")
+    batch.add_argument("--preset", choices=list(PREPROCESS_PRESETS), default=DEFAULT_PRESET,
+                       help=f"Preprocessing preset (default: {DEFAULT_PRESET})")
+    batch.add_argument("--no-cache", action="store_true",
+                       help="Always run OCR instead of reusing cached results")
+    batch.add_argument("--templates", action="store_true",
+                       help="Read screenshots matching a column template saved "
+                            "in the GUI with that template")
+    batch.add_argument("--metrics", nargs="?", const="-", default=None, metavar="FILE",
+                       help="Append per-stage timings for each image as JSON "
+                            "lines to FILE, or print them to stderr")
+    batch.set_defaults(func=run_batch)
+
+    serve = subparsers.add_parser(
+        "serve", help="Answer extraction requests from local scripts over HTTP"
+    )
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="Address to listen on (default: 127.0.0.1, this machine only)")
+    serve.add_argument("--port", type=int, default=SERVE_PORT,
+                       help=f"Port to listen on (default: {SERVE_PORT})")
+    serve.add_argument("--socket", metavar="PATH", default=None,
+                       help="Listen on a Unix domain socket instead of a port")
+    serve.add_argument("-j", "--workers", type=int, default=None,
+                       help="Number of warm worker processes, i.e. requests "
+                            "processed at once (default: CPU count)")
+    serve.add_argument("--queue", type=int, default=SERVE_QUEUE_SIZE,
+                       help="Requests that may wait for a free worker before "
+                            f"the server answers 503 (default: {SERVE_QUEUE_SIZE})")
+    serve.add_argument("--ocr-backend", choices=OCR_BACKENDS, default="auto")
+    serve.add_argument("--layout", choices=LAYOUT_MODES, default="text",
+                       help="Default column detection, see batch --layout")
+    serve.add_argument("--preset", choices=list(PREPROCESS_PRESETS), default=DEFAULT_PRESET,
+                       help=f"Default preprocessing preset (default: {DEFAULT_PRESET})")
+    serve.add_argument("--no-cache", action="store_true",
+                       help="Always run OCR instead of reusing cached results")
+    serve.add_argument("--templates", action="store_true",
+                       help="Read images matching a saved column template with it")
+    serve.add_argument("--metrics", nargs="?", const="-", default=None, metavar="FILE",
+                       help="Append per-stage timings for each request as JSON "
+                            "lines to FILE, or print them to stderr")
+    serve.set_defaults(func=run_serve)
+
+    bench = subparsers.add_parser(
+        "bench", help="Benchmark speed and accuracy on synthetic FM tables"
+    )
+    bench.add_argument("--rows", type=int, nargs="+", default=[10, 40],
+                       help="Table row counts to render")
+    bench.add_argument("--font-sizes", type=int, nargs="+", default=[12, 16, 24],
+                       help="Font sizes in pixels")
+    bench.add_argument("--themes", nargs="+", choices=list(BENCH_THEMES),
+                       default=list(BENCH_THEMES))
+    bench.add_argument("--layouts", nargs="+", choices=LAYOUT_MODES,
+                       default=list(LAYOUT_MODES))
+    bench.add_argument("--presets", nargs="+", choices=list(PREPROCESS_PRESETS),
+                       default=['fast', 'auto'])
+    bench.add_argument("--repeat", type=int, default=3,
+                       help="Runs per case; the median is reported")
+    bench.add_argument("--seed", type=int, default=0,
+                       help="Seed for the generated table contents")
+    bench.add_argument("--ocr-backend", choices=OCR_BACKENDS, default="auto")
+    bench.add_argument("-o", "--output", help="Write the JSON report to a file")
+    bench.set_defaults(func=run_bench)
+
+    return parser
+
+
+def print_startup_profile(timings):
+    """Print startup phase and import timings (--startup-profile)"""
+    print("Startup profile (seconds since launch):")
+    for label, seconds in timings.items():
+        print(f"  {label:<18} {seconds:8.3f}")
+    print("Lazy import times:")
+    for name, seconds in sorted(_import_timings.items(), key=lambda item: -item[1]):
+        print(f"  {name:<18} {seconds:8.3f}")
+    sys.stdout.flush()
+
+
+def main(argv=None):
     """Main entry point"""
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_arg_parser().parse_args(argv)
+    if getattr(args, "func", None):
+        return args.func(args)
+
     root = tk.Tk()
-    app = ScreenScannerApp(root)
+    app = ScreenScannerApp(root, startup_profile=args.startup_profile,
+                           metrics_log=args.metrics_log)
     root.mainloop()
+    # Don't keep the process alive finishing queued extractions
+    app.jobs.shutdown()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
-
+    # Needed for process pools inside PyInstaller builds
+    multiprocessing.freeze_support()
+    sys.exit(main())